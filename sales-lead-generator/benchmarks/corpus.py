@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+ベンチマーク用の企業サイトコーパス
+
+実在サイトのページは再配布できないため、一般的な日本の企業サイトの構成
+（会社概要・所在地・連絡先、一部はWordPress）をテンプレートにして、
+企業IDから決定的に生成する。同じIDからは常に同じページ・抽出結果が得られる。
+"""
+
+import json
+import random
+import re
+import zlib
+from typing import Dict, Optional
+
+PREFECTURES = ('東京都', '大阪府', '神奈川県', '愛知県', '福岡県', '北海道', '京都府', '兵庫県')
+CITIES = ('中央区', '北区', '港区', '西区', '南区', '緑区')
+NAME_PARTS = ('サン', 'テック', 'アーク', 'ミライ', 'ネクスト', 'グリーン', 'ブルー', 'ハート', 'ライト', 'ワン')
+SUFFIXES = ('株式会社', '有限会社', '合同会社')
+# 検索条件と一致しない業種の企業も混ざる（スコアリングの分布を実際に近づける）
+INDUSTRIES = ('IT', 'IT', 'IT', 'システム開発', 'ソフトウェア', 'WEB制作', '製造業', '小売業')
+
+# 検索結果のURL中の企業ID（/sites/<id>/）
+COMPANY_ID_PATTERN = re.compile(r'/sites/(c\d+-\d+)')
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="ja">
+<head>
+<meta charset="utf-8">
+<title>{name} | {industry}</title>
+<meta name="description" content="{name}は{prefecture}{city}の{industry}の会社です。{tagline}">
+{generator}
+</head>
+<body>
+<header><h1>{name}</h1><nav>会社概要 / 事業内容 / 採用情報 / お問い合わせ</nav></header>
+<main>
+<section><h2>事業内容</h2><p>{description}</p></section>
+<section><h2>会社概要</h2>
+<table>
+<tr><th>会社名</th><td>{name}</td></tr>
+<tr><th>所在地</th><td>{address}</td></tr>
+<tr><th>従業員数</th><td>{employees}名</td></tr>
+<tr><th>電話番号</th><td>{phone}</td></tr>
+<tr><th>メール</th><td>{email}</td></tr>
+</table>
+</section>
+<section><h2>お知らせ</h2>{news}</section>
+</main>
+<footer>&copy; {name}</footer>
+{scripts}
+</body>
+</html>
+"""
+
+def company_id(query: str, position: int) -> str:
+    """検索クエリと順位から企業IDを決める（同じクエリ・順位なら同じ企業）"""
+    return f"c{zlib.crc32(query.encode('utf-8')) % 100000:05d}-{position:05d}"
+
+def _business_size(employees: int) -> str:
+    """従業員数から事業規模（抽出スキーマの enum）を判定"""
+    for limit, size in ((10, 'startup'), (50, 'small'), (300, 'medium'), (1000, 'large')):
+        if employees <= limit:
+            return size
+    return 'enterprise'
+
+def company(cid: str) -> Dict:
+    """企業IDから企業の属性を生成"""
+    rng = random.Random(cid)
+    industry = rng.choice(INDUSTRIES)
+    prefecture = rng.choice(PREFECTURES)
+    city = rng.choice(CITIES)
+    name = f"{rng.choice(NAME_PARTS)}{rng.choice(NAME_PARTS)}{rng.choice(SUFFIXES)}"
+    employees = rng.choice((5, 20, 45, 120, 280, 650, 1500))
+    slug = cid.replace('-', '')
+
+    return {
+        'id': cid,
+        'name': name,
+        'industry': industry,
+        'prefecture': prefecture,
+        'city': city,
+        'address': f"{prefecture}{city}{rng.randint(1, 9)}-{rng.randint(1, 30)}-{rng.randint(1, 20)}",
+        'employees': employees,
+        'business_size': _business_size(employees),
+        'phone': f"0{rng.randint(3, 99)}-{rng.randint(100, 9999):04d}-{rng.randint(0, 9999):04d}",
+        'email': f"info@{slug}.example.jp",
+        'is_wordpress': rng.random() < 0.3,
+        'tagline': rng.choice(('地域に根ざしたサービスを提供しています。', '創業以来、品質にこだわり続けています。',
+                               'お客様の課題解決を支援します。')),
+    }
+
+def render_page(cid: str, page: str = '') -> str:
+    """企業サイトのページのHTMLを生成（トップ以外のページも同じ構成で本文を変える）"""
+    info = company(cid)
+    rng = random.Random(f"{cid}/{page}")
+
+    description = ''.join(
+        f"{info['name']}は{info['industry']}分野で{rng.randint(2, 40)}年の実績があり、"
+        f"{info['prefecture']}を中心に{rng.choice(('法人', '個人', '自治体'))}向けのサービスを展開しています。"
+        for _ in range(rng.randint(8, 20))
+    )
+    news = ''.join(
+        f"<p>{2020 + rng.randint(0, 5)}年{rng.randint(1, 12)}月{rng.randint(1, 28)}日 "
+        f"{rng.choice(('新サービスを開始しました', 'オフィスを移転しました', '採用情報を更新しました'))}</p>"
+        for _ in range(rng.randint(3, 10))
+    )
+    wordpress = info['is_wordpress']
+
+    return PAGE_TEMPLATE.format(
+        name=info['name'],
+        industry=info['industry'],
+        prefecture=info['prefecture'],
+        city=info['city'],
+        tagline=info['tagline'],
+        address=info['address'],
+        employees=info['employees'],
+        phone=info['phone'],
+        email=info['email'],
+        description=description,
+        news=news,
+        generator='<meta name="generator" content="WordPress 6.4">' if wordpress else '',
+        scripts=(f'<script src="/sites/{cid}/wp-includes/js/jquery.min.js"></script>' if wordpress else '')
+    )
+
+def search_results(base_url: str, query: str, start: int, num: int) -> Dict:
+    """SerpAPI形式の検索結果（リンク先はフィクスチャサーバーの企業サイト）"""
+    organic_results = []
+    for i in range(num):
+        cid = company_id(query, start + i)
+        info = company(cid)
+        organic_results.append({
+            'position': start + i + 1,
+            'title': f"{info['name']} | {info['industry']}",
+            'link': f"{base_url}/sites/{cid}/",
+            'snippet': info['tagline']
+        })
+
+    return {'search_metadata': {'status': 'Success'}, 'organic_results': organic_results}
+
+def extraction(prompt: str) -> Optional[Dict]:
+    """
+    プロンプト中のURLの企業について、Claudeが返す形式の抽出結果を生成
+
+    URLにコーパスの企業IDが無ければNone（抽出できなかった扱い）
+    """
+    match = COMPANY_ID_PATTERN.search(prompt)
+    if not match:
+        return None
+
+    info = company(match.group(1))
+    return {
+        'company_name': info['name'],
+        'industry': info['industry'],
+        'location': info['address'],
+        'description': f"{info['name']}は{info['prefecture']}の{info['industry']}企業です。{info['tagline']}",
+        'business_size': info['business_size'],
+        'contact_email': info['email'],
+        'phone': info['phone'],
+        'confidence_score': 0.8
+    }
+
+def extraction_text(prompt: str) -> str:
+    """Claudeのレスポンス本文（抽出結果のJSON）"""
+    data = extraction(prompt)
+    return json.dumps(data, ensure_ascii=False) if data else "情報を抽出できませんでした。"
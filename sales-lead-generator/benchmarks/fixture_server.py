@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+ベンチマーク用のフィクスチャサーバー
+
+1つのaiohttpサーバーで次のエンドポイントを提供する（応答時間は設定可能）:
+- GET  /search.json          SerpAPI互換の検索（SERPAPI_BASE_URL の接続先）
+- POST /v1/messages          Anthropic Messages API互換の抽出（ANTHROPIC_BASE_URL の接続先）
+- GET  /sites/<id>/...       コーパスの企業サイト
+- GET  /robots.txt, その他   robots.txt と、補完処理が巡回する会社概要などのページ
+
+計測対象のプロセスとCPU・GILを奪い合わないよう、別プロセスで起動する。
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import random
+import socket
+import uuid
+import zlib
+from dataclasses import dataclass
+from typing import Optional
+
+from aiohttp import web
+
+import corpus
+
+@dataclass
+class FixtureLatency:
+    """エンドポイントごとの応答時間（秒）"""
+    site: float = 0.05
+    search: float = 0.3
+    llm: float = 1.0
+    # 応答時間のばらつき（±割合）
+    jitter: float = 0.2
+    seed: int = 0
+
+class FixtureApp:
+    """フィクスチャサーバーのハンドラ"""
+
+    def __init__(self, base_url: str, latency: FixtureLatency):
+        self.base_url = base_url
+        self.latency = latency
+        self._random = random.Random(latency.seed)
+
+    async def _wait(self, seconds: float):
+        if seconds > 0:
+            jitter = self.latency.jitter
+            await asyncio.sleep(seconds * self._random.uniform(1 - jitter, 1 + jitter))
+
+    def build(self) -> web.Application:
+        app = web.Application(client_max_size=8 * 1024 * 1024)
+        app.router.add_get('/search.json', self.search)
+        app.router.add_post('/v1/messages', self.messages)
+        app.router.add_get('/robots.txt', self.robots)
+        app.router.add_get('/sites/{cid}/{page:.*}', self.site)
+        app.router.add_get('/{page:.*}', self.generic_page)
+        return app
+
+    async def search(self, request: web.Request) -> web.Response:
+        await self._wait(self.latency.search)
+        query = request.query.get('q', '')
+        start = int(request.query.get('start', 0))
+        num = int(request.query.get('num', 10))
+        return web.json_response(corpus.search_results(self.base_url, query, start, num))
+
+    async def messages(self, request: web.Request) -> web.Response:
+        await self._wait(self.latency.llm)
+        body = await request.json()
+        prompt = ''.join(
+            message['content'] if isinstance(message['content'], str)
+            else ''.join(block.get('text', '') for block in message['content'])
+            for message in body.get('messages', [])
+        )
+        text = corpus.extraction_text(prompt)
+
+        # トークン数は日本語の文字数からのおおよその見積もり
+        return web.json_response({
+            'id': f"msg_{uuid.uuid4().hex[:24]}",
+            'type': 'message',
+            'role': 'assistant',
+            'model': body.get('model', 'fixture'),
+            'content': [{'type': 'text', 'text': text}],
+            'stop_reason': 'end_turn',
+            'stop_sequence': None,
+            'usage': {'input_tokens': max(len(prompt) // 2, 1), 'output_tokens': max(len(text) // 2, 1)}
+        })
+
+    async def robots(self, request: web.Request) -> web.Response:
+        return web.Response(text="User-agent: *\nAllow: /\n")
+
+    async def site(self, request: web.Request) -> web.Response:
+        await self._wait(self.latency.site)
+        html = corpus.render_page(request.match_info['cid'], request.match_info['page'])
+        return web.Response(text=html, content_type='text/html')
+
+    async def generic_page(self, request: web.Request) -> web.Response:
+        """会社概要・採用情報など、補完処理がサイトのルートから巡回するページ"""
+        await self._wait(self.latency.site)
+        page = request.match_info['page']
+        cid = f"c00000-{zlib.crc32(page.encode('utf-8')) % 100000:05d}"
+        return web.Response(text=corpus.render_page(cid, page), content_type='text/html')
+
+def _free_port(host: str) -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+def serve(host: str, port: int, latency: FixtureLatency, ready=None):
+    """サーバーを起動して停止されるまで待つ（ready にはイベントを渡すと起動後にセットする）"""
+    async def run():
+        runner = web.AppRunner(FixtureApp(f"http://{host}:{port}", latency).build(), access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, host, port, backlog=1024).start()
+        if ready is not None:
+            ready.set()
+        await asyncio.Event().wait()
+
+    asyncio.run(run())
+
+class FixtureServer:
+    """
+    フィクスチャサーバーを別プロセスで起動するコンテキストマネージャ
+
+        with FixtureServer(FixtureLatency(llm=0.5)) as server:
+            config.search.serpapi_base_url = server.base_url
+    """
+
+    def __init__(self, latency: Optional[FixtureLatency] = None, host: str = '127.0.0.1', port: int = 0):
+        self.latency = latency or FixtureLatency()
+        self.host = host
+        self.port = port or _free_port(host)
+        self.process = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def __enter__(self) -> 'FixtureServer':
+        ready = multiprocessing.Event()
+        self.process = multiprocessing.Process(
+            target=serve, args=(self.host, self.port, self.latency, ready), daemon=True
+        )
+        self.process.start()
+        if not ready.wait(timeout=30):
+            self.process.terminate()
+            raise RuntimeError("Fixture server did not start")
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.process is not None:
+            self.process.terminate()
+            self.process.join(timeout=10)
+            self.process = None
+
+def main():
+    """
+    コマンドライン実行（アプリやワーカーを手動でフィクスチャに向けて動かす場合）
+    """
+    parser = argparse.ArgumentParser(description="ベンチマーク用のフィクスチャサーバー")
+    parser.add_argument("--host", default='127.0.0.1')
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--site-latency", type=float, default=FixtureLatency.site, help="企業サイトの応答時間（秒）")
+    parser.add_argument("--search-latency", type=float, default=FixtureLatency.search, help="検索APIの応答時間（秒）")
+    parser.add_argument("--llm-latency", type=float, default=FixtureLatency.llm, help="Claude APIの応答時間（秒）")
+    args = parser.parse_args()
+
+    print(f"Serving fixtures on http://{args.host}:{args.port}")
+    print(f"  SERPAPI_BASE_URL=http://{args.host}:{args.port} ANTHROPIC_BASE_URL=http://{args.host}:{args.port}")
+    try:
+        serve(args.host, args.port, FixtureLatency(args.site_latency, args.search_latency, args.llm_latency))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
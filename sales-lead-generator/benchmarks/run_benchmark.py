@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+リード生成パイプラインのオフラインベンチマーク
+
+フィクスチャサーバー（検索・企業サイト・Claude APIの代替）に向けて generate_leads を実行し、
+スループット（リード/秒）、ステージごとの所要時間、リクエスト単位のレイテンシ（p50/p95）、
+ピークRSSを計測する。外部のAPI・サイトには一切接続しない。
+
+    python benchmarks/run_benchmark.py --scenario small
+    python benchmarks/run_benchmark.py --scenario all --llm-latency 0.5 --output bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+PROJECT_DIR = BENCHMARK_DIR.parent
+sys.path.insert(0, str(BENCHMARK_DIR))
+sys.path.insert(0, str(PROJECT_DIR / 'src'))
+sys.path.insert(0, str(PROJECT_DIR))
+
+from fixture_server import FixtureLatency, FixtureServer
+
+# シナリオ名 -> 生成するリード数
+SCENARIOS = {
+    'small': 50,
+    'medium': 500,
+    'large': 5000,
+}
+
+# レイテンシを集計するリクエスト単位のヒストグラム
+REQUEST_HISTOGRAMS = ('search_latency_seconds', 'scrape_latency_seconds', 'llm_latency_seconds')
+
+INDUSTRY = 'IT'
+LOCATION = '東京都'
+# SerpAPIの1ページの件数
+RESULTS_PER_PAGE = 10
+
+def peak_rss_mb() -> Optional[float]:
+    """このプロセスのピークRSS（MB）"""
+    if resource is None:
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linuxは KB、macOSは バイト単位
+    return round(maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def percentile(values: List[float], ratio: float) -> float:
+    """パーセンタイル（最近傍）"""
+    values = sorted(values)
+    return values[max(math.ceil(len(values) * ratio) - 1, 0)]
+
+def configure(base_url: str, workdir: Path, search_delay: float):
+    """設定をフィクスチャサーバーと作業ディレクトリに向ける"""
+    from config.config import config
+
+    config.search.google_api_key = None
+    config.search.serpapi_key = 'benchmark'
+    config.search.serpapi_base_url = base_url
+    config.search.search_delay = search_delay
+    config.claude.api_key = 'benchmark'
+    config.claude.base_url = base_url
+    config.output.output_dir = str(workdir / 'output')
+
+async def run_once(leads: int, workdir: Path) -> Dict:
+    """
+    1回分の生成を実行して計測値を返す
+
+    履歴は作業ディレクトリの空のDBを使うため、毎回すべての企業が新規として扱われる。
+    """
+    from config.config import config
+    from history_manager import HistoryManager
+    from main import SalesLeadGenerator
+
+    generator = SalesLeadGenerator()
+    generator.history_manager = HistoryManager(workdir / f"history_{time.time_ns()}.db")
+
+    # 要求件数を満たすまで検索結果のページを辿れるようにする
+    queries = generator._build_search_queries(INDUSTRY, LOCATION)
+    config.search.max_search_pages = math.ceil(leads / (RESULTS_PER_PAGE * len(queries))) + 1
+
+    start = time.perf_counter()
+    result = await generator.generate_leads(
+        industry=INDUSTRY,
+        location=LOCATION,
+        max_results=leads,
+        export_formats=['csv']
+    )
+    seconds = time.perf_counter() - start
+
+    if not result.get('success'):
+        raise RuntimeError(f"Lead generation failed: {result.get('error')}")
+
+    return {'seconds': seconds, 'leads': result['leads_count'], 'metrics': result['metrics']}
+
+def summarize(name: str, leads: int, runs: List[Dict]) -> Dict:
+    """複数回の実行結果をシナリオの結果にまとめる"""
+    stage_seconds = {}
+    for run in runs:
+        for stage, seconds in run['metrics']['stages'].items():
+            stage_seconds.setdefault(stage, []).append(seconds)
+
+    # リクエスト単位のレイテンシは全実行の p50/p95 の中央値
+    request_latency = {}
+    for metric in REQUEST_HISTOGRAMS:
+        per_run = {}
+        for run in runs:
+            entries = run['metrics']['histograms'].get(metric, [])
+            if not entries:
+                continue
+            count = sum(entry['count'] for entry in entries)
+            # ラベル（ホスト・操作）ごとの値を件数で重み付けして1つにまとめる
+            per_run.setdefault('count', []).append(count)
+            for key in ('p50', 'p95'):
+                per_run.setdefault(key, []).append(sum(entry[key] * entry['count'] for entry in entries) / count)
+            per_run.setdefault('max', []).append(max(entry['max'] for entry in entries))
+        if per_run:
+            request_latency[metric] = {key: round(statistics.median(values), 4) for key, values in per_run.items()}
+
+    total_seconds = [run['seconds'] for run in runs]
+    lead_counts = [run['leads'] for run in runs]
+    return {
+        'scenario': name,
+        'requested_leads': leads,
+        'leads': lead_counts[-1],
+        'runs': len(runs),
+        'seconds': {'p50': round(percentile(total_seconds, 0.5), 3), 'p95': round(percentile(total_seconds, 0.95), 3)},
+        'leads_per_second': round(statistics.median(
+            count / seconds for count, seconds in zip(lead_counts, total_seconds)
+        ), 3),
+        'stage_seconds': {
+            stage: {'p50': round(percentile(values, 0.5), 3), 'p95': round(percentile(values, 0.95), 3)}
+            for stage, values in stage_seconds.items()
+        },
+        'request_latency': request_latency,
+        'summary': runs[-1]['metrics']['summary'],
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+def run_scenario(name: str, leads: int, latency: FixtureLatency, repeat: int, search_delay: float) -> Dict:
+    """シナリオをこのプロセスで実行"""
+    with tempfile.TemporaryDirectory(prefix='sales_leads_bench_') as tmp, FixtureServer(latency) as server:
+        workdir = Path(tmp)
+        configure(server.base_url, workdir, search_delay)
+
+        runs = []
+        for i in range(repeat):
+            runs.append(asyncio.run(run_once(leads, workdir)))
+            print(f"  {name} run {i + 1}/{repeat}: {runs[-1]['leads']} leads in {runs[-1]['seconds']:.1f}s",
+                  file=sys.stderr)
+
+    return summarize(name, leads, runs)
+
+def run_isolated(name: str, args: argparse.Namespace) -> Dict:
+    """
+    シナリオを子プロセスで実行（ピークRSSはプロセス全体の最大値なので、シナリオごとに分ける）
+    """
+    with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as f:
+        output = Path(f.name)
+
+    command = [
+        sys.executable, str(Path(__file__).resolve()),
+        '--scenario', name,
+        '--repeat', str(args.repeat),
+        '--site-latency', str(args.site_latency),
+        '--search-latency', str(args.search_latency),
+        '--llm-latency', str(args.llm_latency),
+        '--search-delay', str(args.search_delay),
+        '--output', str(output)
+    ]
+    if args.leads:
+        command.extend(['--leads', str(args.leads)])
+
+    try:
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+        return json.loads(output.read_text(encoding='utf-8'))[0]
+    finally:
+        output.unlink(missing_ok=True)
+
+def print_report(results: List[Dict]):
+    """結果を表形式で表示"""
+    for result in results:
+        print(f"\n=== {result['scenario']} ({result['leads']}/{result['requested_leads']} leads, {result['runs']} runs) ===")
+        print(f"  total        p50 {result['seconds']['p50']:8.2f}s   p95 {result['seconds']['p95']:8.2f}s")
+        print(f"  throughput   {result['leads_per_second']:.2f} leads/s")
+        print(f"  peak RSS     {result['peak_rss_mb']} MB")
+        print("  stages:")
+        for stage, seconds in result['stage_seconds'].items():
+            print(f"    {stage:<10} p50 {seconds['p50']:8.2f}s   p95 {seconds['p95']:8.2f}s")
+        print("  requests:")
+        for metric, latency in result['request_latency'].items():
+            print(f"    {metric:<24} n={latency['count']:<6} p50 {latency['p50'] * 1000:7.1f}ms   "
+                  f"p95 {latency['p95'] * 1000:7.1f}ms")
+        summary = result['summary']
+        print(f"  http requests {summary['http_requests']}, {summary['http_response_bytes'] / 1024:.0f} KB; "
+              f"llm tokens in {summary['llm_input_tokens']} / out {summary['llm_output_tokens']}")
+
+def main():
+    """
+    コマンドライン実行のメイン関数
+    """
+    parser = argparse.ArgumentParser(description="リード生成パイプラインのオフラインベンチマーク")
+    parser.add_argument("--scenario", choices=list(SCENARIOS) + ['all'], default='small',
+                        help="small=50, medium=500, large=5000 リード（all は全シナリオを別プロセスで順に実行）")
+    parser.add_argument("--leads", type=int, help="リード数（シナリオの件数を上書き）")
+    parser.add_argument("--repeat", type=int, default=1, help="シナリオごとの実行回数")
+    parser.add_argument("--site-latency", type=float, default=FixtureLatency.site, help="企業サイトの応答時間（秒）")
+    parser.add_argument("--search-latency", type=float, default=FixtureLatency.search, help="検索APIの応答時間（秒）")
+    parser.add_argument("--llm-latency", type=float, default=FixtureLatency.llm, help="Claude APIの応答時間（秒）")
+    parser.add_argument("--search-delay", type=float, default=0.0, help="検索間隔（config.search.search_delay）")
+    parser.add_argument("--output", help="結果をJSONで保存するパス")
+    parser.add_argument("--verbose", "-v", action="store_true", help="パイプラインのログを表示")
+    args = parser.parse_args()
+
+    # main のログ設定（INFO）を上書きし、計測中の出力を抑える
+    import main as _  # noqa: F401
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.WARNING)
+
+    if args.scenario == 'all':
+        results = [run_isolated(name, args) for name in SCENARIOS]
+    else:
+        latency = FixtureLatency(site=args.site_latency, search=args.search_latency, llm=args.llm_latency)
+        leads = args.leads or SCENARIOS[args.scenario]
+        results = [run_scenario(args.scenario, leads, latency, max(args.repeat, 1), args.search_delay)]
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding='utf-8')
+
+    print_report(results)
+
+if __name__ == "__main__":
+    main()
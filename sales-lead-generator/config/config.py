@@ -10,7 +10,11 @@ class SearchConfig:
     google_api_key: Optional[str] = os.getenv('GOOGLE_API_KEY')
     google_cse_id: Optional[str] = os.getenv('GOOGLE_CSE_ID')
     serpapi_key: Optional[str] = os.getenv('SERPAPI_KEY')
+    serpapi_base_url: str = os.getenv('SERPAPI_BASE_URL', 'https://serpapi.com')
+    request_timeout: int = 30
     max_results_per_query: int = 20
+    # 履歴で除外された分を補うために追加取得する最大ページ数
+    max_search_pages: int = 3
     search_delay: float = 1.0
 
 @dataclass
@@ -25,9 +29,12 @@ class ScrapingConfig:
 @dataclass
 class ClaudeConfig:
     api_key: str = os.getenv('ANTHROPIC_API_KEY', '')
+    # 未指定の場合はSDKのデフォルト（api.anthropic.com）
+    base_url: Optional[str] = os.getenv('ANTHROPIC_BASE_URL')
     model: str = 'claude-3-sonnet-20240229'
     max_tokens: int = 4000
-    temperature: float = 0.1
+    # Claude APIへの同時リクエスト数
+    max_concurrent_requests: int = 5
 
 @dataclass
 class ScoringConfig:
@@ -35,7 +42,10 @@ class ScoringConfig:
     business_size_weight: float = 3.0
     contact_info_weight: float = 2.0
     location_match_weight: float = 3.0
+    domain_reputation_weight: float = 1.0
     max_score: float = 13.0
+    high_priority_threshold: float = 8.0
+    medium_priority_threshold: float = 5.0
 
 @dataclass
 class OutputConfig:
@@ -43,16 +53,41 @@ class OutputConfig:
     csv_filename: str = 'sales_leads.csv'
     excel_filename: str = 'sales_leads.xlsx'
     sqlite_filename: str = 'sales_leads.db'
+    export_workers: int = 4
 
 @dataclass
 class CRMConfig:
     hubspot_api_key: Optional[str] = os.getenv('HUBSPOT_API_KEY')
+    hubspot_base_url: str = os.getenv('HUBSPOT_BASE_URL', 'https://api.hubapi.com')
+    hubspot_batch_size: int = 100
+    hubspot_max_concurrency: int = 3
     salesforce_client_id: Optional[str] = os.getenv('SALESFORCE_CLIENT_ID')
     salesforce_client_secret: Optional[str] = os.getenv('SALESFORCE_CLIENT_SECRET')
     salesforce_username: Optional[str] = os.getenv('SALESFORCE_USERNAME')
     salesforce_password: Optional[str] = os.getenv('SALESFORCE_PASSWORD')
+    salesforce_login_url: str = os.getenv('SALESFORCE_LOGIN_URL', 'https://login.salesforce.com')
+    salesforce_batch_size: int = 200
     zoho_client_id: Optional[str] = os.getenv('ZOHO_CLIENT_ID')
     zoho_client_secret: Optional[str] = os.getenv('ZOHO_CLIENT_SECRET')
+    max_retries: int = 3
+    retry_delay: float = 2.0
+    outbox_max_attempts: int = 5
+
+@dataclass
+class JobQueueConfig:
+    # Webアプリのジョブを処理するワーカープロセス数
+    workers: int = int(os.getenv('JOB_WORKERS', '2'))
+    # 1ユーザーあたりの同時実行ジョブ数
+    per_user_limit: int = int(os.getenv('JOB_PER_USER_LIMIT', '1'))
+    poll_interval: float = 1.0
+    heartbeat_interval: float = 5.0
+    # 進捗をDBに書き込む最小間隔（ステージの完了は常に書き込む）
+    progress_interval: float = 0.5
+    # この秒数ハートビートが途絶えた実行中ジョブは、ワーカー停止とみなして再投入
+    stale_timeout: float = 120.0
+    # 各ワーカーが停止したワーカーのジョブを回収する間隔（ポーリングごとには行わない）
+    stale_check_interval: float = 30.0
+    max_attempts: int = 2
 
 class Config:
     def __init__(self):
@@ -62,5 +97,6 @@ class Config:
         self.scoring = ScoringConfig()
         self.output = OutputConfig()
         self.crm = CRMConfig()
+        self.jobs = JobQueueConfig()
 
 config = Config()
\ No newline at end of file
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+ブルームフィルタ - 既知のURL・ドメインをメモリ上で高速に判定
+"""
+
+import hashlib
+import math
+import os
+import struct
+import tempfile
+from pathlib import Path
+from typing import Iterable, Optional
+
+# 保存ファイルのヘッダ（マジック, ビット数, ハッシュ数, 要素数, 容量, 付随情報）
+_HEADER = struct.Struct('<4sQIQQq')
+_MAGIC = b'BLM1'
+
+class BloomFilter:
+    """
+    偽陰性のない確率的な集合
+
+    「含まれない」という判定は確実なので、その場合はDBへの照会を省略できる。
+    「含まれる」という判定は誤りの可能性があるため、呼び出し側でDBに確認する。
+    要素の削除はできないため、削除時は作り直す。
+    """
+
+    def __init__(self, capacity: int = 10000, error_rate: float = 0.01):
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(math.ceil(-self.capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / self.capacity * math.log(2))))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        """ダブルハッシュでビット位置を生成"""
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str):
+        """
+        要素を追加
+
+        既に含まれると判定される要素（同じドメインの別URLなど）は要素数に数えない。
+        """
+        added = False
+        for position in self._positions(item):
+            mask = 1 << (position & 7)
+            if not self.bits[position >> 3] & mask:
+                self.bits[position >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+
+    def update(self, items: Iterable[str]):
+        """複数の要素を追加"""
+        for item in items:
+            self.add(item)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    @property
+    def is_saturated(self) -> bool:
+        """容量を超えて誤判定率が上がっているか"""
+        return self.count > self.capacity
+
+    def save(self, path, tag: int = 0):
+        """
+        ファイルに保存（一時ファイル経由で置き換え）
+
+        一時ファイルは保存ごとに一意の名前にし、複数のプロセスが同時に保存しても
+        書きかけのファイルが公開されないようにする。
+
+        Args:
+            path: 保存先
+            tag: 読み込み時に鮮度確認に使う付随情報（履歴の最大IDなど）
+        """
+        path = Path(path)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=path.name + '.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(_HEADER.pack(_MAGIC, self.num_bits, self.num_hashes, self.count, self.capacity, tag))
+                f.write(self.bits)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    @classmethod
+    def load(cls, path, error_rate: float = 0.01) -> Optional[tuple]:
+        """
+        ファイルから読み込み
+
+        Returns:
+            (フィルタ, 付随情報)。ファイルが無い・壊れている場合はNone
+        """
+        try:
+            with open(path, 'rb') as f:
+                header = f.read(_HEADER.size)
+                magic, num_bits, num_hashes, count, capacity, tag = _HEADER.unpack(header)
+                bits = bytearray(f.read())
+        except (OSError, struct.error):
+            return None
+
+        if magic != _MAGIC or len(bits) != (num_bits + 7) // 8:
+            return None
+
+        bloom = cls.__new__(cls)
+        bloom.capacity = capacity
+        bloom.error_rate = error_rate
+        bloom.num_bits = num_bits
+        bloom.num_hashes = num_hashes
+        bloom.bits = bits
+        bloom.count = count
+        return bloom, tag
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+キャンペーン実行 - 業種 × 地域 × キーワードの組み合わせを1プロセスでまとめて実行
+"""
+
+import asyncio
+import csv
+import importlib.util
+import itertools
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+import logging
+
+# PyYAMLはYAML形式のキャンペーンファイルを読み込む場合にのみ必要
+YAML_AVAILABLE = importlib.util.find_spec('yaml') is not None
+
+from history_manager import HistoryManager
+from models import ScoredLead
+
+logger = logging.getLogger(__name__)
+
+# CSVのkeywords列の区切り文字
+KEYWORD_SEPARATOR = re.compile(r'[;；、]')
+
+# 同時に実行する条件の数（キャンペーンファイル・コマンドラインで指定が無い場合）
+DEFAULT_CONCURRENCY = 2
+
+@dataclass
+class Territory:
+    """キャンペーンを構成する1つの検索条件（業種・地域・キーワード）"""
+    industry: str
+    location: str
+    keywords: List[str] = field(default_factory=list)
+    max_results: Optional[int] = None
+
+    @property
+    def label(self) -> str:
+        label = f"{self.industry} / {self.location}"
+        if self.keywords:
+            label += f" ({' '.join(self.keywords)})"
+        return label
+
+@dataclass
+class Campaign:
+    """複数の検索条件をまとめたキャンペーン"""
+    name: str
+    territories: List[Territory]
+    max_results: int = 50
+    concurrency: Optional[int] = None
+    export_formats: Optional[List[str]] = None
+
+def load_campaign(path) -> Campaign:
+    """
+    キャンペーンファイルを読み込む
+
+    YAML: industries × locations × keywords（キーワードの組のリスト）の組み合わせを展開し、
+    territories に個別の条件を追加できる。name, max_results, concurrency, export も指定可能。
+
+    CSV: 1行1条件（industry, location, keywords, max_results 列。keywords は ; 区切り）
+
+    Raises:
+        ValueError: ファイル形式・内容が不正な場合
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+
+    if suffix == '.csv':
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            territories = [_territory_from_dict(row) for row in csv.DictReader(f)]
+        campaign = Campaign(name=path.stem, territories=territories)
+
+    elif suffix in ('.yaml', '.yml'):
+        if not YAML_AVAILABLE:
+            raise ValueError("YAML campaign files require PyYAML (pip install pyyaml) - use a CSV file instead")
+
+        import yaml
+
+        with open(path, encoding='utf-8') as f:
+            data = yaml.safe_load(f) or {}
+
+        keyword_sets = data.get('keywords') or [[]]
+        territories = [
+            Territory(industry=str(industry), location=str(location), keywords=_keyword_list(keywords))
+            for industry, location, keywords in itertools.product(
+                data.get('industries') or [], data.get('locations') or [], keyword_sets
+            )
+        ]
+        territories.extend(_territory_from_dict(item) for item in data.get('territories') or [])
+
+        campaign = Campaign(
+            name=str(data.get('name') or path.stem),
+            territories=territories,
+            max_results=int(data.get('max_results', 50)),
+            concurrency=data.get('concurrency'),
+            export_formats=data.get('export')
+        )
+
+    else:
+        raise ValueError(f"Unsupported campaign file: {path} (use .yaml, .yml or .csv)")
+
+    if not campaign.territories:
+        raise ValueError(f"No territories defined in campaign file: {path}")
+
+    return campaign
+
+def _keyword_list(keywords) -> List[str]:
+    """キーワード指定（リストまたは区切り文字列）をリストに変換"""
+    if not keywords:
+        return []
+    if isinstance(keywords, str):
+        keywords = KEYWORD_SEPARATOR.split(keywords)
+    return [str(keyword).strip() for keyword in keywords if str(keyword).strip()]
+
+def _territory_from_dict(data: Dict) -> Territory:
+    """辞書（CSVの行・YAMLの要素）から検索条件を作成"""
+    industry = (data.get('industry') or '').strip()
+    location = (data.get('location') or '').strip()
+    if not industry or not location:
+        raise ValueError(f"industry and location are required: {data}")
+
+    max_results = data.get('max_results')
+    return Territory(
+        industry=industry,
+        location=location,
+        keywords=_keyword_list(data.get('keywords')),
+        max_results=int(max_results) if max_results not in (None, '') else None
+    )
+
+class CampaignRunner:
+    """
+    キャンペーンの全条件を1つの生成器で実行し、結果を1つのエクスポートにまとめる
+
+    APIクライアント・HTTPセッションは全条件で共有し、同時に実行する条件の数は
+    concurrency で制限する。検索の間隔（search_delay）とスクレイピング・Claude APIの
+    同時リクエスト数も共有の上限に従うため、条件数を増やしても負荷は増えない。
+
+    履歴への追加は各条件の完了時に行われるため、同時に実行中の条件どうしは履歴では
+    重複を除けない。そのため取得するドメインを実行中の全条件で共有し、他の条件が
+    既に取得した企業はスクレイピング・抽出の前に除外する。
+    """
+
+    def __init__(self, generator_factory=None, concurrency: Optional[int] = None):
+        """
+        Args:
+            generator_factory: scraper を受け取り生成器を返す関数（デフォルトは SalesLeadGenerator）
+            concurrency: 同時に実行する条件の数（キャンペーンファイルの指定より優先）
+        """
+        if generator_factory is None:
+            from main import SalesLeadGenerator
+            generator_factory = SalesLeadGenerator
+        self.generator_factory = generator_factory
+        self.concurrency = concurrency
+
+    async def run(self, campaign: Campaign, export_formats: List[str] = None, sync_to_crm: bool = False) -> Dict:
+        """
+        キャンペーンを実行
+
+        Returns:
+            条件ごとの結果・重複除去後のリード数・エクスポート結果の辞書
+        """
+        from scraper import WebScraper
+
+        export_formats = export_formats if export_formats is not None else (campaign.export_formats or ['csv', 'excel'])
+        concurrency = max(self.concurrency or campaign.concurrency or DEFAULT_CONCURRENCY, 1)
+        logger.info(f"Starting campaign '{campaign.name}': {len(campaign.territories)} territories, "
+                    f"concurrency {concurrency}")
+
+        async with WebScraper() as scraper:
+            generator = self.generator_factory(scraper=scraper)
+            semaphore = asyncio.Semaphore(concurrency)
+            # 全条件で取得済みのドメイン（同じ企業を条件ごとにスクレイピング・抽出しない）
+            claimed_domains = set()
+
+            results = await asyncio.gather(*[
+                self._run_territory(generator, semaphore, territory, campaign, claimed_domains)
+                for territory in campaign.territories
+            ])
+
+            territory_results = []
+            leads = []
+            for territory, result in zip(campaign.territories, results):
+                territory_results.append({
+                    'industry': territory.industry,
+                    'location': territory.location,
+                    'keywords': territory.keywords,
+                    'success': result.get('success', False),
+                    'leads_count': result.get('leads_count', 0),
+                    'error': result.get('error')
+                })
+                leads.extend(result.get('leads') or [])
+
+            scored_leads = self._deduplicate_leads(leads)
+            logger.info(f"Campaign '{campaign.name}': {len(scored_leads)} unique leads "
+                        f"({len(leads) - len(scored_leads)} duplicates removed)")
+
+            search_info = {
+                'industry': ', '.join(dict.fromkeys(t.industry for t in campaign.territories)),
+                'location': ', '.join(dict.fromkeys(t.location for t in campaign.territories)),
+                'additional_keywords': list(dict.fromkeys(k for t in campaign.territories for k in t.keywords))
+            }
+
+            export_results = {}
+            crm_results = {}
+            if scored_leads:
+                export_results = await generator.exporter.export_formats(
+                    scored_leads, export_formats, search_info, f"{campaign.name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+                )
+                if sync_to_crm:
+                    crm_results = await generator.crm_manager.sync_to_all_crms(scored_leads)
+
+        return {
+            'success': bool(scored_leads),
+            'campaign': campaign.name,
+            'territories': territory_results,
+            'leads_count': len(scored_leads),
+            'duplicates_removed': len(leads) - len(scored_leads),
+            'export_results': export_results,
+            'crm_results': crm_results,
+            'top_leads': [lead.to_dict() for lead in scored_leads[:10]]
+        }
+
+    async def _run_territory(self, generator, semaphore: asyncio.Semaphore, territory: Territory,
+                             campaign: Campaign, claimed_domains: Set[str]) -> Dict:
+        """1つの条件を実行（個別のエクスポートは行わない）"""
+        async with semaphore:
+            logger.info(f"Campaign territory started: {territory.label}")
+            try:
+                result = await generator.generate_leads(
+                    industry=territory.industry,
+                    location=territory.location,
+                    additional_keywords=territory.keywords,
+                    max_results=territory.max_results or campaign.max_results,
+                    export_formats=[],
+                    sync_to_crm=False,
+                    claimed_domains=claimed_domains
+                )
+            except Exception as e:
+                logger.error(f"Campaign territory failed: {territory.label}: {e}", exc_info=True)
+                result = {'success': False, 'error': str(e)}
+
+            logger.info(f"Campaign territory finished: {territory.label} "
+                        f"({result.get('leads_count', 0)} leads, success={result.get('success', False)})")
+            return result
+
+    @staticmethod
+    def _deduplicate_leads(leads: List[Dict]) -> List[ScoredLead]:
+        """
+        条件間で重複したリードを除去（ドメイン単位、スコアの高い方を残す）し、スコア順に並べる
+        """
+        best = {}
+        for lead in leads:
+            key = HistoryManager._extract_domain(lead.get('url') or '') or (lead.get('company_name') or '').strip().lower()
+            if key not in best or lead.get('total_score', 0) > best[key].get('total_score', 0):
+                best[key] = lead
+
+        scored_leads = [ScoredLead.from_dict(lead) for lead in best.values()]
+        scored_leads.sort(key=lambda lead: lead.total_score, reverse=True)
+        return scored_leads
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+チェックポイントストア - 生成処理のステージごとの途中結果をジョブIDごとに保存
+"""
+
+import sqlite3
+import json
+from typing import Any, List, Optional
+from datetime import datetime, timedelta
+from pathlib import Path
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 保存するステージ（実行順）
+CHECKPOINT_STAGES = ('params', 'search', 'scrape', 'extract', 'enhance')
+
+# この日数より前に保存されたチェックポイント（再開されなかった失敗ジョブ）は削除する
+CHECKPOINT_MAX_AGE_DAYS = 7
+
+class CheckpointStore:
+    """
+    SQLiteベースのチェックポイントストア
+
+    検索結果・スクレイピング結果の要約・抽出済み企業・補完済み企業をステージごとに保存し、
+    後段（補完・エクスポートなど）で失敗しても、再開時に完了済みのステージ
+    （特にClaude APIの呼び出し）をやり直さずに済むようにする。
+    ワーカーの複数プロセスから使われるため、操作ごとに接続を開く。
+    """
+
+    def __init__(self, db_path: str = None):
+        if db_path is None:
+            # デフォルトのパス
+            db_path = Path(__file__).parent.parent / "data" / "checkpoints.db"
+
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        """接続を作成"""
+        conn = sqlite3.connect(self.db_path, timeout=30.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _init_db(self):
+        """データベースを初期化"""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS checkpoints (
+                        job_id TEXT NOT NULL,
+                        stage TEXT NOT NULL,
+                        data TEXT NOT NULL,
+                        created_at TEXT NOT NULL,
+                        PRIMARY KEY (job_id, stage)
+                    )
+                """)
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_checkpoints_created_at ON checkpoints(created_at)")
+        finally:
+            conn.close()
+
+    def save(self, job_id: str, stage: str, data: Any):
+        """ステージの結果を保存（同じステージの既存の結果は置き換える）"""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("""
+                    INSERT OR REPLACE INTO checkpoints (job_id, stage, data, created_at)
+                    VALUES (?, ?, ?, ?)
+                """, (job_id, stage, json.dumps(data, ensure_ascii=False, default=str), datetime.now().isoformat()))
+        finally:
+            conn.close()
+
+        logger.debug(f"Saved checkpoint {job_id}/{stage}")
+
+    def load(self, job_id: str, stage: str) -> Optional[Any]:
+        """ステージの結果を取得（未保存の場合はNone）"""
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT data FROM checkpoints WHERE job_id = ? AND stage = ?",
+                               (job_id, stage)).fetchone()
+            return json.loads(row[0]) if row else None
+        finally:
+            conn.close()
+
+    def stages(self, job_id: str) -> List[str]:
+        """保存済みのステージ（実行順）"""
+        conn = self._connect()
+        try:
+            saved = {row[0] for row in conn.execute("SELECT stage FROM checkpoints WHERE job_id = ?", (job_id,))}
+        finally:
+            conn.close()
+        return [stage for stage in CHECKPOINT_STAGES if stage in saved]
+
+    def clear(self, job_id: str) -> int:
+        """
+        ジョブのチェックポイントを削除
+
+        Returns:
+            削除したステージ数
+        """
+        conn = self._connect()
+        try:
+            with conn:
+                return conn.execute("DELETE FROM checkpoints WHERE job_id = ?", (job_id,)).rowcount
+        finally:
+            conn.close()
+
+    def prune(self, max_age_days: float = CHECKPOINT_MAX_AGE_DAYS) -> int:
+        """
+        古いジョブのチェックポイントを削除
+
+        いずれかのステージが期限内に保存されたジョブは、全ステージを残す。
+
+        Returns:
+            削除したステージ数
+        """
+        threshold = (datetime.now() - timedelta(days=max_age_days)).isoformat()
+
+        conn = self._connect()
+        try:
+            with conn:
+                deleted = conn.execute("""
+                    DELETE FROM checkpoints
+                    WHERE job_id IN (
+                        SELECT job_id FROM checkpoints GROUP BY job_id HAVING MAX(created_at) < ?
+                    )
+                """, (threshold,)).rowcount
+        finally:
+            conn.close()
+
+        if deleted:
+            logger.info(f"Pruned {deleted} checkpoints older than {max_age_days} days")
+        return deleted
+
+    def for_job(self, job_id: Optional[str]) -> 'JobCheckpoints':
+        """ジョブ単位の操作用オブジェクト（job_id がNoneの場合は何も保存しない）"""
+        return JobCheckpoints(self if job_id else None, job_id)
+
+class JobCheckpoints:
+    """
+    1つのジョブのチェックポイント
+
+    ストアが無い（チェックポイントを使わずに実行した）場合は、読み込みは常にNone、
+    保存・削除は何もしないため、呼び出し側で分岐せずに使える。
+    空の結果は完了したステージとして扱わない（保存せず、再開時はそのステージをやり直す）。
+    """
+
+    def __init__(self, store: Optional[CheckpointStore], job_id: Optional[str]):
+        self.store = store
+        self.job_id = job_id
+
+    def load(self, stage: str) -> Optional[Any]:
+        if self.store is None:
+            return None
+        return self.store.load(self.job_id, stage) or None
+
+    def save(self, stage: str, data: Any):
+        if self.store is not None and data:
+            self.store.save(self.job_id, stage, data)
+
+    def clear(self):
+        if self.store is not None:
+            self.store.clear(self.job_id)
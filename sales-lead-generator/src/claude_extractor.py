@@ -1,18 +1,24 @@
 import asyncio
 import json
 import logging
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 from anthropic import AsyncAnthropic
 
+import metrics
 from config.config import config
 from models import CompanyInfo, BusinessSize
+from progress import gather_with_progress
 
 logger = logging.getLogger(__name__)
 
+# 抽出プロンプトに含めるページ本文の最大文字数
+PROMPT_CONTENT_LENGTH = 3000
+
 class ClaudeExtractor:
     def __init__(self):
         self.api_key = config.claude.api_key
-        self.client = AsyncAnthropic(api_key=self.api_key) if self.api_key else None
+        self.client = AsyncAnthropic(api_key=self.api_key, base_url=config.claude.base_url) if self.api_key else None
+        self._semaphore = None
         self.extraction_schema = {
             "type": "object",
             "properties": {
@@ -52,23 +58,32 @@ class ClaudeExtractor:
             "required": ["company_name", "confidence_score"]
         }
 
-    async def extract_company_info_batch(self, scraped_data: List[Dict[str, str]]) -> List[CompanyInfo]:
+    async def extract_company_info_batch(self, scraped_data: List[Dict[str, str]],
+                                         progress_callback: Optional[Callable[[int, int], None]] = None) -> List[CompanyInfo]:
         """
         複数のスクレイピングデータから会社情報を一括抽出
+
+        Args:
+            progress_callback: 1件完了するごとに (完了数, 総数) で呼ばれる
         """
         # Claude APIキーがない場合はスクレイピングデータから基本情報のみ抽出
         if not self.client:
             logger.warning("Claude API key not configured - using basic extraction from scraped data")
-            return self._extract_from_scraped_data_only(scraped_data)
-
-        semaphore = asyncio.Semaphore(5)  # Claude APIの同時リクエスト数制限
+            company_infos = self._extract_from_scraped_data_only(scraped_data)
+            if progress_callback:
+                progress_callback(len(scraped_data), len(scraped_data))
+            return company_infos
+
+        # Claude APIの同時リクエスト数制限（同じ抽出器を使う全ての呼び出しで共有）
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(config.claude.max_concurrent_requests)
         tasks = []
 
         for data in scraped_data:
-            task = self._extract_single_company(semaphore, data)
+            task = self._extract_single_company(self._semaphore, data)
             tasks.append(task)
 
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        results = await gather_with_progress(tasks, progress_callback, return_exceptions=True)
 
         company_infos = []
         for i, result in enumerate(results):
@@ -97,7 +112,8 @@ class ClaudeExtractor:
                     contact_email=data.get('emails', [''])[0] if data.get('emails') else '',
                     phone='',
                     additional_emails=data.get('emails', []),
-                    social_media={}
+                    social_media={},
+                    is_wordpress=data.get('is_wordpress', False)
                 )
                 company_infos.append(company_info)
             except Exception as e:
@@ -115,10 +131,29 @@ class ClaudeExtractor:
                 prompt = self._build_extraction_prompt(data)
 
                 # Claude APIを呼び出し
+                message = await self._create_message('extract', prompt)
+
+                # レスポンスをパース
+                response_text = message.content[0].text
+                extracted_data = self._parse_claude_response(response_text)
+
+                if extracted_data and extracted_data.get('confidence_score', 0) > 0.3:
+                    return self._create_company_info(data['url'], extracted_data,
+                                                     is_wordpress=data.get('is_wordpress', False))
+
+            except Exception as e:
+                logger.error(f"Claude extraction error for {data.get('url', 'unknown')}: {e}")
+                return None
+
+    async def _create_message(self, operation: str, prompt: str):
+        """
+        Claude APIを呼び出し、所要時間・入出力トークン数を計測値に記録
+        """
+        try:
+            with metrics.timer('llm_latency_seconds', operation=operation):
                 message = await self.client.messages.create(
                     model=config.claude.model,
                     max_tokens=config.claude.max_tokens,
-                    temperature=config.claude.temperature,
                     messages=[
                         {
                             "role": "user",
@@ -126,23 +161,24 @@ class ClaudeExtractor:
                         }
                     ]
                 )
+        except Exception:
+            metrics.inc('llm_requests_total', operation=operation, status='error')
+            raise
 
-                # レスポンスをパース
-                response_text = message.content[0].text
-                extracted_data = self._parse_claude_response(response_text)
-
-                if extracted_data and extracted_data.get('confidence_score', 0) > 0.3:
-                    return self._create_company_info(data['url'], extracted_data)
+        metrics.inc('llm_requests_total', operation=operation, status='ok')
+        usage = getattr(message, 'usage', None)
+        for token_type in ('input', 'output'):
+            tokens = getattr(usage, f'{token_type}_tokens', None)
+            if isinstance(tokens, int):
+                metrics.observe('llm_tokens_per_request', tokens, operation=operation, type=token_type)
 
-            except Exception as e:
-                logger.error(f"Claude extraction error for {data.get('url', 'unknown')}: {e}")
-                return None
+        return message
 
     def _build_extraction_prompt(self, data: Dict[str, str]) -> str:
         """
         Claude用の抽出プロンプトを構築
         """
-        content = data.get('content', '')[:3000]  # コンテンツを制限
+        content = data.get('content', '')[:PROMPT_CONTENT_LENGTH]  # コンテンツを制限
         title = data.get('title', '')
         description = data.get('description', '')
 
@@ -201,7 +237,7 @@ URL: {data.get('url', '')}
             logger.debug(f"Response text: {response_text}")
             return None
 
-    def _create_company_info(self, url: str, extracted_data: Dict) -> CompanyInfo:
+    def _create_company_info(self, url: str, extracted_data: Dict, is_wordpress: bool = False) -> CompanyInfo:
         """
         抽出データからCompanyInfoオブジェクトを作成
         """
@@ -222,7 +258,8 @@ URL: {data.get('url', '')}
             industry=extracted_data.get('industry'),
             business_size=business_size,
             additional_emails=extracted_data.get('additional_emails', []),
-            social_media=extracted_data.get('social_media', {})
+            social_media=extracted_data.get('social_media', {}),
+            is_wordpress=is_wordpress
         )
 
     async def enhance_company_info(self, company: CompanyInfo, additional_data: str) -> CompanyInfo:
@@ -249,23 +286,13 @@ URL: {data.get('url', '')}
 レスポンスは有効なJSONのみを返してください。
 """
 
-            message = await self.client.messages.create(
-                model=config.claude.model,
-                max_tokens=config.claude.max_tokens,
-                temperature=config.claude.temperature,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
-            )
+            message = await self._create_message('enhance', prompt)
 
             response_text = message.content[0].text
             enhanced_data = self._parse_claude_response(response_text)
 
             if enhanced_data:
-                return self._create_company_info(company.url, enhanced_data)
+                return self._create_company_info(company.url, enhanced_data, is_wordpress=company.is_wordpress)
 
         except Exception as e:
             logger.error(f"Error enhancing company info: {e}")
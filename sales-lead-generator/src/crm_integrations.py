@@ -1,48 +1,149 @@
 import asyncio
 import aiohttp
 import logging
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Callable
 from urllib.parse import urljoin
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
 import json
+import time
 
 from config.config import config
 from models import ScoredLead
+from scorer import lead_priority, SALESFORCE_RATINGS
+from crm_outbox import CRMOutbox
 
 logger = logging.getLogger(__name__)
 
+SALESFORCE_API_VERSION = "v54.0"
+
+# 1回のSOQLのIN句に含める企業名の数（URL長の上限対策）
+SALESFORCE_SOQL_IN_CHUNK = 100
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Retry-After ヘッダー（秒数またはHTTP日付）を待機秒数に変換
+
+    解釈できない場合はNone（呼び出し側で指数バックオフにする）
+    """
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        # HTTP日付は常にGMT
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(retry_at.timestamp() - time.time(), 0.0)
+
 class CRMIntegrationManager:
-    def __init__(self):
+    def __init__(self, outbox: CRMOutbox = None):
         self.config = config.crm
+        self._outbox = outbox
 
-    async def sync_to_all_crms(self, scored_leads: List[ScoredLead]) -> Dict[str, Dict]:
+    @property
+    def outbox(self) -> CRMOutbox:
+        """送信アウトボックス（初回アクセス時に作成）"""
+        if self._outbox is None:
+            self._outbox = CRMOutbox()
+        return self._outbox
+
+    def _configured_crms(self) -> Dict[str, Callable]:
         """
-        全てのCRMに同期
+        設定済みのCRMと同期関数の対応
         """
-        results = {}
+        crms = {}
 
-        # HubSpot
         if self.config.hubspot_api_key:
-            hubspot_result = await self._sync_to_hubspot(scored_leads)
-            results['hubspot'] = hubspot_result
+            crms['hubspot'] = self._sync_to_hubspot
 
-        # Salesforce
         if (self.config.salesforce_client_id and self.config.salesforce_client_secret):
-            salesforce_result = await self._sync_to_salesforce(scored_leads)
-            results['salesforce'] = salesforce_result
+            crms['salesforce'] = self._sync_to_salesforce
 
-        # Zoho
         if (self.config.zoho_client_id and self.config.zoho_client_secret):
-            zoho_result = await self._sync_to_zoho(scored_leads)
-            results['zoho'] = zoho_result
+            crms['zoho'] = self._sync_to_zoho
+
+        return crms
+
+    async def sync_to_all_crms(self, scored_leads: List[ScoredLead]) -> Dict[str, Dict]:
+        """
+        全てのCRMに同期
+
+        リードをCRMごとにアウトボックスへ登録してから、全CRMへ並列に送信する。
+        送信済みのリードは冪等性キーにより再登録されないため、再実行しても再送されない。
+        """
+        crms = self._configured_crms()
+
+        for crm_name in crms:
+            queued = self.outbox.enqueue(crm_name, scored_leads)
+            logger.info(f"Queued {queued} leads for {crm_name}")
+
+        return await self.drain_outbox(crms)
 
-        return results
+    async def drain_outbox(self, crms: Optional[Dict] = None) -> Dict[str, Dict]:
+        """
+        アウトボックスの送信待ち・再試行待ちを全CRMへ並列に送信
+        """
+        if crms is None:
+            crms = self._configured_crms()
+
+        results = await asyncio.gather(*[
+            self._deliver(crm_name, sync_func) for crm_name, sync_func in crms.items()
+        ])
+        return dict(zip(crms, results))
+
+    async def _deliver(self, crm_name: str, sync_func: Callable) -> Dict:
+        """
+        1つのCRMについて送信対象を取得・送信し、結果をアウトボックスに記録
+        """
+        claimed = self.outbox.claim_pending(crm_name)
+        if not claimed:
+            return {"success": True, "created": 0, "errors": [], "outbox": self.outbox.get_counts(crm_name)}
+
+        keys_by_url = {lead.company.url: key for key, lead in claimed}
+        result = await sync_func([lead for _, lead in claimed])
+
+        sent = []
+        failed = []
+        records = result.get('records')
+
+        if records is None:
+            # リード単位の結果を返さないクライアントは全体の成否で記録する
+            if result.get('success') and not result.get('errors'):
+                sent = [(key, None) for key, _ in claimed]
+            else:
+                error = result.get('error') or '; '.join(result.get('errors', [])) or 'Unknown error'
+                failed = [(key, error) for key, _ in claimed]
+        else:
+            for record in records:
+                key = keys_by_url.pop(record['url'], None)
+                if key is None:
+                    continue
+                if record['status'] == 'error':
+                    failed.append((key, record['error']))
+                else:
+                    sent.append((key, record['id']))
+
+            failed.extend((key, 'No result returned') for key in keys_by_url.values())
+
+        self.outbox.record_results(sent, failed)
+
+        result['outbox'] = self.outbox.get_counts(crm_name)
+        return result
 
     async def _sync_to_hubspot(self, scored_leads: List[ScoredLead]) -> Dict:
         """
         HubSpotにデータを同期
         """
         try:
-            hubspot_client = HubSpotClient(self.config.hubspot_api_key)
+            hubspot_client = HubSpotClient(self.config.hubspot_api_key, base_url=self.config.hubspot_base_url)
             return await hubspot_client.create_companies(scored_leads)
         except Exception as e:
             logger.error(f"HubSpot sync error: {e}")
@@ -57,9 +158,12 @@ class CRMIntegrationManager:
                 self.config.salesforce_client_id,
                 self.config.salesforce_client_secret,
                 self.config.salesforce_username,
-                self.config.salesforce_password
+                self.config.salesforce_password,
+                login_url=self.config.salesforce_login_url
             )
-            await salesforce_client.authenticate()
+            if not await salesforce_client.authenticate():
+                await salesforce_client.close()
+                return {"error": "Salesforce authentication failed", "success": False}
             return await salesforce_client.create_leads(scored_leads)
         except Exception as e:
             logger.error(f"Salesforce sync error: {e}")
@@ -81,9 +185,14 @@ class CRMIntegrationManager:
             return {"error": str(e), "success": False}
 
 class HubSpotClient:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, base_url: str = None, batch_size: int = None,
+                 max_concurrency: int = None, max_retries: int = None):
         self.api_key = api_key
-        self.base_url = "https://api.hubapi.com"
+        self.base_url = (base_url or config.crm.hubspot_base_url).rstrip('/')
+        # HubSpotのバッチAPIは1リクエスト100件まで
+        self.batch_size = min(batch_size or config.crm.hubspot_batch_size, 100)
+        self.max_retries = max_retries if max_retries is not None else config.crm.max_retries
+        self.semaphore = asyncio.Semaphore(max_concurrency or config.crm.hubspot_max_concurrency)
         self.session = None
 
     async def __aenter__(self):
@@ -96,124 +205,222 @@ class HubSpotClient:
 
     async def create_companies(self, scored_leads: List[ScoredLead]) -> Dict:
         """
-        HubSpotに企業を作成
+        HubSpotに企業を一括作成・更新
+
+        ドメインの一括検索で既存企業を解決し、バッチ作成・更新APIで
+        最大100件ずつ書き込む。チャンクは同時実行数を制限して並列に処理する。
         """
         if not self.session:
             self.session = aiohttp.ClientSession()
 
-        created = 0
-        updated = 0
-        errors = []
+        records = []
+        unique_leads = []
+        seen_keys = set()
 
+        # 同一ドメインのリードは1件にまとめる（重複作成を防ぐ）
         for lead in scored_leads:
-            try:
-                # 既存企業をチェック
-                existing_company = await self._find_company_by_domain(lead.company.url)
-
-                if existing_company:
-                    # 更新
-                    result = await self._update_company(existing_company['id'], lead)
-                    if result:
-                        updated += 1
-                else:
-                    # 新規作成
-                    result = await self._create_company(lead)
-                    if result:
-                        created += 1
+            key = self._extract_domain(lead.company.url) or lead.company.company_name
+            if key in seen_keys:
+                records.append(self._record(lead, 'skipped', error='Duplicate domain in batch'))
+                continue
+            seen_keys.add(key)
+            unique_leads.append(lead)
 
-            except Exception as e:
-                errors.append(f"Error with {lead.company.company_name}: {str(e)}")
+        chunks = [unique_leads[i:i + self.batch_size] for i in range(0, len(unique_leads), self.batch_size)]
 
-        await self.session.close()
+        try:
+            chunk_results = await asyncio.gather(*[self._sync_chunk(chunk) for chunk in chunks])
+        finally:
+            await self.session.close()
+
+        for chunk_records in chunk_results:
+            records.extend(chunk_records)
+
+        errors = [
+            f"Error with {record['company_name']}: {record['error']}"
+            for record in records if record['status'] == 'error'
+        ]
 
         return {
             "success": True,
-            "created": created,
-            "updated": updated,
-            "errors": errors
+            "created": sum(1 for record in records if record['status'] == 'created'),
+            "updated": sum(1 for record in records if record['status'] == 'updated'),
+            "errors": errors,
+            "records": records
         }
 
-    async def _find_company_by_domain(self, url: str) -> Optional[Dict]:
+    async def _sync_chunk(self, leads: List[ScoredLead]) -> List[Dict]:
         """
-        ドメインで企業を検索
+        1チャンク分のリードを検索・作成・更新
         """
-        if not url:
-            return None
-
-        domain = self._extract_domain(url)
-        if not domain:
-            return None
-
-        search_url = f"{self.base_url}/crm/v3/objects/companies/search"
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-
-        search_data = {
-            "filterGroups": [
-                {
-                    "filters": [
-                        {
-                            "propertyName": "domain",
-                            "operator": "EQ",
-                            "value": domain
-                        }
-                    ]
-                }
-            ]
-        }
-
         try:
-            async with self.session.post(search_url, headers=headers, json=search_data) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    if data.get('results'):
-                        return data['results'][0]
+            domains = [domain for domain in (self._extract_domain(lead.company.url) for lead in leads) if domain]
+            existing_ids = await self._find_companies_by_domains(domains)
         except Exception as e:
             logger.error(f"HubSpot search error: {e}")
+            return [self._record(lead, 'error', error=str(e)) for lead in leads]
+
+        to_create = []
+        to_update = []
+        for lead in leads:
+            company_id = existing_ids.get(self._extract_domain(lead.company.url))
+            if company_id:
+                to_update.append((company_id, lead))
+            else:
+                to_create.append(lead)
+
+        records = []
+        if to_create:
+            records.extend(await self._batch_create(to_create))
+        if to_update:
+            records.extend(await self._batch_update(to_update))
+
+        return records
+
+    async def _find_companies_by_domains(self, domains: List[str]) -> Dict[str, str]:
+        """
+        ドメインのリストで既存企業を一括検索
 
-        return None
-
-    async def _create_company(self, lead: ScoredLead) -> bool:
+        Returns:
+            ドメイン -> 企業IDの辞書
         """
-        新規企業を作成
+        if not domains:
+            return {}
+
+        existing = {}
+        after = None
+
+        while True:
+            search_data = {
+                "filterGroups": [
+                    {
+                        "filters": [
+                            {
+                                "propertyName": "domain",
+                                "operator": "IN",
+                                "values": domains
+                            }
+                        ]
+                    }
+                ],
+                "properties": ["domain"],
+                "limit": 100
+            }
+            if after:
+                search_data["after"] = after
+
+            status, data = await self._request('POST', '/crm/v3/objects/companies/search', search_data)
+            if status != 200:
+                raise RuntimeError(f"Search failed with HTTP {status}")
+
+            for result in data.get('results', []):
+                domain = (result.get('properties') or {}).get('domain')
+                if domain and domain not in existing:
+                    existing[domain] = result['id']
+
+            after = (data.get('paging') or {}).get('next', {}).get('after')
+            if not after:
+                return existing
+
+    async def _batch_create(self, leads: List[ScoredLead]) -> List[Dict]:
         """
-        create_url = f"{self.base_url}/crm/v3/objects/companies"
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-
-        properties = self._convert_to_hubspot_properties(lead)
-        company_data = {"properties": properties}
+        バッチ作成APIで新規企業を作成
+        """
+        inputs = [{"properties": self._convert_to_hubspot_properties(lead)} for lead in leads]
 
         try:
-            async with self.session.post(create_url, headers=headers, json=company_data) as response:
-                return response.status == 201
+            status, data = await self._request('POST', '/crm/v3/objects/companies/batch/create', {"inputs": inputs})
         except Exception as e:
             logger.error(f"HubSpot create error: {e}")
-            return False
+            return [self._record(lead, 'error', error=str(e)) for lead in leads]
+
+        if status not in (200, 201, 207):
+            return [self._record(lead, 'error', error=f"HTTP {status}") for lead in leads]
+
+        # 作成結果はドメイン（無ければ会社名）で入力と照合する
+        created_ids = {}
+        for result in data.get('results', []):
+            properties = result.get('properties') or {}
+            created_ids[properties.get('domain') or properties.get('name')] = result.get('id')
+
+        records = []
+        for lead, payload in zip(leads, inputs):
+            properties = payload['properties']
+            company_id = created_ids.get(properties['domain'] or properties['name'])
+            if company_id:
+                records.append(self._record(lead, 'created', company_id=company_id))
+            else:
+                records.append(self._record(lead, 'error', error='Not created by batch request'))
+        return records
+
+    async def _batch_update(self, updates: List[tuple]) -> List[Dict]:
+        """
+        バッチ更新APIで既存企業を更新
+        """
+        inputs = [
+            {"id": company_id, "properties": self._convert_to_hubspot_properties(lead)}
+            for company_id, lead in updates
+        ]
 
-    async def _update_company(self, company_id: str, lead: ScoredLead) -> bool:
+        try:
+            status, data = await self._request('POST', '/crm/v3/objects/companies/batch/update', {"inputs": inputs})
+        except Exception as e:
+            logger.error(f"HubSpot update error: {e}")
+            return [self._record(lead, 'error', error=str(e)) for _, lead in updates]
+
+        if status not in (200, 207):
+            return [self._record(lead, 'error', error=f"HTTP {status}") for _, lead in updates]
+
+        updated_ids = {str(result.get('id')) for result in data.get('results', [])}
+        return [
+            self._record(lead, 'updated', company_id=company_id) if str(company_id) in updated_ids
+            else self._record(lead, 'error', error='Not updated by batch request')
+            for company_id, lead in updates
+        ]
+
+    async def _request(self, method: str, path: str, payload: Dict) -> tuple:
         """
-        既存企業を更新
+        同時実行数とレート制限（429 / Retry-After）を考慮してAPIを呼び出す
+
+        Returns:
+            (HTTPステータス, レスポンスJSON)
         """
-        update_url = f"{self.base_url}/crm/v3/objects/companies/{company_id}"
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
 
-        properties = self._convert_to_hubspot_properties(lead)
-        company_data = {"properties": properties}
-
-        try:
-            async with self.session.patch(update_url, headers=headers, json=company_data) as response:
-                return response.status == 200
-        except Exception as e:
-            logger.error(f"HubSpot update error: {e}")
-            return False
+        for attempt in range(self.max_retries + 1):
+            async with self.semaphore:
+                async with self.session.request(method, f"{self.base_url}{path}", headers=headers, json=payload) as response:
+                    if response.status == 429 or response.status >= 500:
+                        retry_after = response.headers.get('Retry-After')
+                        status = response.status
+                    else:
+                        data = await response.json(content_type=None) if response.content_length != 0 else {}
+                        return response.status, data or {}
+
+            if attempt == self.max_retries:
+                return status, {}
+
+            wait_time = parse_retry_after(retry_after)
+            if wait_time is None:
+                wait_time = config.crm.retry_delay * (2 ** attempt)
+            logger.warning(f"HubSpot HTTP {status}, retrying in {wait_time:.1f}s")
+            await asyncio.sleep(wait_time)
+
+    @staticmethod
+    def _record(lead: ScoredLead, status: str, company_id: str = None, error: str = None) -> Dict:
+        """
+        リード単位の同期結果を作成
+        """
+        return {
+            "company_name": lead.company.company_name,
+            "url": lead.company.url,
+            "status": status,
+            "id": company_id,
+            "error": error
+        }
 
     def _convert_to_hubspot_properties(self, lead: ScoredLead) -> Dict[str, str]:
         """
@@ -248,11 +455,16 @@ class HubSpotClient:
         return None
 
 class SalesforceClient:
-    def __init__(self, client_id: str, client_secret: str, username: str, password: str):
+    def __init__(self, client_id: str, client_secret: str, username: str, password: str,
+                 login_url: str = None, batch_size: int = None):
         self.client_id = client_id
         self.client_secret = client_secret
         self.username = username
         self.password = password
+        self.login_url = (login_url or config.crm.salesforce_login_url).rstrip('/')
+        # sObject Collections APIは1リクエスト200件まで
+        self.batch_size = min(batch_size or config.crm.salesforce_batch_size, 200)
+        self.api_path = f"/services/data/{SALESFORCE_API_VERSION}"
         self.access_token = None
         self.instance_url = None
         self.session = None
@@ -263,7 +475,7 @@ class SalesforceClient:
         """
         self.session = aiohttp.ClientSession()
 
-        auth_url = "https://login.salesforce.com/services/oauth2/token"
+        auth_url = f"{self.login_url}/services/oauth2/token"
         auth_data = {
             "grant_type": "password",
             "client_id": self.client_id,
@@ -286,10 +498,32 @@ class SalesforceClient:
             logger.error(f"Salesforce auth error: {e}")
             return False
 
-    async def create_leads(self, scored_leads: List[ScoredLead]) -> Dict:
+    async def close(self):
+        """
+        HTTPセッションを閉じる（認証前・認証失敗時は何もしない）
+        """
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def create_leads(self, scored_leads: List[ScoredLead], bulk: bool = True) -> Dict:
         """
         Salesforceにリードを作成
+
+        Args:
+            bulk: Trueの場合は一括モード（SOQL一括照会 + sObject Collections）で作成
         """
+        if self.access_token is None:
+            # 未認証のまま送信すると全件 401 になるため、送信せずにエラーを返す
+            await self.close()
+            return {"success": False, "created": 0, "errors": [], "error": "Salesforce is not authenticated"}
+
+        if bulk:
+            try:
+                return await self._create_leads_bulk(scored_leads)
+            finally:
+                await self.close()
+
         created = 0
         errors = []
 
@@ -308,7 +542,7 @@ class SalesforceClient:
             except Exception as e:
                 errors.append(f"Error with {lead.company.company_name}: {str(e)}")
 
-        await self.session.close()
+        await self.close()
 
         return {
             "success": True,
@@ -316,18 +550,145 @@ class SalesforceClient:
             "errors": errors
         }
 
+    async def _create_leads_bulk(self, scored_leads: List[ScoredLead]) -> Dict:
+        """
+        既存リードを一括照会し、残りをsObject Collectionsでチャンク単位に作成
+        """
+        records = []
+        to_create = []
+
+        existing_companies = await self._find_existing_companies(
+            list({lead.company.company_name for lead in scored_leads})
+        )
+
+        seen_companies = set()
+        for lead in scored_leads:
+            company_name = lead.company.company_name
+            if company_name in existing_companies:
+                records.append(self._record(lead, 'skipped', error='Lead already exists'))
+            elif company_name in seen_companies:
+                records.append(self._record(lead, 'skipped', error='Duplicate company in batch'))
+            else:
+                seen_companies.add(company_name)
+                to_create.append(lead)
+
+        for i in range(0, len(to_create), self.batch_size):
+            records.extend(await self._create_lead_collection(to_create[i:i + self.batch_size]))
+
+        errors = [
+            f"Error with {record['company_name']}: {record['error']}"
+            for record in records if record['status'] == 'error'
+        ]
+
+        return {
+            "success": True,
+            "created": sum(1 for record in records if record['status'] == 'created'),
+            "skipped": sum(1 for record in records if record['status'] == 'skipped'),
+            "errors": errors,
+            "records": records
+        }
+
+    async def _find_existing_companies(self, company_names: List[str]) -> set:
+        """
+        企業名のリストで既存リードを一括照会（IN句のSOQLをチャンク単位で実行）
+
+        Returns:
+            既存リードの企業名のセット
+        """
+        existing = set()
+        if not self.access_token or not company_names:
+            return existing
+
+        headers = {"Authorization": f"Bearer {self.access_token}"}
+
+        for i in range(0, len(company_names), SALESFORCE_SOQL_IN_CHUNK):
+            chunk = company_names[i:i + SALESFORCE_SOQL_IN_CHUNK]
+            names = ", ".join(self._soql_quote(name) for name in chunk)
+            query = f"SELECT Company FROM Lead WHERE Company IN ({names})"
+
+            url = f"{self.instance_url}{self.api_path}/query/"
+            params = {"q": query}
+
+            # 結果が多い場合は nextRecordsUrl を辿る
+            while url:
+                async with self.session.get(url, headers=headers, params=params) as response:
+                    if response.status != 200:
+                        raise RuntimeError(f"SOQL query failed with HTTP {response.status}")
+                    data = await response.json()
+
+                existing.update(record.get('Company') for record in data.get('records', []))
+                next_url = data.get('nextRecordsUrl')
+                url = f"{self.instance_url}{next_url}" if next_url else None
+                params = None
+
+        return existing
+
+    async def _create_lead_collection(self, leads: List[ScoredLead]) -> List[Dict]:
+        """
+        sObject Collections APIで最大200件のリードを作成
+        """
+        create_url = f"{self.instance_url}{self.api_path}/composite/sobjects"
+        headers = {
+            "Authorization": f"Bearer {self.access_token}",
+            "Content-Type": "application/json"
+        }
+        payload = {
+            "allOrNone": False,
+            "records": [
+                {"attributes": {"type": "Lead"}, **self._convert_to_salesforce_lead(lead)}
+                for lead in leads
+            ]
+        }
+
+        try:
+            async with self.session.post(create_url, headers=headers, json=payload) as response:
+                if response.status != 200:
+                    return [self._record(lead, 'error', error=f"HTTP {response.status}") for lead in leads]
+                results = await response.json()
+        except Exception as e:
+            logger.error(f"Salesforce create error: {e}")
+            return [self._record(lead, 'error', error=str(e)) for lead in leads]
+
+        # レスポンスは送信したレコードと同じ順序で返る
+        records = []
+        for lead, result in zip(leads, results):
+            if result.get('success'):
+                records.append(self._record(lead, 'created', lead_id=result.get('id')))
+            else:
+                messages = "; ".join(error.get('message', '') for error in result.get('errors', []))
+                records.append(self._record(lead, 'error', error=messages or 'Unknown error'))
+        return records
+
+    @staticmethod
+    def _soql_quote(value: str) -> str:
+        """SOQLの文字列リテラルとしてエスケープ"""
+        return "'" + value.replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+    @staticmethod
+    def _record(lead: ScoredLead, status: str, lead_id: str = None, error: str = None) -> Dict:
+        """
+        リード単位の同期結果を作成
+        """
+        return {
+            "company_name": lead.company.company_name,
+            "url": lead.company.url,
+            "status": status,
+            "id": lead_id,
+            "error": error
+        }
+
     async def _find_lead_by_company(self, company_name: str) -> Optional[Dict]:
         """企業名でリードを検索"""
         if not self.access_token:
             return None
 
-        query = f"SELECT Id FROM Lead WHERE Company = '{company_name}' LIMIT 1"
-        query_url = f"{self.instance_url}/services/data/v54.0/query/?q={query}"
+        query = f"SELECT Id FROM Lead WHERE Company = {self._soql_quote(company_name)} LIMIT 1"
+        query_url = f"{self.instance_url}{self.api_path}/query/"
 
         headers = {"Authorization": f"Bearer {self.access_token}"}
 
         try:
-            async with self.session.get(query_url, headers=headers) as response:
+            async with self.session.get(query_url, headers=headers, params={"q": query}) as response:
                 if response.status == 200:
                     data = await response.json()
                     if data.get('records'):
@@ -339,7 +700,7 @@ class SalesforceClient:
 
     async def _create_lead(self, lead: ScoredLead) -> bool:
         """リードを作成"""
-        create_url = f"{self.instance_url}/services/data/v54.0/sobjects/Lead/"
+        create_url = f"{self.instance_url}{self.api_path}/sobjects/Lead/"
         headers = {
             "Authorization": f"Bearer {self.access_token}",
             "Content-Type": "application/json"
@@ -364,7 +725,7 @@ class SalesforceClient:
             "Industry": lead.company.industry,
             "Description": lead.company.description,
             "Status": "New",
-            "Rating": "Hot" if lead.total_score >= 8.0 else "Warm" if lead.total_score >= 5.0 else "Cold",
+            "Rating": SALESFORCE_RATINGS[lead_priority(lead.total_score)],
             "LeadSource": "Sales Lead Generator"
         }
 
@@ -386,5 +747,3 @@ class ZohoCRMClient:
         """Zoho CRMにリードを作成"""
         # 実装は他のCRMと同様のパターン
         return {"success": True, "created": 0, "errors": ["Not implemented"]}
-
-from datetime import datetime
\ No newline at end of file
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+CRM送信アウトボックス - リードとCRMの組ごとの送信状態を永続化
+"""
+
+import sqlite3
+import json
+import hashlib
+from typing import List, Dict, Optional, Tuple
+from datetime import datetime, timedelta
+from pathlib import Path
+import logging
+
+from config.config import config
+from models import ScoredLead
+
+logger = logging.getLogger(__name__)
+
+class CRMOutbox:
+    """
+    リード -> CRM の送信待ちを管理するアウトボックス
+
+    各送信は冪等性キー（CRM名 + URL）で一意に管理され、送信済みのリードは
+    再実行時に再送されない。送信中にクラッシュした場合は、リース期限切れ後に
+    再び送信対象となる。
+    """
+
+    def __init__(self, db_path: str = None, max_attempts: int = None, lease_seconds: int = 600):
+        if db_path is None:
+            # デフォルトのパス
+            db_path = Path(__file__).parent.parent / "data" / "crm_outbox.db"
+
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_attempts = max_attempts or config.crm.outbox_max_attempts
+        self.lease_seconds = lease_seconds
+        self._init_db()
+
+    def _init_db(self):
+        """データベースを初期化"""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS crm_outbox (
+                    idempotency_key TEXT PRIMARY KEY,
+                    crm TEXT NOT NULL,
+                    lead_url TEXT,
+                    company_name TEXT,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    remote_id TEXT,
+                    next_attempt_at TEXT,
+                    claimed_at TEXT,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+            """)
+
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_outbox_crm_status ON crm_outbox(crm, status)
+            """)
+
+            conn.commit()
+
+    @staticmethod
+    def make_idempotency_key(crm: str, lead: ScoredLead) -> str:
+        """CRM名とリードのURL（無ければ会社名）から冪等性キーを生成"""
+        identity = (lead.company.url or lead.company.company_name).strip().lower().rstrip('/')
+        return hashlib.sha256(f"{crm}:{identity}".encode('utf-8')).hexdigest()
+
+    def enqueue(self, crm: str, scored_leads: List[ScoredLead]) -> int:
+        """
+        リードを送信待ちに追加（既に登録済みのリードは無視）
+
+        Returns:
+            新たに追加された件数
+        """
+        now = datetime.now().isoformat()
+        rows = [
+            (
+                self.make_idempotency_key(crm, lead),
+                crm,
+                lead.company.url,
+                lead.company.company_name,
+                json.dumps(lead.to_dict(), ensure_ascii=False),
+                now,
+                now
+            )
+            for lead in scored_leads
+        ]
+
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.executemany("""
+                INSERT OR IGNORE INTO crm_outbox
+                (idempotency_key, crm, lead_url, company_name, payload, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+            conn.commit()
+            return cursor.rowcount
+
+    def claim_pending(self, crm: str, limit: Optional[int] = None) -> List[Tuple[str, ScoredLead]]:
+        """
+        送信対象のリードを取得し、送信中としてマーク
+
+        送信待ち・再試行時刻が到来した失敗分・リースが切れた送信中（クラッシュ時）の
+        レコードが対象。試行回数は取得時に加算するため、クラッシュを繰り返しても
+        最大試行回数を超えて再送されることはない。
+
+        Returns:
+            (冪等性キー, リード) のリスト
+        """
+        now = datetime.now().isoformat()
+        lease_expired = (datetime.now() - timedelta(seconds=self.lease_seconds)).isoformat()
+
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute("""
+                SELECT idempotency_key, payload FROM crm_outbox
+                WHERE crm = ?
+                  AND attempts < ?
+                  AND (
+                      status = 'pending'
+                      OR (status = 'failed' AND (next_attempt_at IS NULL OR next_attempt_at <= ?))
+                      OR (status = 'in_flight' AND claimed_at <= ?)
+                  )
+                ORDER BY created_at
+                LIMIT ?
+            """, (crm, self.max_attempts, now, lease_expired, limit or -1)).fetchall()
+
+            conn.executemany("""
+                UPDATE crm_outbox
+                SET status = 'in_flight', attempts = attempts + 1, claimed_at = ?, updated_at = ?
+                WHERE idempotency_key = ?
+            """, [(now, now, key) for key, _ in rows])
+            conn.commit()
+
+        return [(key, ScoredLead.from_dict(json.loads(payload))) for key, payload in rows]
+
+    def record_results(self, sent: List[Tuple[str, Optional[str]]], failed: List[Tuple[str, str]]):
+        """
+        送信結果を1トランザクションで記録
+
+        Args:
+            sent: (冪等性キー, CRM側のID) のリスト
+            failed: (冪等性キー, エラーメッセージ) のリスト。
+                    次回の試行時刻は試行回数に応じた指数バックオフで設定する
+        """
+        now = datetime.now()
+
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executemany("""
+                UPDATE crm_outbox
+                SET status = 'sent', remote_id = ?, last_error = NULL, updated_at = ?
+                WHERE idempotency_key = ?
+            """, [(remote_id, now.isoformat(), key) for key, remote_id in sent])
+
+            rows = []
+            for key, error in failed:
+                row = conn.execute("SELECT attempts FROM crm_outbox WHERE idempotency_key = ?", (key,)).fetchone()
+                delay = config.crm.retry_delay * (2 ** (row[0] if row else 0))
+                rows.append((error, (now + timedelta(seconds=delay)).isoformat(), now.isoformat(), key))
+
+            conn.executemany("""
+                UPDATE crm_outbox
+                SET status = 'failed', last_error = ?, next_attempt_at = ?, updated_at = ?
+                WHERE idempotency_key = ?
+            """, rows)
+            conn.commit()
+
+    def get_counts(self, crm: Optional[str] = None) -> Dict[str, int]:
+        """
+        送信状態ごとの件数を取得
+        """
+        query = "SELECT status, COUNT(*) FROM crm_outbox"
+        params = ()
+        if crm:
+            query += " WHERE crm = ?"
+            params = (crm,)
+        query += " GROUP BY status"
+
+        with sqlite3.connect(self.db_path) as conn:
+            return {status: count for status, count in conn.execute(query, params)}
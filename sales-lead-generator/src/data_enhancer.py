@@ -1,6 +1,7 @@
 import asyncio
 import re
-from typing import List, Dict, Optional, Set
+from contextlib import asynccontextmanager
+from typing import Callable, List, Dict, Optional, Set
 from urllib.parse import urlparse
 import tldextract
 import logging
@@ -12,20 +13,26 @@ from claude_extractor import ClaudeExtractor
 logger = logging.getLogger(__name__)
 
 class DataEnhancer:
-    def __init__(self):
-        self.claude_extractor = ClaudeExtractor()
+    def __init__(self, claude_extractor: Optional[ClaudeExtractor] = None, scraper: Optional[WebScraper] = None):
+        # 呼び出し元のクライアントを共有できる（Anthropicクライアント・HTTPセッションを使い回す）
+        self.claude_extractor = claude_extractor or ClaudeExtractor()
+        self.scraper = scraper
         self.common_email_prefixes = [
             'info', 'contact', 'inquiry', 'support', 'sales', 'hello',
             'admin', 'office', 'general', 'mail', 'ask'
         ]
 
-    async def enhance_companies(self, companies: List[CompanyInfo]) -> List[CompanyInfo]:
+    async def enhance_companies(self, companies: List[CompanyInfo],
+                                progress_callback: Optional[Callable[[int, int], None]] = None) -> List[CompanyInfo]:
         """
         会社情報を一括で強化する
+
+        Args:
+            progress_callback: 1社完了するごとに (完了数, 総数) で呼ばれる
         """
         enhanced_companies = []
 
-        for company in companies:
+        for i, company in enumerate(companies, 1):
             try:
                 # メールアドレスの推定・補完
                 company = await self._enhance_email_addresses(company)
@@ -39,6 +46,9 @@ class DataEnhancer:
                 logger.error(f"Error enhancing company {company.company_name}: {e}")
                 enhanced_companies.append(company)  # 元の情報を保持
 
+            if progress_callback:
+                progress_callback(i, len(companies))
+
         return enhanced_companies
 
     async def _enhance_email_addresses(self, company: CompanyInfo) -> CompanyInfo:
@@ -122,7 +132,7 @@ class DataEnhancer:
 
             additional_urls = [f"{base_url.rstrip('/')}/{path}" for path in additional_paths]
 
-            async with WebScraper() as scraper:
+            async with self._scraper_session() as scraper:
                 # 追加ページをクロール
                 additional_data = await self._crawl_specific_urls(scraper, additional_urls)
 
@@ -136,6 +146,17 @@ class DataEnhancer:
             logger.error(f"Error crawling additional pages for {company.company_name}: {e}")
             return company
 
+    @asynccontextmanager
+    async def _scraper_session(self):
+        """
+        共有の WebScraper があればそれを、無ければ一時的な WebScraper を使う
+        """
+        if self.scraper is not None:
+            yield self.scraper
+        else:
+            async with WebScraper() as scraper:
+                yield scraper
+
     def _generate_additional_paths(self) -> List[str]:
         """
         追加でクロールするページのパスを生成
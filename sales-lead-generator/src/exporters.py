@@ -1,21 +1,84 @@
-try:
-    import pandas as pd
-    PANDAS_AVAILABLE = True
-except ImportError:
-    PANDAS_AVAILABLE = False
-
+import asyncio
+import importlib.util
+import io
 import sqlite3
 import csv
-from typing import List, Dict, Optional
+import gzip
+import json
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import islice
+from typing import List, Dict, Optional, Iterable, Iterator
 from datetime import datetime
 import logging
 import os
 
+# pandas・openpyxlは使用時にのみ遅延インポートする
+PANDAS_AVAILABLE = importlib.util.find_spec('pandas') is not None
+OPENPYXL_AVAILABLE = importlib.util.find_spec('openpyxl') is not None
+PYARROW_AVAILABLE = importlib.util.find_spec('pyarrow') is not None
+
 from config.config import config
-from models import ScoredLead
+from models import ScoredLead, SCORE_NAMES
+from scorer import lead_priority, SALESFORCE_RATINGS
 
 logger = logging.getLogger(__name__)
 
+# sales_leads テーブルのカラム定義（idを除く）
+SQLITE_LEAD_COLUMNS = [
+    ('company_name', 'TEXT NOT NULL'),
+    ('url', 'TEXT'),
+    ('location', 'TEXT'),
+    ('contact_email', 'TEXT'),
+    ('phone', 'TEXT'),
+    ('description', 'TEXT'),
+    ('industry', 'TEXT'),
+    ('business_size', 'TEXT'),
+    ('additional_emails', 'TEXT'),
+    ('social_media', 'TEXT'),
+    ('is_wordpress', 'INTEGER'),
+    ('total_score', 'REAL'),
+    *((f'{name}_score', 'REAL') for name in SCORE_NAMES),
+    ('confidence', 'REAL'),
+    ('export_date', 'TEXT'),
+    ('search_industry', 'TEXT'),
+    ('search_location', 'TEXT'),
+]
+
+# CSV等のフラットな形式で出力するカラム（固定ヘッダー）
+EXPORT_COLUMNS = [name for name, _ in SQLITE_LEAD_COLUMNS]
+
+# CSV書き込み時に一度に書き出す行数
+CSV_CHUNK_SIZE = 500
+
+# Parquetのレコードバッチ（行グループ）あたりの行数
+PARQUET_BATCH_SIZE = 10000
+
+# Parquetのパーティションキー（hive形式のディレクトリに展開される）
+PARQUET_PARTITION_COLUMNS = ['search_industry', 'search_location']
+
+# 形式ごとの出力ファイル拡張子（Parquetはディレクトリ）
+EXPORT_EXTENSIONS = {
+    'csv': '.csv',
+    'excel': '.xlsx',
+    'sqlite': '.db',
+    'parquet': '.parquet',
+    'jsonl': '.jsonl',
+}
+
+EXPORT_FORMATS = list(EXPORT_EXTENSIONS)
+
+# ダウンロードで提供する形式のMIMEタイプ
+DOWNLOAD_MIMETYPES = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+    'excel': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+# ファイルに書き出さずに先頭から逐次生成できる形式
+STREAMABLE_FORMATS = ('csv', 'jsonl')
+
 class DataExporter:
     def __init__(self):
         self.config = config.output
@@ -26,268 +89,554 @@ class DataExporter:
         if not os.path.exists(self.config.output_dir):
             os.makedirs(self.config.output_dir)
 
+    async def export_formats(
+        self,
+        scored_leads: Iterable[ScoredLead],
+        formats: List[str],
+        search_info: Dict = None,
+        timestamp: str = None
+    ) -> Dict[str, str]:
+        """
+        指定された形式をスレッドプールで並列にエクスポート
+
+        行データは1回だけシリアライズし、全形式で共有する。
+        """
+        if 'all' in formats:
+            formats = EXPORT_FORMATS
+        formats = [fmt for fmt in EXPORT_FORMATS if fmt in formats]
+        if not formats:
+            return {}
+
+        if not timestamp:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+        rows = list(self._iter_export_rows(scored_leads, search_info))
+
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=min(len(formats), self.config.export_workers)) as executor:
+            paths = await asyncio.gather(*[
+                loop.run_in_executor(
+                    executor,
+                    self.write_rows,
+                    fmt,
+                    rows,
+                    self.build_export_path(fmt, timestamp),
+                    search_info
+                )
+                for fmt in formats
+            ])
+
+        return {fmt: path for fmt, path in zip(formats, paths) if path}
+
     async def export_all_formats(self, scored_leads: List[ScoredLead], search_info: Dict = None) -> Dict[str, str]:
         """
         全ての形式でエクスポート
         """
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        export_results = {}
+        return await self.export_formats(scored_leads, EXPORT_FORMATS, search_info)
+
+    async def export_to_csv(
+        self,
+        scored_leads: Iterable[ScoredLead],
+        timestamp: str = None,
+        search_info: Dict = None,
+        filepath: str = None,
+        append: bool = False,
+        compress: bool = False
+    ) -> Optional[str]:
+        """
+        CSV形式でエクスポート（ストリーミング書き込み）
+
+        Args:
+            scored_leads: リードのイテレータ（リストである必要はない）
+            filepath: 出力先パス（省略時はタイムスタンプから生成）
+            append: 既存ファイルに追記する（再開可能なジョブ用）
+            compress: gzip圧縮して書き込む
+        """
+        filepath = filepath or self.build_export_path('csv', timestamp, compress=compress)
+        return await self._write_in_executor('csv', scored_leads, filepath, search_info, append=append, compress=compress)
+
+    async def export_to_excel(self, scored_leads: Iterable[ScoredLead], timestamp: str = None, search_info: Dict = None) -> Optional[str]:
+        """
+        Excel形式でエクスポート（複数シート、書き込み専用モードで1パス）
+        """
+        filepath = self.build_export_path('excel', timestamp)
+        return await self._write_in_executor('excel', scored_leads, filepath, search_info)
+
+    async def export_to_sqlite(self, scored_leads: Iterable[ScoredLead], timestamp: str = None, search_info: Dict = None) -> Optional[str]:
+        """
+        SQLite形式でエクスポート（単一トランザクションでの一括挿入）
+        """
+        filepath = self.build_export_path('sqlite', timestamp)
+        return await self._write_in_executor('sqlite', scored_leads, filepath, search_info)
+
+    async def export_to_parquet(self, scored_leads: Iterable[ScoredLead], timestamp: str = None, search_info: Dict = None) -> Optional[str]:
+        """
+        Parquet形式でエクスポート（型付きArrowスキーマ、検索業種・地域でパーティション分割）
+        """
+        dirpath = self.build_export_path('parquet', timestamp)
+        return await self._write_in_executor('parquet', scored_leads, dirpath, search_info)
 
-        # CSV形式でエクスポート
-        csv_path = await self.export_to_csv(scored_leads, timestamp, search_info)
-        if csv_path:
-            export_results['csv'] = csv_path
+    async def _write_in_executor(self, fmt: str, scored_leads: Iterable[ScoredLead], filepath: str,
+                                 search_info: Dict = None, **options) -> Optional[str]:
+        """
+        イベントループを塞がないよう、書き込み処理をスレッドで実行
+        """
+        rows = self._iter_export_rows(scored_leads, search_info)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, partial(self.write_rows, fmt, rows, filepath, search_info, **options)
+        )
+
+    def build_export_path(self, fmt: str, timestamp: str = None, compress: bool = False) -> str:
+        """
+        出力ファイルのパスを生成
+        """
+        if not timestamp:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+        filename = f"sales_leads_{timestamp}{EXPORT_EXTENSIONS[fmt]}"
+        if compress:
+            filename += ".gz"
+        return os.path.join(self.config.output_dir, filename)
 
-        # Excel形式でエクスポート
-        excel_path = await self.export_to_excel(scored_leads, timestamp, search_info)
-        if excel_path:
-            export_results['excel'] = excel_path
+    def write_rows(self, fmt: str, rows: Iterable[Dict], filepath: str, search_info: Dict = None, **options) -> Optional[str]:
+        """
+        エクスポート用の行データ（_iter_export_rows の出力）を指定形式で書き込む
 
-        # SQLite形式でエクスポート
-        sqlite_path = await self.export_to_sqlite(scored_leads, timestamp, search_info)
-        if sqlite_path:
-            export_results['sqlite'] = sqlite_path
+        Returns:
+            出力先パス（失敗時はNone）
+        """
+        writers = {
+            'csv': self._write_csv,
+            'excel': self._write_excel,
+            'sqlite': self._write_sqlite,
+            'parquet': self._write_parquet,
+            'jsonl': self._write_jsonl,
+        }
+        if fmt not in writers:
+            raise ValueError(f"Unsupported export format: {fmt}")
 
-        return export_results
+        return writers[fmt](rows, filepath, search_info, **options)
 
-    async def export_to_csv(self, scored_leads: List[ScoredLead], timestamp: str = None, search_info: Dict = None) -> Optional[str]:
+    def _write_csv(self, rows: Iterable[Dict], filepath: str, search_info: Dict = None,
+                   append: bool = False, compress: bool = False) -> Optional[str]:
         """
-        CSV形式でエクスポート
+        CSVファイルへチャンク単位で書き込み
         """
         try:
-            if not timestamp:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-
-            filename = f"sales_leads_{timestamp}.csv"
-            filepath = os.path.join(self.config.output_dir, filename)
-
-            # データを辞書のリストに変換
-            data = []
-            for lead in scored_leads:
-                row = lead.to_dict()
-                # 日時情報を追加
-                row['export_date'] = datetime.now().isoformat()
-                if search_info:
-                    row['search_industry'] = search_info.get('industry', '')
-                    row['search_location'] = search_info.get('location', '')
-                data.append(row)
-
-            # CSVファイルに書き込み
-            if data:
-                if PANDAS_AVAILABLE:
-                    df = pd.DataFrame(data)
-                    df.to_csv(filepath, index=False, encoding='utf-8-sig')
-                else:
-                    # pandasが無い場合は標準CSVライブラリを使用
-                    import csv
-                    with open(filepath, 'w', newline='', encoding='utf-8-sig') as csvfile:
-                        if data:
-                            writer = csv.DictWriter(csvfile, fieldnames=data[0].keys())
-                            writer.writeheader()
-                            writer.writerows(data)
-
-                logger.info(f"Exported {len(data)} leads to CSV: {filepath}")
-                return filepath
+            # 既存ファイルへの追記時はBOMとヘッダーを書かない
+            appending = append and os.path.exists(filepath) and os.path.getsize(filepath) > 0
+            mode = 'at' if appending else 'wt'
+            encoding = 'utf-8' if appending else 'utf-8-sig'
+            opener = gzip.open if compress else open
+
+            row_count = 0
+            with opener(filepath, mode, newline='', encoding=encoding) as csvfile:
+                writer = csv.writer(csvfile)
+                if not appending:
+                    writer.writerow(EXPORT_COLUMNS)
+
+                flat_rows = self._iter_flat_rows(rows)
+                while True:
+                    chunk = list(islice(flat_rows, CSV_CHUNK_SIZE))
+                    if not chunk:
+                        break
+                    writer.writerows(chunk)
+                    row_count += len(chunk)
+
+            logger.info(f"Exported {row_count} leads to CSV: {filepath}")
+            return filepath
 
         except Exception as e:
             logger.error(f"Error exporting to CSV: {e}")
             return None
 
-    async def export_to_excel(self, scored_leads: List[ScoredLead], timestamp: str = None, search_info: Dict = None) -> Optional[str]:
+    def stream_rows(self, fmt: str, rows: Iterable[Dict]) -> Iterator[bytes]:
         """
-        Excel形式でエクスポート（複数シート）
+        エクスポート用の行データをCSV・JSONLのバイト列としてチャンク単位で逐次生成
+
+        全行をメモリに載せずにHTTPレスポンスへそのまま流せる。
         """
-        if not PANDAS_AVAILABLE:
-            logger.warning("Excel export requires pandas. Skipping Excel export.")
+        if fmt not in STREAMABLE_FORMATS:
+            raise ValueError(f"Format cannot be streamed: {fmt}")
+
+        if fmt == 'csv':
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(EXPORT_COLUMNS)
+            yield ('\ufeff' + buffer.getvalue()).encode('utf-8')
+
+            flat_rows = self._iter_flat_rows(rows)
+            while True:
+                chunk = list(islice(flat_rows, CSV_CHUNK_SIZE))
+                if not chunk:
+                    break
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerows(chunk)
+                yield buffer.getvalue().encode('utf-8')
+        else:
+            row_iter = iter(rows)
+            while True:
+                chunk = list(islice(row_iter, CSV_CHUNK_SIZE))
+                if not chunk:
+                    break
+                yield ''.join(
+                    json.dumps({column: row.get(column) for column in EXPORT_COLUMNS}, ensure_ascii=False) + '\n'
+                    for row in chunk
+                ).encode('utf-8')
+
+    def _write_jsonl(self, rows: Iterable[Dict], filepath: str, search_info: Dict = None) -> Optional[str]:
+        """
+        JSON Lines（1行1リード）で書き込み
+        """
+        try:
+            with open(filepath, 'wb') as f:
+                for chunk in self.stream_rows('jsonl', rows):
+                    f.write(chunk)
+
+            logger.info(f"Exported leads to JSONL: {filepath}")
+            return filepath
+
+        except Exception as e:
+            logger.error(f"Error exporting to JSONL: {e}")
+            return None
+
+    def _write_excel(self, rows: Iterable[Dict], filepath: str, search_info: Dict = None) -> Optional[str]:
+        """
+        書き込み専用ワークブックへ全シートを1パスで書き込み
+        """
+        if not OPENPYXL_AVAILABLE:
+            logger.warning("Excel export requires openpyxl. Skipping Excel export.")
             return None
 
+        from openpyxl import Workbook
+
         try:
-            if not timestamp:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-
-            filename = f"sales_leads_{timestamp}.xlsx"
-            filepath = os.path.join(self.config.output_dir, filename)
-
-            with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
-                # メインデータシート
-                data = []
-                for lead in scored_leads:
-                    row = lead.to_dict()
-                    row['export_date'] = datetime.now().isoformat()
-                    if search_info:
-                        row['search_industry'] = search_info.get('industry', '')
-                        row['search_location'] = search_info.get('location', '')
-                    data.append(row)
-
-                if data:
-                    df_main = pd.DataFrame(data)
-                    df_main.to_excel(writer, sheet_name='Sales Leads', index=False)
-
-                # 高優先度リードシート
-                high_priority = [lead for lead in scored_leads if lead.total_score >= 8.0]
-                if high_priority:
-                    high_priority_data = [lead.to_dict() for lead in high_priority]
-                    df_high = pd.DataFrame(high_priority_data)
-                    df_high.to_excel(writer, sheet_name='High Priority', index=False)
-
-                # 統計情報シート
-                stats = self._generate_export_statistics(scored_leads, search_info)
-                df_stats = pd.DataFrame(list(stats.items()), columns=['Metric', 'Value'])
-                df_stats.to_excel(writer, sheet_name='Statistics', index=False)
-
-            logger.info(f"Exported {len(data)} leads to Excel: {filepath}")
+            # 書き込み専用ワークブックは行をメモリに保持しない
+            workbook = Workbook(write_only=True)
+            main_sheet = workbook.create_sheet('Sales Leads')
+            high_priority_sheet = workbook.create_sheet('High Priority')
+            stats_sheet = workbook.create_sheet('Statistics')
+
+            main_sheet.append(EXPORT_COLUMNS)
+            high_priority_sheet.append(EXPORT_COLUMNS)
+
+            score_index = EXPORT_COLUMNS.index('total_score')
+            confidence_index = EXPORT_COLUMNS.index('confidence')
+            high_priority_threshold = config.scoring.high_priority_threshold
+            statistics = _ExportStatistics()
+
+            # 全シートを1回の走査で書き込む
+            for row in self._iter_flat_rows(rows):
+                main_sheet.append(row)
+                if row[score_index] >= high_priority_threshold:
+                    high_priority_sheet.append(row)
+                statistics.add(row[score_index], row[confidence_index])
+
+            # 統計情報シート
+            stats_sheet.append(['Metric', 'Value'])
+            for metric, value in statistics.to_dict(search_info).items():
+                stats_sheet.append([metric, value])
+
+            workbook.save(filepath)
+
+            logger.info(f"Exported {statistics.count} leads to Excel: {filepath}")
             return filepath
 
         except Exception as e:
             logger.error(f"Error exporting to Excel: {e}")
             return None
 
-    async def export_to_sqlite(self, scored_leads: List[ScoredLead], timestamp: str = None, search_info: Dict = None) -> Optional[str]:
+    def _write_sqlite(self, rows: Iterable[Dict], filepath: str, search_info: Dict = None) -> Optional[str]:
         """
-        SQLite形式でエクスポート
+        SQLiteファイルへ単一トランザクションで一括挿入
         """
         try:
-            if not timestamp:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            export_date = datetime.now().isoformat()
+            search_industry = search_info.get('industry', '') if search_info else ''
+            search_location = search_info.get('location', '') if search_info else ''
+            statistics = _ExportStatistics()
 
-            filename = f"sales_leads_{timestamp}.db"
-            filepath = os.path.join(self.config.output_dir, filename)
+            def sqlite_rows():
+                for row in rows:
+                    statistics.add(row.get('total_score', 0), row.get('confidence', 0))
+                    yield self._to_flat_row(row)
 
             conn = sqlite3.connect(filepath)
-            cursor = conn.cursor()
-
-            # テーブル作成
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS sales_leads (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    company_name TEXT NOT NULL,
-                    url TEXT,
-                    location TEXT,
-                    contact_email TEXT,
-                    phone TEXT,
-                    description TEXT,
-                    industry TEXT,
-                    business_size TEXT,
-                    additional_emails TEXT,
-                    social_media TEXT,
-                    total_score REAL,
-                    industry_match_score REAL,
-                    business_size_score REAL,
-                    contact_info_score REAL,
-                    location_match_score REAL,
-                    confidence REAL,
-                    export_date TEXT,
-                    search_industry TEXT,
-                    search_location TEXT
-                )
-            ''')
-
-            # データ挿入
-            for lead in scored_leads:
-                data = lead.to_dict()
-
-                # JSON文字列に変換が必要なフィールド
-                import json
-                additional_emails_str = json.dumps(data.get('additional_emails', []))
-                social_media_str = json.dumps(data.get('social_media', {}))
-
-                cursor.execute('''
-                    INSERT INTO sales_leads (
-                        company_name, url, location, contact_email, phone,
-                        description, industry, business_size, additional_emails,
-                        social_media, total_score, industry_match_score,
-                        business_size_score, contact_info_score, location_match_score,
-                        confidence, export_date, search_industry, search_location
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    data.get('company_name', ''),
-                    data.get('url', ''),
-                    data.get('location', ''),
-                    data.get('contact_email', ''),
-                    data.get('phone', ''),
-                    data.get('description', ''),
-                    data.get('industry', ''),
-                    data.get('business_size', ''),
-                    additional_emails_str,
-                    social_media_str,
-                    data.get('total_score', 0),
-                    data.get('industry_match_score', 0),
-                    data.get('business_size_score', 0),
-                    data.get('contact_info_score', 0),
-                    data.get('location_match_score', 0),
-                    data.get('confidence', 0),
-                    datetime.now().isoformat(),
-                    search_info.get('industry', '') if search_info else '',
-                    search_info.get('location', '') if search_info else ''
-                ))
-
-            # 統計テーブル
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS export_stats (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    export_date TEXT,
-                    total_leads INTEGER,
-                    high_priority_leads INTEGER,
-                    medium_priority_leads INTEGER,
-                    low_priority_leads INTEGER,
-                    average_score REAL,
-                    average_confidence REAL,
-                    search_industry TEXT,
-                    search_location TEXT
-                )
-            ''')
-
-            # 統計データの挿入
-            stats = self._generate_export_statistics(scored_leads, search_info)
-            cursor.execute('''
-                INSERT INTO export_stats (
-                    export_date, total_leads, high_priority_leads,
-                    medium_priority_leads, low_priority_leads,
-                    average_score, average_confidence,
-                    search_industry, search_location
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                datetime.now().isoformat(),
-                stats.get('total_leads', 0),
-                stats.get('high_priority_leads', 0),
-                stats.get('medium_priority_leads', 0),
-                stats.get('low_priority_leads', 0),
-                stats.get('average_score', 0),
-                stats.get('average_confidence', 0),
-                search_info.get('industry', '') if search_info else '',
-                search_info.get('location', '') if search_info else ''
-            ))
-
-            conn.commit()
-            conn.close()
-
-            logger.info(f"Exported {len(scored_leads)} leads to SQLite: {filepath}")
+            try:
+                # 一括ロード向けの設定（ロールバックジャーナルはメモリ上に置く）
+                conn.execute("PRAGMA journal_mode=MEMORY")
+                conn.execute("PRAGMA synchronous=OFF")
+                conn.execute("PRAGMA cache_size=-64000")
+                conn.execute("PRAGMA temp_store=MEMORY")
+
+                with conn:
+                    conn.execute(f"""
+                        CREATE TABLE IF NOT EXISTS sales_leads (
+                            id INTEGER PRIMARY KEY AUTOINCREMENT,
+                            {', '.join(f'{name} {sql_type}' for name, sql_type in SQLITE_LEAD_COLUMNS)}
+                        )
+                    """)
+
+                    conn.executemany(f"""
+                        INSERT INTO sales_leads ({', '.join(EXPORT_COLUMNS)})
+                        VALUES ({', '.join('?' * len(EXPORT_COLUMNS))})
+                    """, sqlite_rows())
+
+                    # インデックスはロード後にまとめて作成
+                    conn.execute("CREATE INDEX IF NOT EXISTS idx_sales_leads_total_score ON sales_leads(total_score)")
+                    conn.execute("CREATE INDEX IF NOT EXISTS idx_sales_leads_url ON sales_leads(url)")
+                    conn.execute("CREATE INDEX IF NOT EXISTS idx_sales_leads_industry ON sales_leads(industry)")
+
+                    # 統計テーブル
+                    conn.execute("""
+                        CREATE TABLE IF NOT EXISTS export_stats (
+                            id INTEGER PRIMARY KEY AUTOINCREMENT,
+                            export_date TEXT,
+                            total_leads INTEGER,
+                            high_priority_leads INTEGER,
+                            medium_priority_leads INTEGER,
+                            low_priority_leads INTEGER,
+                            average_score REAL,
+                            average_confidence REAL,
+                            search_industry TEXT,
+                            search_location TEXT
+                        )
+                    """)
+
+                    # 統計データの挿入
+                    stats = statistics.to_dict(search_info)
+                    conn.execute("""
+                        INSERT INTO export_stats (
+                            export_date, total_leads, high_priority_leads,
+                            medium_priority_leads, low_priority_leads,
+                            average_score, average_confidence,
+                            search_industry, search_location
+                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """, (
+                        export_date,
+                        stats.get('total_leads', 0),
+                        stats.get('high_priority_leads', 0),
+                        stats.get('medium_priority_leads', 0),
+                        stats.get('low_priority_leads', 0),
+                        stats.get('average_score', 0),
+                        stats.get('average_confidence', 0),
+                        search_industry,
+                        search_location
+                    ))
+
+                # 配布するファイルは -wal/-shm や -journal を伴わない単一ファイルにする
+                conn.execute("PRAGMA journal_mode=DELETE")
+            finally:
+                conn.close()
+
+            logger.info(f"Exported {statistics.count} leads to SQLite: {filepath}")
             return filepath
 
         except Exception as e:
             logger.error(f"Error exporting to SQLite: {e}")
             return None
 
+    def _write_parquet(self, rows: Iterable[Dict], dirpath: str, search_info: Dict = None,
+                       partitioned: bool = True) -> Optional[str]:
+        """
+        hive形式でパーティション分割したParquetデータセットを書き込み
+
+        Args:
+            partitioned: Falseの場合は分割せず単一のParquetファイルに書き込む（ダウンロード用）
+        """
+        if not PYARROW_AVAILABLE:
+            logger.warning("Parquet export requires pyarrow. Skipping Parquet export.")
+            return None
+
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+        import pyarrow.parquet as pq
+
+        try:
+            schema = self._parquet_schema(pa)
+            row_count = 0
+
+            def record_batches():
+                nonlocal row_count
+                row_iter = iter(rows)
+                while True:
+                    chunk = list(islice(row_iter, PARQUET_BATCH_SIZE))
+                    if not chunk:
+                        break
+                    row_count += len(chunk)
+                    yield pa.RecordBatch.from_pydict(self._to_parquet_columns(chunk, schema), schema=schema)
+
+            if not partitioned:
+                with pq.ParquetWriter(dirpath, schema) as writer:
+                    for batch in record_batches():
+                        writer.write_batch(batch, row_group_size=PARQUET_BATCH_SIZE)
+
+                logger.info(f"Exported {row_count} leads to Parquet: {dirpath}")
+                return dirpath
+
+            partitioning = ds.partitioning(
+                pa.schema([schema.field(name) for name in PARQUET_PARTITION_COLUMNS]),
+                flavor='hive'
+            )
+
+            ds.write_dataset(
+                record_batches(),
+                dirpath,
+                schema=schema,
+                format='parquet',
+                partitioning=partitioning,
+                basename_template='part-{i}.parquet',
+                max_rows_per_group=PARQUET_BATCH_SIZE,
+                existing_data_behavior='overwrite_or_ignore'
+            )
+
+            logger.info(f"Exported {row_count} leads to Parquet: {dirpath}")
+            return dirpath
+
+        except Exception as e:
+            logger.error(f"Error exporting to Parquet: {e}")
+            return None
+
+    @staticmethod
+    def _parquet_schema(pa):
+        """
+        リードのArrowスキーマを構築
+        """
+        return pa.schema([
+            ('company_name', pa.string()),
+            ('url', pa.string()),
+            ('location', pa.string()),
+            ('contact_email', pa.string()),
+            ('phone', pa.string()),
+            ('description', pa.string()),
+            ('industry', pa.string()),
+            ('business_size', pa.dictionary(pa.int8(), pa.string())),
+            ('additional_emails', pa.list_(pa.string())),
+            ('social_media', pa.map_(pa.string(), pa.string())),
+            ('is_wordpress', pa.bool_()),
+            ('total_score', pa.float64()),
+            *((f'{name}_score', pa.float64()) for name in SCORE_NAMES),
+            ('confidence', pa.float64()),
+            ('export_date', pa.timestamp('us')),
+            ('search_industry', pa.string()),
+            ('search_location', pa.string()),
+        ])
+
+    @staticmethod
+    def _to_parquet_columns(rows: List[Dict], schema) -> Dict[str, list]:
+        """
+        エクスポート用の辞書リストを列指向のデータに変換
+        """
+        columns = {name: [] for name in schema.names}
+        for row in rows:
+            for name, values in columns.items():
+                value = row.get(name)
+                if name == 'social_media':
+                    value = [(str(k), str(v) if v is not None else None) for k, v in (value or {}).items()]
+                elif name == 'export_date':
+                    value = datetime.fromisoformat(value)
+                elif name == 'is_wordpress':
+                    value = bool(value)
+                elif name in ('total_score', 'confidence') or name.endswith('_score'):
+                    value = float(value or 0)
+                values.append(value)
+        return columns
+
+    @staticmethod
+    def _to_flat_row(row: Dict) -> tuple:
+        """
+        エクスポート用の辞書を固定カラム順の行に変換（リスト・辞書はJSON文字列化）
+        """
+        return tuple(
+            json.dumps(row.get(column), ensure_ascii=False) if isinstance(row.get(column), (list, dict)) else row.get(column)
+            for column in EXPORT_COLUMNS
+        )
+
+    def _iter_export_rows(self, scored_leads: Iterable[ScoredLead], search_info: Dict = None) -> Iterator[Dict]:
+        """
+        リードをエクスポート用の辞書に逐次変換
+        """
+        return self.iter_lead_rows((lead.to_dict() for lead in scored_leads), search_info)
+
+    def iter_lead_rows(self, leads: Iterable[Dict], search_info: Dict = None, export_date: str = None) -> Iterator[Dict]:
+        """
+        リードの辞書（ScoredLead.to_dict の形式）をエクスポート用の辞書に逐次変換
+
+        Args:
+            export_date: 出力日時（保存済みの結果から再生成する場合に、毎回同じ内容にするため指定）
+        """
+        export_date = export_date or datetime.now().isoformat()
+        search_industry = search_info.get('industry', '') if search_info else ''
+        search_location = search_info.get('location', '') if search_info else ''
+
+        for lead in leads:
+            row = dict(lead)
+            row['export_date'] = export_date
+            row['search_industry'] = search_industry
+            row['search_location'] = search_location
+            yield row
+
+    def _iter_flat_rows(self, rows: Iterable[Dict]) -> Iterator[tuple]:
+        """
+        エクスポート用の辞書をフラットな行に逐次変換
+        """
+        for row in rows:
+            yield self._to_flat_row(row)
+
     def _generate_export_statistics(self, scored_leads: List[ScoredLead], search_info: Dict = None) -> Dict:
         """
         エクスポート統計情報を生成
         """
-        if not scored_leads:
-            return {}
+        statistics = _ExportStatistics()
+        for lead in scored_leads:
+            statistics.add(lead.total_score, lead.confidence)
 
-        scores = [lead.total_score for lead in scored_leads]
-        confidences = [lead.confidence for lead in scored_leads]
+        return statistics.to_dict(search_info)
+
+class _ExportStatistics:
+    """
+    リードを1件ずつ受け取りながらエクスポート統計を集計する
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.high_priority = 0
+        self.medium_priority = 0
+        self.score_sum = 0.0
+        self.confidence_sum = 0.0
+        self.max_score = None
+        self.min_score = None
+
+    def add(self, total_score: float, confidence: float):
+        self.count += 1
+        self.score_sum += total_score
+        self.confidence_sum += confidence
+
+        priority = lead_priority(total_score)
+        if priority == 'high':
+            self.high_priority += 1
+        elif priority == 'medium':
+            self.medium_priority += 1
+
+        self.max_score = total_score if self.max_score is None else max(self.max_score, total_score)
+        self.min_score = total_score if self.min_score is None else min(self.min_score, total_score)
+
+    def to_dict(self, search_info: Dict = None) -> Dict:
+        if not self.count:
+            return {}
 
         stats = {
             'export_date': datetime.now().isoformat(),
-            'total_leads': len(scored_leads),
-            'high_priority_leads': len([s for s in scores if s >= 8.0]),
-            'medium_priority_leads': len([s for s in scores if 5.0 <= s < 8.0]),
-            'low_priority_leads': len([s for s in scores if s < 5.0]),
-            'average_score': sum(scores) / len(scores) if scores else 0,
-            'max_score': max(scores) if scores else 0,
-            'min_score': min(scores) if scores else 0,
-            'average_confidence': sum(confidences) / len(confidences) if confidences else 0,
+            'total_leads': self.count,
+            'high_priority_leads': self.high_priority,
+            'medium_priority_leads': self.medium_priority,
+            'low_priority_leads': self.count - self.high_priority - self.medium_priority,
+            'average_score': self.score_sum / self.count,
+            'max_score': self.max_score,
+            'min_score': self.min_score,
+            'average_confidence': self.confidence_sum / self.count,
         }
 
         if search_info:
@@ -313,6 +662,8 @@ class CSVTemplateGenerator:
             logger.warning("Template generation requires pandas")
             return None
 
+        import pandas as pd
+
         hubspot_data = []
         for lead in scored_leads:
             row = {
@@ -340,6 +691,8 @@ class CSVTemplateGenerator:
             logger.warning("Template generation requires pandas")
             return None
 
+        import pandas as pd
+
         salesforce_data = []
         for lead in scored_leads:
             row = {
@@ -349,7 +702,7 @@ class CSVTemplateGenerator:
                 'Street': lead.company.location or '',
                 'Industry': lead.company.industry or '',
                 'Description': lead.company.description or '',
-                'Rating': 'Hot' if lead.total_score >= 8.0 else 'Warm' if lead.total_score >= 5.0 else 'Cold',
+                'Rating': SALESFORCE_RATINGS[lead_priority(lead.total_score)],
                 'Lead Source': 'Sales Lead Generator',
                 'Status': 'New',
             }
@@ -5,15 +5,70 @@
 
 import sqlite3
 import json
-from typing import List, Dict, Optional, Set
+import base64
+import threading
+import time
+import weakref
+from typing import List, Dict, Optional, Set, Tuple
 from datetime import datetime
 from pathlib import Path
 import logging
 
-from models import CompanyInfo, ScoredLead
+import metrics
+from models import CompanyInfo, ScoredLead, SearchResult, SCORE_NAMES
+from bloom_filter import BloomFilter
 
 logger = logging.getLogger(__name__)
 
+# サブスコアを保存するカラム（total_score + models.SCORE_NAMES の順に "<名前>_score"）
+SCORE_COLUMNS = ['total_score'] + [f'{name}_score' for name in SCORE_NAMES]
+
+# 接続ごとに設定するPRAGMA
+# WALモードでは書き込み中のジョブがあっても読み込み（履歴画面・API）はブロックされない
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-16000",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+)
+
+# 接続ごとにキャッシュするプリペアドステートメント数
+CACHED_STATEMENTS = 128
+
+# 全文検索の対象カラムとbm25の重み（会社名を優先）
+FTS_COLUMNS = ('company_name', 'url', 'industry', 'location')
+FTS_WEIGHTS = (10.0, 1.0, 5.0, 5.0)
+
+# trigramトークナイザで検索できる最短の語長（これより短い語はLIKE検索）
+FTS_MIN_TERM_LENGTH = 3
+
+# 既知URL・ドメインのブルームフィルタの最小容量と誤判定率
+BLOOM_MIN_CAPACITY = 10000
+BLOOM_ERROR_RATE = 0.01
+
+# 作り直したブルームフィルタの容量の余裕（履歴の要素数に対する倍率）
+# 作り直した直後に容量いっぱいだと、次の追加で再び全件走査になる
+BLOOM_HEADROOM = 2
+
+# ブルームフィルタを保存する最短間隔（秒）
+# 保存が遅れても、次回の起動時に保存時点より後の行を読み込んで追いつく
+BLOOM_SAVE_INTERVAL = 60.0
+
+class _ThreadConnection:
+    """
+    スレッドごとの接続の保持オブジェクト
+
+    threading.local にだけ保持するため、スレッドが終了すると破棄され、接続も閉じられる。
+    """
+
+    __slots__ = ('conn', 'finalizer', '__weakref__')
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.finalizer = weakref.finalize(self, conn.close)
+
 class HistoryManager:
     """生成履歴を管理するクラス"""
 
@@ -24,11 +79,70 @@ class HistoryManager:
 
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # スレッドごとに1本の接続を使い回す（ステートメントキャッシュも接続単位）
+        # 終了したスレッドの接続は _ThreadConnection の破棄時に閉じられ、ここからも消える
+        self._local = threading.local()
+        self._connections = weakref.WeakSet()
+        self._connections_lock = threading.Lock()
+
+        # 既知のURL・ドメインのブルームフィルタ（DBと同じ場所に保存して高速に起動）
+        self.bloom_path = self.db_path.with_suffix('.bloom')
+        self._bloom = None
+        self._bloom_max_id = 0
+        self._bloom_lock = threading.Lock()
+        # 保存後に追加された行があるか・最後に保存した時刻
+        self._bloom_dirty = False
+        self._bloom_saved_at = 0.0
+
         self._init_db()
+        self._load_known_filter()
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        現在のスレッド用の接続を取得（未作成なら作成）
+        """
+        holder = getattr(self._local, 'holder', None)
+        if holder is None:
+            conn = sqlite3.connect(
+                self.db_path,
+                timeout=5.0,
+                cached_statements=CACHED_STATEMENTS,
+                check_same_thread=False
+            )
+            conn.row_factory = sqlite3.Row
+            for pragma in CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+
+            holder = _ThreadConnection(conn)
+            self._local.holder = holder
+            with self._connections_lock:
+                self._connections.add(holder)
+
+        return holder.conn
+
+    def close(self):
+        """未保存のブルームフィルタを保存し、全スレッドの接続を閉じる"""
+        self.save_known_filter()
+
+        with self._connections_lock:
+            holders = list(self._connections)
+            self._connections = weakref.WeakSet()
+
+        for holder in holders:
+            holder.finalizer()
+
+        self._local = threading.local()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
 
     def _init_db(self):
         """データベースを初期化"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connection() as conn:
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS company_history (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -49,11 +163,243 @@ class HistoryManager:
                 CREATE INDEX IF NOT EXISTS idx_domain ON company_history(domain)
             """)
 
+            # キーセットページング用（created_at は秒単位で重複するため id で順序を確定）
+            conn.execute("DROP INDEX IF EXISTS idx_created_at")
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_created_at_id ON company_history(created_at, id)
+            """)
+
+            # 既存DBへのスコアカラム追加（再スコアリング用）
+            existing_columns = {row[1] for row in conn.execute("PRAGMA table_info(company_history)")}
+            for column in SCORE_COLUMNS:
+                if column not in existing_columns:
+                    conn.execute(f"ALTER TABLE company_history ADD COLUMN {column} REAL")
+
+        self._init_aggregates()
+        self.fts_enabled = self._init_fts()
+
+    def _init_aggregates(self):
+        """
+        総件数・業種別・地域別の件数を保持する集計テーブルとトリガーを作成
+
+        集計は挿入・削除・更新のたびにトリガーで差分更新されるため、
+        統計の取得は履歴の件数に関係なく一定時間で済む。
+        """
+        with self._connection() as conn:
+            exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'history_aggregates'"
+            ).fetchone()
+
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS history_aggregates (
+                    kind TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    count INTEGER NOT NULL,
+                    PRIMARY KEY (kind, value)
+                )
+            """)
+
             conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_created_at ON company_history(created_at)
+                CREATE INDEX IF NOT EXISTS idx_history_aggregates_count ON history_aggregates(kind, count)
+            """)
+
+            increment = """
+                INSERT INTO history_aggregates (kind, value, count) VALUES ('total', '', 1)
+                ON CONFLICT (kind, value) DO UPDATE SET count = count + 1;
+                INSERT INTO history_aggregates (kind, value, count)
+                SELECT 'industry', new.industry, 1 WHERE COALESCE(new.industry, '') != ''
+                ON CONFLICT (kind, value) DO UPDATE SET count = count + 1;
+                INSERT INTO history_aggregates (kind, value, count)
+                SELECT 'location', new.location, 1 WHERE COALESCE(new.location, '') != ''
+                ON CONFLICT (kind, value) DO UPDATE SET count = count + 1;
+            """
+            decrement = """
+                UPDATE history_aggregates SET count = count - 1
+                WHERE (kind = 'total' AND value = '')
+                   OR (kind = 'industry' AND value = old.industry)
+                   OR (kind = 'location' AND value = old.location);
+                DELETE FROM history_aggregates WHERE count <= 0 AND kind != 'total';
+            """
+
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS history_aggregates_ai AFTER INSERT ON company_history BEGIN
+                    {increment}
+                END
+            """)
+
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS history_aggregates_ad AFTER DELETE ON company_history BEGIN
+                    {decrement}
+                END
+            """)
+
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS history_aggregates_au AFTER UPDATE OF industry, location ON company_history BEGIN
+                    {decrement}
+                    {increment}
+                END
             """)
 
-            conn.commit()
+            # 既存DBに初めて作成した場合は現在の件数で初期化
+            if not exists:
+                conn.execute("""
+                    INSERT INTO history_aggregates (kind, value, count)
+                    SELECT 'total', '', COUNT(*) FROM company_history
+                """)
+                for kind in ('industry', 'location'):
+                    conn.execute(f"""
+                        INSERT INTO history_aggregates (kind, value, count)
+                        SELECT '{kind}', {kind}, COUNT(*) FROM company_history
+                        WHERE COALESCE({kind}, '') != ''
+                        GROUP BY {kind}
+                    """)
+
+    def _init_fts(self) -> bool:
+        """
+        全文検索用のFTS5テーブル（trigramトークナイザ）とトリガーを作成
+
+        Returns:
+            FTS5が利用可能な場合True（非対応のSQLiteではLIKE検索にフォールバック）
+        """
+        columns = ', '.join(FTS_COLUMNS)
+        new_columns = ', '.join(f'new.{column}' for column in FTS_COLUMNS)
+        old_columns = ', '.join(f'old.{column}' for column in FTS_COLUMNS)
+
+        try:
+            with self._connection() as conn:
+                exists = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'company_history_fts'"
+                ).fetchone()
+
+                conn.execute(f"""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS company_history_fts USING fts5(
+                        {columns},
+                        content='company_history',
+                        content_rowid='id',
+                        tokenize='trigram'
+                    )
+                """)
+
+                conn.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS company_history_fts_ai AFTER INSERT ON company_history BEGIN
+                        INSERT INTO company_history_fts(rowid, {columns}) VALUES (new.id, {new_columns});
+                    END
+                """)
+
+                conn.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS company_history_fts_ad AFTER DELETE ON company_history BEGIN
+                        INSERT INTO company_history_fts(company_history_fts, rowid, {columns})
+                        VALUES ('delete', old.id, {old_columns});
+                    END
+                """)
+
+                conn.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS company_history_fts_au AFTER UPDATE OF {columns} ON company_history BEGIN
+                        INSERT INTO company_history_fts(company_history_fts, rowid, {columns})
+                        VALUES ('delete', old.id, {old_columns});
+                        INSERT INTO company_history_fts(rowid, {columns}) VALUES (new.id, {new_columns});
+                    END
+                """)
+
+                # 既存DBに初めて作成した場合は既存行を索引に登録
+                if not exists:
+                    conn.execute("INSERT INTO company_history_fts(company_history_fts) VALUES ('rebuild')")
+
+            return True
+
+        except sqlite3.OperationalError as e:
+            logger.warning(f"FTS5 trigram tokenizer not available, falling back to LIKE search: {e}")
+            return False
+
+    def _load_known_filter(self):
+        """
+        保存済みのブルームフィルタを読み込み、無い・古い場合は履歴から作り直す
+        """
+        loaded = BloomFilter.load(self.bloom_path, BLOOM_ERROR_RATE)
+
+        with self._connection() as conn:
+            max_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM company_history").fetchone()[0]
+
+        # 保存後にDBが作り直された場合（最大IDが巻き戻った場合）は使えない
+        if loaded is None or loaded[1] > max_id or loaded[0].is_saturated:
+            self._rebuild_known_filter()
+            return
+
+        self._bloom, self._bloom_max_id = loaded
+        self._sync_known_filter()
+
+    def _rebuild_known_filter(self):
+        """
+        履歴全体からブルームフィルタを作り直す（削除時・容量超過時）
+        """
+        with self._bloom_lock, self._connection() as conn:
+            count = conn.execute("SELECT COUNT(*) FROM company_history").fetchone()[0]
+            # 1行あたりURLとドメインの2要素
+            bloom = BloomFilter(capacity=max(count * 2 * BLOOM_HEADROOM, BLOOM_MIN_CAPACITY),
+                                error_rate=BLOOM_ERROR_RATE)
+
+            max_id = 0
+            for row_id, url, domain in conn.execute("SELECT id, url, domain FROM company_history"):
+                bloom.add(url)
+                bloom.add(domain)
+                max_id = max(max_id, row_id)
+
+            self._bloom = bloom
+            self._bloom_max_id = max_id
+            self._write_known_filter()
+
+        logger.debug(f"Rebuilt history bloom filter with {count} companies")
+
+    def _sync_known_filter(self):
+        """
+        前回の反映以降に追加された履歴（他プロセスの追加分を含む）をブルームフィルタに反映
+
+        IDは単調増加するため、最大IDより後の行だけを読めばよい。
+        """
+        with self._bloom_lock, self._connection() as conn:
+            rows = conn.execute(
+                "SELECT id, url, domain FROM company_history WHERE id > ?", (self._bloom_max_id,)
+            ).fetchall()
+
+            if not rows:
+                return
+
+            for row_id, url, domain in rows:
+                self._bloom.add(url)
+                self._bloom.add(domain)
+                self._bloom_max_id = max(self._bloom_max_id, row_id)
+            self._bloom_dirty = True
+
+            saturated = self._bloom.is_saturated
+            if not saturated and time.monotonic() - self._bloom_saved_at >= BLOOM_SAVE_INTERVAL:
+                self._write_known_filter()
+
+        if saturated:
+            self._rebuild_known_filter()
+
+    def save_known_filter(self):
+        """
+        前回の保存以降に更新されたブルームフィルタをファイルに保存
+        """
+        with self._bloom_lock:
+            if self._bloom_dirty:
+                self._write_known_filter()
+
+    def _write_known_filter(self):
+        """
+        ブルームフィルタをファイルに保存（_bloom_lock を保持した状態で呼ぶ）
+
+        フィルタは照会を省くための最適化なので、保存に失敗しても処理は続ける
+        （次回の起動時に保存済みの時点以降の行を読み込むか、作り直す）。
+        """
+        # 失敗した場合も保存間隔が経つまで再試行しない
+        self._bloom_saved_at = time.monotonic()
+        try:
+            self._bloom.save(self.bloom_path, tag=self._bloom_max_id)
+        except OSError as e:
+            logger.warning(f"Failed to save history bloom filter: {e}")
+            return
+        self._bloom_dirty = False
 
     def add_companies(self, companies: List[CompanyInfo], search_query: str = "") -> int:
         """
@@ -62,47 +408,77 @@ class HistoryManager:
         Returns:
             追加された件数
         """
-        added_count = 0
-
-        with sqlite3.connect(self.db_path) as conn:
-            for company in companies:
-                try:
-                    domain = self._extract_domain(company.url)
-
-                    metadata = {
-                        'description': company.description,
-                        'business_size': company.business_size.value if company.business_size else None,
-                        'additional_emails': company.additional_emails or [],
-                        'social_media': company.social_media or {}
-                    }
-
-                    conn.execute("""
-                        INSERT OR IGNORE INTO company_history
-                        (company_name, url, domain, location, industry, contact_email, phone, search_query, metadata)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        company.company_name,
-                        company.url,
-                        domain,
-                        company.location,
-                        company.industry,
-                        company.contact_email,
-                        company.phone,
-                        search_query,
-                        json.dumps(metadata, ensure_ascii=False)
-                    ))
-
-                    if conn.total_changes > 0:
-                        added_count += 1
-
-                except Exception as e:
-                    logger.error(f"Error adding company {company.company_name} to history: {e}")
-
-            conn.commit()
-
+        added_count = self._insert_history([(company, None) for company in companies], search_query)
         logger.info(f"Added {added_count} companies to history")
         return added_count
 
+    def add_scored_leads(self, scored_leads: List[ScoredLead], search_query: str = "") -> int:
+        """
+        スコア付きリードをサブスコアと共に履歴に追加
+
+        Returns:
+            追加された件数
+        """
+        added_count = self._insert_history([(lead.company, lead) for lead in scored_leads], search_query)
+        logger.info(f"Added {added_count} scored leads to history")
+        return added_count
+
+    def _insert_history(self, entries: List[Tuple[CompanyInfo, Optional[ScoredLead]]], search_query: str) -> int:
+        """
+        企業（とスコア）を1トランザクションで一括挿入
+
+        既存URLは INSERT OR IGNORE で無視される。追加件数は cursor.rowcount
+        （トリガーによる変更を含まない changes() の合計）なので正確。
+
+        Returns:
+            追加された件数
+        """
+        rows = []
+        for company, lead in entries:
+            try:
+                metadata = {
+                    'description': company.description,
+                    'business_size': company.business_size.value if company.business_size else None,
+                    'additional_emails': company.additional_emails or [],
+                    'social_media': company.social_media or {}
+                }
+
+                if lead is not None:
+                    scores = (lead.total_score,) + tuple(lead.scores.get(name, 0) for name in SCORE_NAMES)
+                else:
+                    scores = (None,) * len(SCORE_COLUMNS)
+
+                rows.append((
+                    company.company_name,
+                    company.url,
+                    self._extract_domain(company.url),
+                    company.location,
+                    company.industry,
+                    company.contact_email,
+                    company.phone,
+                    search_query,
+                    json.dumps(metadata, ensure_ascii=False)
+                ) + scores)
+
+            except Exception as e:
+                logger.error(f"Error adding company {company.company_name} to history: {e}")
+
+        if not rows:
+            return 0
+
+        placeholders = ', '.join('?' * len(rows[0]))
+        with self._connection() as conn:
+            cursor = conn.executemany(f"""
+                INSERT OR IGNORE INTO company_history
+                (company_name, url, domain, location, industry, contact_email, phone, search_query, metadata,
+                 {', '.join(SCORE_COLUMNS)})
+                VALUES ({placeholders})
+            """, rows)
+            added_count = cursor.rowcount
+
+        self._sync_known_filter()
+        return added_count
+
     def get_existing_urls(self) -> Set[str]:
         """
         既存のURL一覧を取得
@@ -110,7 +486,7 @@ class HistoryManager:
         Returns:
             URLのセット
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connection() as conn:
             cursor = conn.execute("SELECT url FROM company_history")
             return {row[0] for row in cursor.fetchall()}
 
@@ -121,10 +497,55 @@ class HistoryManager:
         Returns:
             ドメインのセット
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connection() as conn:
             cursor = conn.execute("SELECT DISTINCT domain FROM company_history")
             return {row[0] for row in cursor.fetchall()}
 
+    def find_known(self, urls: List[str], domains: List[str]) -> Tuple[Set[str], Set[str]]:
+        """
+        候補のURL・ドメインのうち履歴に存在するものを取得
+
+        ブルームフィルタで「存在しない」と判定された候補はDBに照会しない。
+        残りの候補をJSON配列として1回のクエリで渡し、url / domain のインデックスで照合する。
+        履歴全体を読み込まないため、コストは候補数にのみ比例する。
+
+        Returns:
+            (既存URLのセット, 既存ドメインのセット)
+        """
+        self._sync_known_filter()
+        candidates = len(urls) + len(domains)
+        urls = [url for url in urls if url in self._bloom]
+        domains = [domain for domain in domains if domain in self._bloom]
+
+        # フィルタだけで「新規」と確定した候補をヒットとして数える
+        checked = len(urls) + len(domains)
+        metrics.inc('cache_requests_total', candidates - checked, cache='history_bloom', result='hit')
+        metrics.inc('cache_requests_total', checked, cache='history_bloom', result='miss')
+
+        if not urls and not domains:
+            return set(), set()
+
+        with self._connection() as conn:
+            cursor = conn.execute("""
+                SELECT 'url', candidate.value FROM json_each(?) AS candidate
+                WHERE EXISTS (SELECT 1 FROM company_history WHERE url = candidate.value)
+                UNION ALL
+                SELECT 'domain', candidate.value FROM json_each(?) AS candidate
+                WHERE EXISTS (SELECT 1 FROM company_history WHERE domain = candidate.value)
+            """, (
+                json.dumps(sorted(set(urls)), ensure_ascii=False),
+                json.dumps(sorted(set(domains)), ensure_ascii=False)
+            ))
+
+            known_urls = set()
+            known_domains = set()
+            for kind, value in cursor.fetchall():
+                (known_urls if kind == 'url' else known_domains).add(value)
+
+            metrics.inc('bloom_false_positives_total', len(set(urls)) + len(set(domains)) - len(known_urls) - len(known_domains),
+                        cache='history_bloom')
+            return known_urls, known_domains
+
     def filter_new_companies(self, companies: List[CompanyInfo]) -> List[CompanyInfo]:
         """
         既存履歴と照合して新しい企業のみをフィルタリング
@@ -135,8 +556,10 @@ class HistoryManager:
         Returns:
             履歴にない新しい企業のリスト
         """
-        existing_urls = self.get_existing_urls()
-        existing_domains = self.get_existing_domains()
+        existing_urls, existing_domains = self.find_known(
+            [company.url for company in companies],
+            [self._extract_domain(company.url) for company in companies]
+        )
 
         new_companies = []
         duplicate_count = 0
@@ -160,10 +583,33 @@ class HistoryManager:
         logger.info(f"Filtered: {len(new_companies)} new companies, {duplicate_count} duplicates removed")
         return new_companies
 
+    def filter_new_search_results(self, search_results: List[SearchResult]) -> List[SearchResult]:
+        """
+        履歴に存在するURL・ドメインの検索結果を除外（スクレイピング前の絞り込み用）
+
+        Args:
+            search_results: 検索結果のリスト
+
+        Returns:
+            履歴にない検索結果のリスト
+        """
+        existing_urls, existing_domains = self.find_known(
+            [result.url for result in search_results],
+            [self._extract_domain(result.url) for result in search_results]
+        )
+
+        return [
+            result for result in search_results
+            if result.url not in existing_urls and self._extract_domain(result.url) not in existing_domains
+        ]
+
     def get_history(self, limit: int = 100, offset: int = 0) -> List[Dict]:
         """
         履歴を取得
 
+        深いページはOFFSETの読み飛ばしが遅くなるため、順に辿る場合は
+        get_history_page のカーソルを使う。
+
         Args:
             limit: 取得件数
             offset: オフセット
@@ -171,28 +617,74 @@ class HistoryManager:
         Returns:
             履歴データのリスト
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._connection() as conn:
             cursor = conn.execute("""
                 SELECT * FROM company_history
-                ORDER BY created_at DESC
+                ORDER BY created_at DESC, id DESC
                 LIMIT ? OFFSET ?
             """, (limit, offset))
 
-            history = []
-            for row in cursor.fetchall():
-                item = dict(row)
-                if item['metadata']:
-                    item['metadata'] = json.loads(item['metadata'])
-                history.append(item)
+            return [self._row_to_dict(row) for row in cursor.fetchall()]
 
-            return history
+    def get_history_page(self, limit: int = 100, cursor: Optional[str] = None) -> Dict:
+        """
+        (created_at, id) のキーセットで履歴を1ページ取得
+
+        Args:
+            limit: 取得件数
+            cursor: 前ページの next_cursor（Noneの場合は先頭から）
+
+        Returns:
+            data（履歴データのリスト）と next_cursor（最終ページではNone）の辞書
+        """
+        with self._connection() as conn:
+            if cursor:
+                created_at, row_id = self._decode_cursor(cursor)
+                rows = conn.execute("""
+                    SELECT * FROM company_history
+                    WHERE (created_at, id) < (?, ?)
+                    ORDER BY created_at DESC, id DESC
+                    LIMIT ?
+                """, (created_at, row_id, limit + 1)).fetchall()
+            else:
+                rows = conn.execute("""
+                    SELECT * FROM company_history
+                    ORDER BY created_at DESC, id DESC
+                    LIMIT ?
+                """, (limit + 1,)).fetchall()
+
+        # 1件多く取得して次ページの有無を判定
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self._encode_cursor(rows[-1]['created_at'], rows[-1]['id'])
+
+        return {
+            'data': [self._row_to_dict(row) for row in rows],
+            'next_cursor': next_cursor
+        }
+
+    @staticmethod
+    def _encode_cursor(created_at: str, row_id: int) -> str:
+        """ページングカーソルを作成"""
+        return base64.urlsafe_b64encode(json.dumps([created_at, row_id]).encode('utf-8')).decode('ascii')
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[str, int]:
+        """ページングカーソルを解析"""
+        try:
+            created_at, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            return created_at, int(row_id)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
 
     def get_history_count(self) -> int:
-        """履歴の総件数を取得"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("SELECT COUNT(*) FROM company_history")
-            return cursor.fetchone()[0]
+        """履歴の総件数を取得（集計テーブルから）"""
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT count FROM history_aggregates WHERE kind = 'total' AND value = ''"
+            ).fetchone()
+            return row[0] if row else 0
 
     def delete_by_url(self, url: str) -> bool:
         """
@@ -201,10 +693,13 @@ class HistoryManager:
         Returns:
             削除成功時True
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connection() as conn:
             cursor = conn.execute("DELETE FROM company_history WHERE url = ?", (url,))
-            conn.commit()
-            return cursor.rowcount > 0
+
+        # ブルームフィルタは要素を削除できないため作り直す
+        if cursor.rowcount > 0:
+            self._rebuild_known_filter()
+        return cursor.rowcount > 0
 
     def delete_by_domain(self, domain: str) -> int:
         """
@@ -213,10 +708,12 @@ class HistoryManager:
         Returns:
             削除件数
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connection() as conn:
             cursor = conn.execute("DELETE FROM company_history WHERE domain = ?", (domain,))
-            conn.commit()
-            return cursor.rowcount
+
+        if cursor.rowcount > 0:
+            self._rebuild_known_filter()
+        return cursor.rowcount
 
     def clear_all(self) -> int:
         """
@@ -225,40 +722,97 @@ class HistoryManager:
         Returns:
             削除件数
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connection() as conn:
             cursor = conn.execute("DELETE FROM company_history")
-            conn.commit()
-            return cursor.rowcount
 
-    def search_history(self, query: str) -> List[Dict]:
+        self._rebuild_known_filter()
+        return cursor.rowcount
+
+    def search_history(self, query: str, limit: int = 100, offset: int = 0) -> List[Dict]:
         """
         履歴を検索
 
+        3文字以上の語はFTS5（trigram）で関連度順に検索する。
+        空白区切りの語はAND条件。3文字未満の語を含む場合はLIKE検索にフォールバックする。
+
         Args:
             query: 検索キーワード
+            limit: 取得件数
+            offset: オフセット
 
         Returns:
             マッチした履歴のリスト
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute("""
-                SELECT * FROM company_history
-                WHERE company_name LIKE ?
-                   OR url LIKE ?
-                   OR industry LIKE ?
-                   OR location LIKE ?
-                ORDER BY created_at DESC
-            """, (f"%{query}%", f"%{query}%", f"%{query}%", f"%{query}%"))
-
-            results = []
-            for row in cursor.fetchall():
-                item = dict(row)
-                if item['metadata']:
-                    item['metadata'] = json.loads(item['metadata'])
-                results.append(item)
-
-            return results
+        match = self._build_fts_query(query)
+
+        with self._connection() as conn:
+            if match:
+                cursor = conn.execute(f"""
+                    SELECT h.* FROM company_history_fts
+                    JOIN company_history AS h ON h.id = company_history_fts.rowid
+                    WHERE company_history_fts MATCH ?
+                    ORDER BY bm25(company_history_fts, {', '.join(map(str, FTS_WEIGHTS))})
+                    LIMIT ? OFFSET ?
+                """, (match, limit, offset))
+            else:
+                where, params = self._build_like_filter(query)
+                cursor = conn.execute(f"""
+                    SELECT * FROM company_history
+                    WHERE {where}
+                    ORDER BY created_at DESC
+                    LIMIT ? OFFSET ?
+                """, params + [limit, offset])
+
+            return [self._row_to_dict(row) for row in cursor.fetchall()]
+
+    def get_search_count(self, query: str) -> int:
+        """検索にマッチする履歴の件数を取得"""
+        match = self._build_fts_query(query)
+
+        with self._connection() as conn:
+            if match:
+                cursor = conn.execute(
+                    "SELECT COUNT(*) FROM company_history_fts WHERE company_history_fts MATCH ?", (match,)
+                )
+            else:
+                where, params = self._build_like_filter(query)
+                cursor = conn.execute(f"SELECT COUNT(*) FROM company_history WHERE {where}", params)
+
+            return cursor.fetchone()[0]
+
+    def _build_fts_query(self, query: str) -> Optional[str]:
+        """
+        検索キーワードをFTS5のMATCH式に変換（FTSが使えない場合はNone）
+
+        各語はフレーズとして引用し、記号がFTS5の構文として解釈されないようにする。
+        """
+        terms = query.split()
+        if not self.fts_enabled or not terms or any(len(term) < FTS_MIN_TERM_LENGTH for term in terms):
+            return None
+
+        return ' AND '.join('"' + term.replace('"', '""') + '"' for term in terms)
+
+    @staticmethod
+    def _build_like_filter(query: str) -> Tuple[str, List[str]]:
+        """
+        LIKE検索のWHERE句とパラメータを構築（空白区切りの語はAND条件）
+        """
+        clauses = []
+        params = []
+        for term in query.split() or ['']:
+            pattern = '%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            clauses.append('(' + ' OR '.join(f"{column} LIKE ? ESCAPE '\\'" for column in FTS_COLUMNS) + ')')
+            params.extend([pattern] * len(FTS_COLUMNS))
+
+        return ' AND '.join(clauses), params
+
+    @staticmethod
+    def _row_to_dict(row: sqlite3.Row) -> Dict:
+        """履歴の行を辞書に変換（メタデータのJSONを展開）"""
+        item = dict(row)
+        if item.get('metadata'):
+            item['metadata'] = json.loads(item['metadata'])
+        return item
 
     @staticmethod
     def _extract_domain(url: str) -> str:
@@ -275,32 +829,22 @@ class HistoryManager:
         """
         履歴の統計情報を取得
 
+        件数は集計テーブル、最終追加日は created_at のインデックスから取得するため、
+        履歴の件数に関係なく一定時間で返る。
+
         Returns:
             統計情報の辞書
         """
-        with sqlite3.connect(self.db_path) as conn:
-            # 総件数
-            total_count = conn.execute("SELECT COUNT(*) FROM company_history").fetchone()[0]
-
-            # 業種別件数 Top 10
-            industry_stats = conn.execute("""
-                SELECT industry, COUNT(*) as count
-                FROM company_history
-                WHERE industry IS NOT NULL AND industry != ''
-                GROUP BY industry
-                ORDER BY count DESC
-                LIMIT 10
-            """).fetchall()
-
-            # 地域別件数 Top 10
-            location_stats = conn.execute("""
-                SELECT location, COUNT(*) as count
-                FROM company_history
-                WHERE location IS NOT NULL AND location != ''
-                GROUP BY location
-                ORDER BY count DESC
-                LIMIT 10
-            """).fetchall()
+        with self._connection() as conn:
+            # 業種別・地域別件数 Top 10
+            top = {}
+            for kind in ('industry', 'location'):
+                top[kind] = conn.execute("""
+                    SELECT value, count FROM history_aggregates
+                    WHERE kind = ?
+                    ORDER BY count DESC
+                    LIMIT 10
+                """, (kind,)).fetchall()
 
             # 最近の追加日
             last_added = conn.execute("""
@@ -308,9 +852,9 @@ class HistoryManager:
                 ORDER BY created_at DESC LIMIT 1
             """).fetchone()
 
-            return {
-                'total_count': total_count,
-                'top_industries': [{'industry': i[0], 'count': i[1]} for i in industry_stats],
-                'top_locations': [{'location': l[0], 'count': l[1]} for l in location_stats],
-                'last_added': last_added[0] if last_added else None
-            }
+        return {
+            'total_count': self.get_history_count(),
+            'top_industries': [{'industry': i[0], 'count': i[1]} for i in top['industry']],
+            'top_locations': [{'location': l[0], 'count': l[1]} for l in top['location']],
+            'last_added': last_added[0] if last_added else None
+        }
@@ -0,0 +1,652 @@
+#!/usr/bin/env python3
+"""
+ジョブキュー - Webアプリの生成ジョブをSQLiteに永続化して複数ワーカーで処理
+"""
+
+import sqlite3
+import json
+import uuid
+from typing import Iterator, List, Dict, Optional, Tuple
+from datetime import datetime, timedelta
+from pathlib import Path
+import logging
+
+from config.config import config
+from metrics import aggregate_samples
+from scorer import lead_priority
+
+logger = logging.getLogger(__name__)
+
+# 終了状態（これ以上更新されない）
+FINISHED_STATUSES = ('completed', 'error', 'cancelled')
+
+# ジョブ結果のリード一覧の並び順（APIのsortパラメータ -> ORDER BY）
+LEAD_SORT_ORDERS = {
+    'score': 'total_score DESC, rank',
+    'score_asc': 'total_score ASC, rank',
+    'name': 'company_name COLLATE NOCASE, rank',
+    'rank': 'rank',
+}
+
+LEAD_PRIORITIES = ('high', 'medium', 'low')
+
+class JobQueue:
+    """
+    SQLiteベースの永続ジョブキュー
+
+    Webプロセスとワーカープロセスが同じDBを共有する。状態はすべてDBにあるため、
+    どのプロセスが再起動しても失われない。更新のたびに単調増加する seq を振り、
+    Webプロセスは seq を追うことで進捗の変化をまとめて取得できる。
+    """
+
+    def __init__(self, db_path: str = None):
+        if db_path is None:
+            # デフォルトのパス
+            db_path = Path(__file__).parent.parent / "data" / "jobs.db"
+
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        """接続を作成（WALで読み込みと書き込みを並行させる）"""
+        conn = sqlite3.connect(self.db_path, timeout=30.0)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _init_db(self):
+        """データベースを初期化"""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS jobs (
+                        id TEXT PRIMARY KEY,
+                        user_id TEXT NOT NULL,
+                        priority INTEGER NOT NULL DEFAULT 0,
+                        status TEXT NOT NULL DEFAULT 'queued',
+                        params TEXT NOT NULL,
+                        progress INTEGER NOT NULL DEFAULT 0,
+                        stage TEXT,
+                        message TEXT,
+                        result TEXT,
+                        error TEXT,
+                        worker_id TEXT,
+                        attempts INTEGER NOT NULL DEFAULT 0,
+                        cancel_requested INTEGER NOT NULL DEFAULT 0,
+                        seq INTEGER NOT NULL DEFAULT 0,
+                        created_at TEXT NOT NULL,
+                        started_at TEXT,
+                        finished_at TEXT,
+                        heartbeat_at TEXT
+                    )
+                """)
+
+                conn.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_jobs_queue ON jobs(status, priority DESC, created_at)
+                """)
+
+                conn.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_jobs_user_status ON jobs(user_id, status)
+                """)
+
+                conn.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_jobs_seq ON jobs(seq)
+                """)
+
+                # ジョブ結果のリード（結果本体とは分けて、1行1リードで保存）
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS job_leads (
+                        job_id TEXT NOT NULL,
+                        rank INTEGER NOT NULL,
+                        company_name TEXT,
+                        url TEXT,
+                        industry TEXT,
+                        location TEXT,
+                        total_score REAL NOT NULL,
+                        priority TEXT NOT NULL,
+                        is_wordpress INTEGER NOT NULL DEFAULT 0,
+                        data TEXT NOT NULL,
+                        PRIMARY KEY (job_id, rank)
+                    )
+                """)
+
+                # 並び替え・絞り込みの列ごとのインデックス（いずれもジョブ内で完結）
+                for name, columns in (
+                    ('idx_job_leads_score', 'job_id, total_score'),
+                    ('idx_job_leads_name', 'job_id, company_name COLLATE NOCASE'),
+                    ('idx_job_leads_priority', 'job_id, priority, total_score'),
+                    ('idx_job_leads_industry', 'job_id, industry, total_score'),
+                    ('idx_job_leads_wordpress', 'job_id, is_wordpress, total_score'),
+                ):
+                    conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON job_leads({columns})")
+
+                # 全ジョブの計測値の累計（/metrics で出力。ワーカーの各プロセスから加算する）
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS metric_totals (
+                        name TEXT NOT NULL,
+                        labels TEXT NOT NULL,
+                        value REAL NOT NULL,
+                        PRIMARY KEY (name, labels)
+                    )
+                """)
+
+                # 既存DBのマイグレーション: 進捗ステージの列を追加
+                columns = {row['name'] for row in conn.execute("PRAGMA table_info(jobs)")}
+                if 'stage' not in columns:
+                    conn.execute("ALTER TABLE jobs ADD COLUMN stage TEXT")
+        finally:
+            conn.close()
+
+    @staticmethod
+    def new_job_id() -> str:
+        """ジョブIDを生成（同時刻に複数のジョブが投入されても衝突しない）"""
+        return f"job_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+
+    def enqueue(self, params: Dict, user_id: str = 'default', priority: int = 0, job_id: str = None) -> str:
+        """
+        ジョブを投入
+
+        Args:
+            params: generate_leads に渡す検索パラメータ
+            user_id: 同時実行数の制限単位となるユーザー
+            priority: 大きいほど先に実行される
+
+        Returns:
+            ジョブID
+        """
+        job_id = job_id or self.new_job_id()
+        now = datetime.now().isoformat()
+
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("""
+                    INSERT INTO jobs (id, user_id, priority, params, message, seq, created_at)
+                    VALUES (?, ?, ?, ?, ?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM jobs), ?)
+                """, (job_id, user_id, priority, json.dumps(params, ensure_ascii=False),
+                      '実行待ちです...', now))
+        finally:
+            conn.close()
+
+        logger.info(f"Queued job {job_id} for user {user_id} (priority {priority})")
+        return job_id
+
+    def claim_next(self, worker_id: str, per_user_limit: int = None) -> Optional[Dict]:
+        """
+        実行可能なジョブを1件取得して実行中にする
+
+        優先度の高い順、同じ優先度では投入順。実行中のジョブ数が上限に達している
+        ユーザーのジョブは飛ばす。
+
+        Returns:
+            ジョブの辞書（実行可能なジョブが無い場合はNone）
+        """
+        per_user_limit = per_user_limit or config.jobs.per_user_limit
+        now = datetime.now().isoformat()
+
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("""
+                SELECT id FROM jobs AS queued
+                WHERE status = 'queued'
+                  AND (
+                      SELECT COUNT(*) FROM jobs AS running
+                      WHERE running.user_id = queued.user_id AND running.status = 'running'
+                  ) < ?
+                ORDER BY priority DESC, created_at
+                LIMIT 1
+            """, (per_user_limit,)).fetchone()
+
+            if row is None:
+                conn.rollback()
+                return None
+
+            conn.execute("""
+                UPDATE jobs
+                SET status = 'running', worker_id = ?, attempts = attempts + 1, progress = 0, stage = NULL,
+                    message = '処理を開始しています...', started_at = ?, heartbeat_at = ?,
+                    seq = (SELECT MAX(seq) + 1 FROM jobs)
+                WHERE id = ?
+            """, (worker_id, now, now, row['id']))
+            conn.commit()
+
+            return self._to_dict(conn.execute("SELECT * FROM jobs WHERE id = ?", (row['id'],)).fetchone())
+        finally:
+            conn.close()
+
+    def update_progress(self, job_id: str, progress: int, message: str, stage: str = None, worker_id: str = None):
+        """進捗を更新（ハートビートも兼ねる）"""
+        self._update(job_id, "progress = ?, message = ?, stage = ?, heartbeat_at = ?",
+                     (progress, message, stage, datetime.now().isoformat()), only_running=True, worker_id=worker_id)
+
+    def heartbeat(self, job_id: str, worker_id: str = None) -> bool:
+        """
+        ハートビートを記録
+
+        worker_id を指定した場合は、そのワーカーが実行中のジョブの場合のみ記録する。
+        ハートビートが途絶えて再投入されたジョブは、他のワーカーが実行しているか実行待ちに
+        戻っているため、元のワーカーは処理を中断しなければならない。
+
+        Returns:
+            キャンセルが要求されている場合、またはこのワーカーの実行ではなくなった場合True
+        """
+        where, params = self._running_where(job_id, worker_id)
+
+        conn = self._connect()
+        try:
+            with conn:
+                cursor = conn.execute(f"UPDATE jobs SET heartbeat_at = ? WHERE {where}",
+                                      (datetime.now().isoformat(),) + params)
+                if not cursor.rowcount:
+                    return True
+                row = conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            return bool(row['cancel_requested'])
+        finally:
+            conn.close()
+
+    def complete(self, job_id: str, result: Dict, message: str = None, worker_id: str = None) -> bool:
+        """
+        ジョブを完了にする
+
+        結果の 'leads'（全リード）は job_leads テーブルに1行ずつ保存し、
+        結果本体には統計などの要約のみを残す。
+
+        Returns:
+            記録した場合True（実行中でない・worker_id のワーカーの実行ではない場合はFalse）
+        """
+        result = dict(result)
+        leads = result.pop('leads', None) or []
+        rows = [
+            (
+                job_id,
+                rank,
+                lead.get('company_name'),
+                lead.get('url'),
+                lead.get('industry'),
+                lead.get('location'),
+                lead.get('total_score', 0),
+                lead_priority(lead.get('total_score', 0)),
+                int(bool(lead.get('is_wordpress'))),
+                json.dumps(lead, ensure_ascii=False, default=str)
+            )
+            for rank, lead in enumerate(leads, 1)
+        ]
+
+        where, params = self._running_where(job_id, worker_id)
+
+        conn = self._connect()
+        try:
+            with conn:
+                cursor = conn.execute(f"""
+                    UPDATE jobs
+                    SET status = 'completed', progress = 100, message = ?, result = ?, finished_at = ?,
+                        seq = (SELECT MAX(seq) + 1 FROM jobs)
+                    WHERE {where}
+                """, (message or '完了しました', json.dumps(result, ensure_ascii=False, default=str),
+                      datetime.now().isoformat()) + params)
+
+                if cursor.rowcount:
+                    conn.execute("DELETE FROM job_leads WHERE job_id = ?", (job_id,))
+                    conn.executemany("""
+                        INSERT INTO job_leads
+                        (job_id, rank, company_name, url, industry, location, total_score, priority, is_wordpress, data)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """, rows)
+            return cursor.rowcount > 0
+        finally:
+            conn.close()
+
+    def fail(self, job_id: str, error: str, message: str = None, worker_id: str = None) -> bool:
+        """ジョブをエラーにする（記録した場合True）"""
+        return self._update(job_id, "status = 'error', progress = 0, message = ?, error = ?, finished_at = ?",
+                            (message or f'エラー: {error}', error, datetime.now().isoformat()),
+                            only_running=True, worker_id=worker_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        ジョブのキャンセル
+
+        実行待ちのジョブは即座にキャンセルされる。実行中のジョブはキャンセル要求を記録し、
+        ワーカーが次のハートビートで中断する。
+
+        Returns:
+            キャンセルを受け付けた場合True（終了済み・存在しない場合はFalse）
+        """
+        now = datetime.now().isoformat()
+
+        conn = self._connect()
+        try:
+            with conn:
+                cursor = conn.execute("""
+                    UPDATE jobs
+                    SET status = 'cancelled', message = 'キャンセルされました', finished_at = ?,
+                        seq = (SELECT MAX(seq) + 1 FROM jobs)
+                    WHERE id = ? AND status = 'queued'
+                """, (now, job_id))
+                if cursor.rowcount:
+                    return True
+
+                cursor = conn.execute("""
+                    UPDATE jobs
+                    SET cancel_requested = 1, message = 'キャンセルしています...',
+                        seq = (SELECT MAX(seq) + 1 FROM jobs)
+                    WHERE id = ? AND status = 'running'
+                """, (job_id,))
+                return cursor.rowcount > 0
+        finally:
+            conn.close()
+
+    def retry(self, job_id: str) -> bool:
+        """
+        エラーになったジョブを再投入
+
+        ワーカーは同じジョブIDで実行するため、チェックポイントに保存済みのステージは省略される。
+
+        Returns:
+            再投入した場合True（エラー状態のジョブが無い場合はFalse）
+        """
+        conn = self._connect()
+        try:
+            with conn:
+                cursor = conn.execute("""
+                    UPDATE jobs
+                    SET status = 'queued', worker_id = NULL, attempts = 0, cancel_requested = 0, progress = 0,
+                        stage = NULL, error = NULL, finished_at = NULL, message = '再実行を待っています...',
+                        seq = (SELECT MAX(seq) + 1 FROM jobs)
+                    WHERE id = ? AND status = 'error'
+                """, (job_id,))
+                return cursor.rowcount > 0
+        finally:
+            conn.close()
+
+    def mark_cancelled(self, job_id: str, worker_id: str = None) -> bool:
+        """実行中に中断したジョブをキャンセル済みにする（記録した場合True）"""
+        return self._update(job_id, "status = 'cancelled', message = 'キャンセルされました', finished_at = ?",
+                            (datetime.now().isoformat(),), only_running=True, worker_id=worker_id)
+
+    def requeue_stale(self, stale_timeout: float = None, max_attempts: int = None) -> int:
+        """
+        ハートビートが途絶えた実行中ジョブ（ワーカーの異常終了）を再投入
+
+        キャンセルが要求されていたジョブはキャンセル済みにし、試行回数が上限に達したジョブはエラーにする。
+
+        Returns:
+            再投入・キャンセル済み・エラーにした件数
+        """
+        stale_timeout = stale_timeout if stale_timeout is not None else config.jobs.stale_timeout
+        max_attempts = max_attempts or config.jobs.max_attempts
+        now = datetime.now().isoformat()
+        threshold = (datetime.now() - timedelta(seconds=stale_timeout)).isoformat()
+
+        conn = self._connect()
+        try:
+            with conn:
+                cancelled = conn.execute("""
+                    UPDATE jobs
+                    SET status = 'cancelled', message = 'キャンセルされました',
+                        finished_at = ?, seq = (SELECT MAX(seq) + 1 FROM jobs)
+                    WHERE status = 'running' AND heartbeat_at < ? AND cancel_requested = 1
+                """, (now, threshold)).rowcount
+
+                failed = conn.execute("""
+                    UPDATE jobs
+                    SET status = 'error', error = 'Worker stopped', message = 'エラー: ワーカーが停止しました',
+                        finished_at = ?, seq = (SELECT MAX(seq) + 1 FROM jobs)
+                    WHERE status = 'running' AND heartbeat_at < ? AND attempts >= ?
+                """, (now, threshold, max_attempts)).rowcount
+
+                requeued = conn.execute("""
+                    UPDATE jobs
+                    SET status = 'queued', worker_id = NULL, progress = 0, stage = NULL, message = '再実行を待っています...',
+                        seq = (SELECT MAX(seq) + 1 FROM jobs)
+                    WHERE status = 'running' AND heartbeat_at < ?
+                """, (threshold,)).rowcount
+        finally:
+            conn.close()
+
+        if cancelled or failed or requeued:
+            logger.warning(f"Recovered stale jobs: {requeued} requeued, {cancelled} cancelled, {failed} failed")
+        return cancelled + failed + requeued
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """ジョブを取得"""
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            return self._to_dict(row) if row else None
+        finally:
+            conn.close()
+
+    def get_result(self, job_id: str) -> Optional[Dict]:
+        """完了したジョブの結果を取得"""
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT result FROM jobs WHERE id = ? AND status = 'completed'", (job_id,)).fetchone()
+            return json.loads(row['result']) if row and row['result'] else None
+        finally:
+            conn.close()
+
+    def get_leads(self, job_id: str, limit: int = 50, offset: int = 0, sort: str = 'score',
+                  priority: str = None, industry: str = None, is_wordpress: bool = None,
+                  min_score: float = None) -> Dict:
+        """
+        ジョブ結果のリードをページ単位で取得
+
+        並び替え・絞り込みはインデックス付きの列で行うため、ジョブのリード数に
+        関わらず1ページ分の読み込みで済む。
+
+        Args:
+            sort: LEAD_SORT_ORDERS のキー
+            priority: high / medium / low
+            is_wordpress: WordPressサイトのみ(True)・それ以外のみ(False)
+
+        Returns:
+            {'data': リードのリスト, 'total': 絞り込み後の総件数}
+
+        Raises:
+            ValueError: 並び順・優先度の指定が不正な場合
+        """
+        if sort not in LEAD_SORT_ORDERS:
+            raise ValueError(f"Invalid sort: {sort}")
+        if priority is not None and priority not in LEAD_PRIORITIES:
+            raise ValueError(f"Invalid priority: {priority}")
+
+        where = ["job_id = ?"]
+        params = [job_id]
+        if priority is not None:
+            where.append("priority = ?")
+            params.append(priority)
+        if industry:
+            where.append("industry = ?")
+            params.append(industry)
+        if is_wordpress is not None:
+            where.append("is_wordpress = ?")
+            params.append(int(is_wordpress))
+        if min_score is not None:
+            where.append("total_score >= ?")
+            params.append(min_score)
+        where_clause = " AND ".join(where)
+
+        conn = self._connect()
+        try:
+            total = conn.execute(f"SELECT COUNT(*) FROM job_leads WHERE {where_clause}", params).fetchone()[0]
+            rows = conn.execute(f"""
+                SELECT rank, priority, data FROM job_leads
+                WHERE {where_clause}
+                ORDER BY {LEAD_SORT_ORDERS[sort]}
+                LIMIT ? OFFSET ?
+            """, params + [limit, offset]).fetchall()
+        finally:
+            conn.close()
+
+        return {
+            'data': [{**json.loads(row['data']), 'rank': row['rank'], 'priority': row['priority']} for row in rows],
+            'total': total
+        }
+
+    def iter_leads(self, job_id: str, batch_size: int = 500) -> Iterator[Dict]:
+        """
+        ジョブ結果の全リードを順位順に逐次取得（ダウンロード用）
+
+        順位のキーセットでバッチごとに読み込むため、リード数に関わらずメモリ使用量は一定。
+        """
+        last_rank = 0
+        while True:
+            conn = self._connect()
+            try:
+                rows = conn.execute("""
+                    SELECT rank, data FROM job_leads
+                    WHERE job_id = ? AND rank > ?
+                    ORDER BY rank
+                    LIMIT ?
+                """, (job_id, last_rank, batch_size)).fetchall()
+            finally:
+                conn.close()
+
+            if not rows:
+                return
+
+            for row in rows:
+                yield json.loads(row['data'])
+            last_rank = rows[-1]['rank']
+
+    def get_lead_industries(self, job_id: str) -> List[str]:
+        """ジョブ結果に含まれる業種の一覧（絞り込みの選択肢）"""
+        conn = self._connect()
+        try:
+            rows = conn.execute("""
+                SELECT DISTINCT industry FROM job_leads
+                WHERE job_id = ? AND industry IS NOT NULL AND industry != ''
+                ORDER BY industry
+            """, (job_id,)).fetchall()
+            return [row['industry'] for row in rows]
+        finally:
+            conn.close()
+
+    def list_jobs(self, user_id: str = None, limit: int = 50) -> List[Dict]:
+        """最近のジョブ一覧を取得"""
+        query = "SELECT * FROM jobs"
+        params = []
+        if user_id:
+            query += " WHERE user_id = ?"
+            params.append(user_id)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+
+        conn = self._connect()
+        try:
+            return [self._to_dict(row) for row in conn.execute(query, params)]
+        finally:
+            conn.close()
+
+    def get_updates(self, since_seq: int = 0) -> Tuple[List[Dict], int]:
+        """
+        指定した seq 以降に更新されたジョブを取得
+
+        Returns:
+            (更新されたジョブのリスト, 最新の seq)
+        """
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT * FROM jobs WHERE seq > ? ORDER BY seq", (since_seq,)).fetchall()
+            last_seq = rows[-1]['seq'] if rows else since_seq
+            return [self._to_dict(row) for row in rows], last_seq
+        finally:
+            conn.close()
+
+    def latest_seq(self) -> int:
+        """現在の最新の seq"""
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT COALESCE(MAX(seq), 0) FROM jobs").fetchone()[0]
+        finally:
+            conn.close()
+
+    def record_metrics(self, metrics: Dict):
+        """
+        ジョブの計測値（生成結果の 'metrics'）を累計に加算
+        """
+        samples = aggregate_samples(metrics or {})
+        if not samples:
+            return
+
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany("""
+                    INSERT INTO metric_totals (name, labels, value) VALUES (?, ?, ?)
+                    ON CONFLICT (name, labels) DO UPDATE SET value = value + excluded.value
+                """, [(name, json.dumps(labels, sort_keys=True, ensure_ascii=False), value)
+                      for name, labels, value in samples])
+        finally:
+            conn.close()
+
+    def metric_totals(self) -> List[Tuple[str, Dict[str, str], float]]:
+        """計測値の累計（(指標名, ラベル, 値) のリスト）"""
+        conn = self._connect()
+        try:
+            return [(row['name'], json.loads(row['labels']), row['value'])
+                    for row in conn.execute("SELECT name, labels, value FROM metric_totals")]
+        finally:
+            conn.close()
+
+    def status_counts(self) -> Dict[str, int]:
+        """状態ごとのジョブ数"""
+        conn = self._connect()
+        try:
+            return {row['status']: row['count']
+                    for row in conn.execute("SELECT status, COUNT(*) AS count FROM jobs GROUP BY status")}
+        finally:
+            conn.close()
+
+    def _update(self, job_id: str, assignments: str, params: tuple, only_running: bool = False,
+                worker_id: str = None) -> bool:
+        """ジョブの列を更新し、seq を進める（更新した場合True）"""
+        if only_running:
+            where, where_params = self._running_where(job_id, worker_id)
+        else:
+            where, where_params = "id = ?", (job_id,)
+
+        conn = self._connect()
+        try:
+            with conn:
+                cursor = conn.execute(f"""
+                    UPDATE jobs SET {assignments}, seq = (SELECT MAX(seq) + 1 FROM jobs)
+                    WHERE {where}
+                """, params + where_params)
+            return cursor.rowcount > 0
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _running_where(job_id: str, worker_id: str = None) -> Tuple[str, tuple]:
+        """実行中のジョブ（worker_id 指定時はそのワーカーが実行中のもの）を選ぶ条件"""
+        if worker_id is None:
+            return "id = ? AND status = 'running'", (job_id,)
+        return "id = ? AND status = 'running' AND worker_id = ?", (job_id, worker_id)
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict:
+        """ジョブの行を辞書に変換（結果本体は含めない）"""
+        return {
+            'job_id': row['id'],
+            'user_id': row['user_id'],
+            'priority': row['priority'],
+            'status': row['status'],
+            'worker_id': row['worker_id'],
+            'progress': row['progress'],
+            'stage': row['stage'],
+            'message': row['message'],
+            'error': row['error'],
+            'search_params': json.loads(row['params']),
+            'attempts': row['attempts'],
+            'cancel_requested': bool(row['cancel_requested']),
+            'created_at': row['created_at'],
+            'start_time': row['started_at'],
+            'end_time': row['finished_at'],
+            'seq': row['seq']
+        }
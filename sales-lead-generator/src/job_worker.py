@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+ジョブワーカー - ジョブキューから生成ジョブを取り出して実行
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import logging
+
+# 単体で起動された場合もプロジェクトのモジュールを読み込めるようにする
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config.config import config
+from job_queue import JobQueue
+
+logger = logging.getLogger(__name__)
+
+class JobWorker:
+    """
+    ジョブキューをポーリングし、1件ずつ generate_leads を実行するワーカー
+
+    実行中は一定間隔でハートビートを記録し、キャンセル要求があれば処理を中断する。
+    """
+
+    def __init__(self, queue: JobQueue = None, worker_id: str = None, generator_factory=None):
+        """
+        Args:
+            generator_factory: scraper を受け取り生成器を返す関数（デフォルトは SalesLeadGenerator）
+        """
+        self.queue = queue or JobQueue()
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        if generator_factory is None:
+            from main import SalesLeadGenerator
+            generator_factory = SalesLeadGenerator
+        self.generator_factory = generator_factory
+        self.generator = None
+        self.config = config.jobs
+        # 次に停止したワーカーのジョブを回収する時刻（time.monotonic）
+        self._next_stale_check = 0.0
+
+    async def run(self, max_jobs: Optional[int] = None):
+        """
+        ジョブを取り出して実行し続ける
+
+        ワーカーの生存期間中は1つのイベントループと1つの生成器を使い続け、
+        Anthropic・Google APIのクライアントとHTTPセッションを全ジョブで共有する。
+
+        Args:
+            max_jobs: 処理するジョブ数の上限（Noneの場合は無制限）
+        """
+        from scraper import WebScraper
+
+        logger.info(f"Worker {self.worker_id} started")
+        processed = 0
+
+        async with WebScraper() as scraper:
+            self.generator = self.generator_factory(scraper=scraper)
+
+            while max_jobs is None or processed < max_jobs:
+                job = self._claim_next()
+                if job is None:
+                    await asyncio.sleep(self.config.poll_interval)
+                    continue
+
+                await self.run_job(job)
+                processed += 1
+
+    def _claim_next(self) -> Optional[Dict]:
+        """
+        次のジョブを取得
+
+        停止したワーカーのジョブの回収は書き込みトランザクションになるため、
+        ポーリングごとではなく stale_check_interval ごとに行う。
+        """
+        now = time.monotonic()
+        if now >= self._next_stale_check:
+            self.queue.requeue_stale()
+            self._next_stale_check = now + self.config.stale_check_interval
+        return self.queue.claim_next(self.worker_id)
+
+    async def run_job(self, job: Dict):
+        """
+        1件のジョブを実行し、結果をキューに記録
+        """
+        job_id = job['job_id']
+        params = job['search_params']
+        logger.info(f"Worker {self.worker_id} running {job_id}")
+
+        try:
+            if self.generator is None:
+                self.queue.update_progress(job_id, 10, "検索エンジンを初期化しています...", worker_id=self.worker_id)
+                self.generator = self.generator_factory()
+
+            task = asyncio.ensure_future(self.generator.generate_leads(
+                industry=params.get('industry', ''),
+                location=params.get('location', ''),
+                additional_keywords=params.get('keywords', []),
+                max_results=params.get('max_results', 20),
+                export_formats=[],
+                sync_to_crm=False,
+                wordpress_only=params.get('wordpress_only', False),
+                progress_callback=self._progress_writer(job_id),
+                job_id=job_id,
+                # エラーになったジョブは同じIDで再投入でき、完了済みのステージから再開する
+                checkpoint=True
+            ))
+
+            # ハートビートを送りつつ完了を待つ（キャンセル要求があれば中断）
+            while True:
+                done, _ = await asyncio.wait({task}, timeout=self.config.heartbeat_interval)
+                if done:
+                    break
+                # キャンセル要求、または停止したとみなされて他のワーカーに再投入された場合は中断
+                if self.queue.heartbeat(job_id, worker_id=self.worker_id):
+                    logger.info(f"Stopping {job_id}")
+                    task.cancel()
+                    await asyncio.gather(task, return_exceptions=True)
+                    if not self.queue.mark_cancelled(job_id, worker_id=self.worker_id):
+                        logger.warning(f"Job {job_id} was requeued after missed heartbeats; dropped this run")
+                    return
+
+            result = task.result()
+
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {e}", exc_info=True)
+            self.queue.fail(job_id, str(e), message=f'システムエラー: {e}', worker_id=self.worker_id)
+            return
+
+        if result.get('success'):
+            recorded = self.queue.complete(job_id, result, worker_id=self.worker_id,
+                                           message=f'完了！{result.get("leads_count", 0)}件のリードを取得しました。')
+        else:
+            recorded = self.queue.fail(job_id, result.get('error', '不明なエラー'), worker_id=self.worker_id)
+
+        # 再投入されて他のワーカーが実行しているジョブの結果・計測値は記録しない
+        if recorded:
+            self.queue.record_metrics(result.get('metrics'))
+        else:
+            logger.warning(f"Job {job_id} is no longer owned by {self.worker_id}; discarded its result")
+
+    def _progress_writer(self, job_id: str) -> Callable[[Dict], None]:
+        """
+        進捗イベントをキューに書き込むコールバックを作成
+
+        スクレイピングなどは1件ごとにイベントが来るため、書き込みは
+        progress_interval ごとに間引く。ステージの切り替わりと完了は必ず書き込む。
+        """
+        last_written = {'stage': None, 'time': 0.0}
+
+        def write(event: Dict):
+            now = time.monotonic()
+            stage_changed = event['stage'] != last_written['stage']
+            stage_finished = event['done'] >= event['total']
+            if not (stage_changed or stage_finished or now - last_written['time'] >= self.config.progress_interval):
+                return
+
+            self.queue.update_progress(job_id, event['progress'], event['message'], stage=event['stage'],
+                                       worker_id=self.worker_id)
+            last_written['stage'] = event['stage']
+            last_written['time'] = now
+
+        return write
+
+class WorkerPool:
+    """
+    ワーカープロセスのプール
+
+    各ワーカーはこのモジュールを別プロセスとして起動する（Webプロセスの
+    イベントループやリクエスト処理とCPU・GILを奪い合わない）。
+    """
+
+    def __init__(self, num_workers: int = None, db_path: str = None):
+        self.num_workers = num_workers if num_workers is not None else config.jobs.workers
+        self.db_path = db_path
+        self.processes: List[subprocess.Popen] = []
+
+    def start(self):
+        """ワーカープロセスを起動"""
+        # ジョブの所有者の判定に使うため、同じホストの別のプールとも重複しないIDにする
+        prefix = f"{socket.gethostname()}-{os.getpid()}"
+        for i in range(self.num_workers):
+            command = [sys.executable, str(Path(__file__).resolve()), '--worker-id', f"{prefix}-worker-{i}"]
+            if self.db_path:
+                command.extend(['--db', str(self.db_path)])
+            self.processes.append(subprocess.Popen(command))
+
+        logger.info(f"Started {self.num_workers} job workers")
+
+    def stop(self, timeout: float = 10.0):
+        """
+        ワーカープロセスを停止
+
+        実行中だったジョブはハートビートが途絶えた後に他のワーカーが再実行する。
+        """
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            try:
+                process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        self.processes = []
+
+def main():
+    """
+    コマンドライン実行のメイン関数
+    """
+    parser = argparse.ArgumentParser(description="生成ジョブのワーカー")
+    parser.add_argument("--db", help="ジョブキューDBのパス")
+    parser.add_argument("--worker-id", help="ワーカーID")
+    parser.add_argument("--workers", type=int, help="起動するワーカープロセス数（指定時はプールを起動）")
+    args = parser.parse_args()
+
+    if args.workers:
+        pool = WorkerPool(args.workers, args.db)
+        pool.start()
+        try:
+            for process in pool.processes:
+                process.wait()
+        except KeyboardInterrupt:
+            pool.stop()
+        return
+
+    worker = JobWorker(JobQueue(args.db), worker_id=args.worker_id)
+    try:
+        asyncio.run(worker.run())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
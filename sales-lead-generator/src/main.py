@@ -7,19 +7,26 @@ import asyncio
 import argparse
 import logging
 import sys
-from typing import Dict, List
+from contextlib import asynccontextmanager
+from dataclasses import asdict
+from typing import Dict, List, Optional, Set, Tuple
 from datetime import datetime
 
 from config.config import config
-from models import SearchQuery
+from models import CompanyInfo, SearchQuery, SearchResult
 from search_engine import SearchEngine, QueryBuilder
 from scraper import WebScraper
-from claude_extractor import ClaudeExtractor
+from claude_extractor import ClaudeExtractor, PROMPT_CONTENT_LENGTH
 from data_enhancer import DataEnhancer
 from scorer import LeadScorer, ScoreAnalyzer
 from exporters import DataExporter, CSVTemplateGenerator
 from crm_integrations import CRMIntegrationManager
 from history_manager import HistoryManager
+from progress import ProgressReporter, ProgressCallback
+from campaign import CampaignRunner, load_campaign
+from checkpoint_store import CheckpointStore, JobCheckpoints
+from job_queue import JobQueue
+import metrics
 
 # ロギング設定
 logging.basicConfig(
@@ -34,14 +41,33 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class SalesLeadGenerator:
-    def __init__(self):
-        self.search_engine = SearchEngine()
+    def __init__(self, scraper: Optional[WebScraper] = None):
+        """
+        Args:
+            scraper: 開いたままの WebScraper。指定すると全ての実行でHTTPセッション
+                     （コネクションプール）を共有する。ワーカーのように1つのイベントループで
+                     繰り返し実行する場合に、生成器ごと使い回して接続・TLSハンドシェイクを省く
+        """
+        self.scraper = scraper
+        self.search_engine = SearchEngine(session=scraper.session if scraper else None)
         self.claude_extractor = ClaudeExtractor()
-        self.data_enhancer = DataEnhancer()
+        self.data_enhancer = DataEnhancer(claude_extractor=self.claude_extractor, scraper=scraper)
         self.scorer = LeadScorer()
         self.exporter = DataExporter()
         self.crm_manager = CRMIntegrationManager()
         self.history_manager = HistoryManager()
+        self._checkpoint_store = None
+
+    @property
+    def checkpoint_store(self) -> CheckpointStore:
+        """チェックポイントストア（ジョブIDを指定して実行するまで作成しない）"""
+        if self._checkpoint_store is None:
+            self._checkpoint_store = CheckpointStore()
+        return self._checkpoint_store
+
+    @checkpoint_store.setter
+    def checkpoint_store(self, store: CheckpointStore):
+        self._checkpoint_store = store
 
     async def generate_leads(
         self,
@@ -52,94 +78,174 @@ class SalesLeadGenerator:
         export_formats: List[str] = None,
         sync_to_crm: bool = False,
         wordpress_only: bool = False,
-        exclude_history: bool = True
+        exclude_history: bool = True,
+        progress_callback: Optional[ProgressCallback] = None,
+        job_id: Optional[str] = None,
+        trace_path: Optional[str] = None,
+        checkpoint: bool = False,
+        claimed_domains: Optional[Set[str]] = None
     ) -> Dict:
         """
         営業リードを生成するメイン処理
+
+        結果の 'metrics' にはステージごとの所要時間、HTTPリクエスト数・バイト数、
+        Claude APIのトークン数、キャッシュヒット率などの計測値（metrics.MetricsCollector 参照）が入る。
+
+        Args:
+            progress_callback: ステージごとの進捗イベント（progress.ProgressReporter 参照）を受け取る関数
+            job_id: 計測値・トレースに記録するジョブID
+            trace_path: 指定するとステージ・リクエストごとの区間を含むトレースをJSONで書き出す
+            checkpoint: Trueの場合（job_id が必要）は検索・スクレイピング・抽出・補完の結果を
+                        チェックポイントに保存し、同じIDで再実行した場合は完了済みのステージを省略する
+                        （成功時に削除）。再開される見込みのあるジョブ（キューのジョブ・
+                        --checkpoint / --resume の実行）でのみ指定する
+            claimed_domains: 同時に実行する他の条件と共有する取得済みドメインの集合。
+                             指定すると、他の条件が既に取得した企業はスクレイピング前に除外し、
+                             この実行で取得する企業のドメインを追加する（キャンペーン実行用）
+        """
+        with metrics.collect(job_id) as collector:
+            result = await self._generate_leads(
+                industry, location, additional_keywords, max_results, export_formats, sync_to_crm,
+                wordpress_only, exclude_history, progress_callback, job_id, checkpoint, claimed_domains
+            )
+
+        result['metrics'] = collector.to_dict()
+        if trace_path:
+            try:
+                collector.write_trace(trace_path, result)
+            except OSError as e:
+                logger.warning(f"Failed to write metrics trace: {e}")
+
+        return result
+
+    async def _generate_leads(self, industry: str, location: str, additional_keywords: Optional[List[str]],
+                              max_results: Optional[int], export_formats: Optional[List[str]], sync_to_crm: bool,
+                              wordpress_only: bool, exclude_history: bool,
+                              progress_callback: Optional[ProgressCallback], job_id: Optional[str],
+                              checkpoint: bool, claimed_domains: Optional[Set[str]]) -> Dict:
+        """
+        generate_leads の本体（各ステージを計測しながら実行）
         """
         logger.info(f"Starting lead generation for industry: {industry}, location: {location}")
+        progress = ProgressReporter(progress_callback)
+        if checkpoint and job_id:
+            # 再開されないまま残った古い失敗ジョブのチェックポイントを片付ける
+            self.checkpoint_store.prune()
+            checkpoints = self.checkpoint_store.for_job(job_id)
+        else:
+            checkpoints = JobCheckpoints(None, None)
 
         try:
+            # --resume で同じ条件を再現するための実行パラメータ
+            checkpoints.save('params', {
+                'industry': industry,
+                'location': location,
+                'additional_keywords': additional_keywords or [],
+                'max_results': max_results,
+                'wordpress_only': wordpress_only,
+                'exclude_history': exclude_history
+            })
+
             # ステップ1: 検索クエリの構築
             search_queries = self._build_search_queries(industry, location, additional_keywords)
             logger.info(f"Generated {len(search_queries)} search queries")
 
-            # ステップ2: 検索実行
-            all_search_results = []
-            for query in search_queries:
-                search_results = await self.search_engine.search(query)
-                all_search_results.extend(search_results)
-                logger.info(f"Query '{query.to_search_string()}' returned {len(search_results)} results")
-
-            if not all_search_results:
-                logger.warning("No search results found")
-                return {"error": "No search results found", "success": False}
-
-            # 重複を除去
-            unique_results = self._deduplicate_search_results(all_search_results)
-            logger.info(f"After deduplication: {len(unique_results)} unique results")
-
-            # 結果数を制限
-            if max_results and len(unique_results) > max_results:
-                unique_results = unique_results[:max_results]
-                logger.info(f"Limited to {max_results} results")
+            # ステップ2: 検索実行（再開時は保存済みの検索結果を使う）
+            with metrics.stage('search'):
+                saved_results = checkpoints.load('search')
+                if saved_results is not None:
+                    unique_results = [SearchResult(**item) for item in saved_results]
+                    progress.update('search', 1, 1)
+                    logger.info(f"Resumed {len(unique_results)} search results from checkpoint")
+                else:
+                    # 全クエリ・全ページの検索で1つのHTTPセッションを使う
+                    async with self.search_engine:
+                        unique_results, error = await self._search_new_results(
+                            search_queries, max_results, exclude_history, progress, claimed_domains
+                        )
+                    if error:
+                        return {"error": error, "success": False, "job_id": job_id}
+                    checkpoints.save('search', [asdict(result) for result in unique_results])
+
+            # ステップ3: ウェブスクレイピング（抽出に使う部分だけをチェックポイントに保存）
+            with metrics.stage('scrape'):
+                scraped_data = checkpoints.load('scrape')
+                if scraped_data is not None:
+                    progress.update('scrape', len(scraped_data), len(scraped_data))
+                    logger.info(f"Resumed {len(scraped_data)} scraped pages from checkpoint")
+                else:
+                    logger.info("Starting web scraping...")
+                    async with self._scraper_session() as scraper:
+                        scraped_data = await scraper.scrape_urls(unique_results, progress_callback=progress.stage_callback('scrape'))
 
-            # ステップ3: ウェブスクレイピング
-            logger.info("Starting web scraping...")
-            async with WebScraper() as scraper:
-                scraped_data = await scraper.scrape_urls(unique_results)
+                    logger.info(f"Successfully scraped {len(scraped_data)} pages")
 
-            logger.info(f"Successfully scraped {len(scraped_data)} pages")
+                    # WordPressフィルタリング（指定時のみ）
+                    if wordpress_only:
+                        wordpress_data = [data for data in scraped_data if data.get('is_wordpress', False)]
+                        logger.info(f"WordPress filtering: {len(wordpress_data)} WordPress sites found out of {len(scraped_data)} total")
+                        scraped_data = wordpress_data
 
-            # WordPressフィルタリング（指定時のみ）
-            if wordpress_only:
-                wordpress_data = [data for data in scraped_data if data.get('is_wordpress', False)]
-                logger.info(f"WordPress filtering: {len(wordpress_data)} WordPress sites found out of {len(scraped_data)} total")
-                scraped_data = wordpress_data
+                    scraped_data = [
+                        {**data, 'content': (data.get('content') or '')[:PROMPT_CONTENT_LENGTH]}
+                        for data in scraped_data
+                    ]
+                    checkpoints.save('scrape', scraped_data)
 
             if not scraped_data:
                 error_msg = "No WordPress sites found" if wordpress_only else "No data could be scraped"
                 logger.warning(error_msg)
-                return {"error": error_msg, "success": False}
+                return {"error": error_msg, "success": False, "job_id": job_id}
 
             # ステップ4: Claude による情報抽出
-            logger.info("Starting Claude extraction...")
-            companies = await self.claude_extractor.extract_company_info_batch(scraped_data)
-            logger.info(f"Extracted information for {len(companies)} companies")
+            with metrics.stage('extract'):
+                saved_companies = checkpoints.load('extract')
+                if saved_companies is not None:
+                    companies = [CompanyInfo.from_dict(item) for item in saved_companies]
+                    progress.update('extract', len(companies), len(companies))
+                    logger.info(f"Resumed {len(companies)} extracted companies from checkpoint")
+                else:
+                    logger.info("Starting Claude extraction...")
+                    companies = await self.claude_extractor.extract_company_info_batch(
+                        scraped_data, progress_callback=progress.stage_callback('extract')
+                    )
+                    logger.info(f"Extracted information for {len(companies)} companies")
+                    checkpoints.save('extract', [company.to_dict() for company in companies])
 
             if not companies:
                 logger.warning("No company information extracted")
-                return {"error": "No company information extracted", "success": False}
-
-            # ステップ5: 履歴との重複チェック（オプション）
-            if exclude_history:
-                logger.info("Checking against history...")
-                original_count = len(companies)
-                companies = self.history_manager.filter_new_companies(companies)
-                filtered_count = original_count - len(companies)
-                logger.info(f"Filtered out {filtered_count} duplicate companies from history")
-
-                if not companies:
-                    logger.warning("All companies were duplicates from history")
-                    return {"error": "すべての企業が履歴に存在します。新しい企業が見つかりませんでした。", "success": False}
+                return {"error": "No company information extracted", "success": False, "job_id": job_id}
 
             # ステップ6: データ拡張
-            logger.info("Enhancing company data...")
-            enhanced_companies = await self.data_enhancer.enhance_companies(companies)
-            logger.info(f"Enhanced {len(enhanced_companies)} companies")
+            with metrics.stage('enhance'):
+                saved_companies = checkpoints.load('enhance')
+                if saved_companies is not None:
+                    enhanced_companies = [CompanyInfo.from_dict(item) for item in saved_companies]
+                    progress.update('enhance', len(enhanced_companies), len(enhanced_companies))
+                    logger.info(f"Resumed {len(enhanced_companies)} enhanced companies from checkpoint")
+                else:
+                    logger.info("Enhancing company data...")
+                    enhanced_companies = await self.data_enhancer.enhance_companies(
+                        companies, progress_callback=progress.stage_callback('enhance')
+                    )
+                    logger.info(f"Enhanced {len(enhanced_companies)} companies")
+                    checkpoints.save('enhance', [company.to_dict() for company in enhanced_companies])
 
             # ステップ7: スコアリング
-            logger.info("Scoring leads...")
-            search_query = search_queries[0]  # 最初のクエリを代表として使用
-            scored_leads = self.scorer.score_leads(enhanced_companies, search_query)
-            logger.info(f"Scored {len(scored_leads)} leads")
+            with metrics.stage('score'):
+                logger.info("Scoring leads...")
+                search_query = search_queries[0]  # 最初のクエリを代表として使用
+                scored_leads = self.scorer.score_leads(enhanced_companies, search_query)
+                logger.info(f"Scored {len(scored_leads)} leads")
+                progress.update('score', len(scored_leads), len(scored_leads))
 
             # ステップ8: 履歴に追加
-            search_query_str = f"{industry} {location}"
-            if additional_keywords:
-                search_query_str += " " + " ".join(additional_keywords)
-            added_count = self.history_manager.add_companies(enhanced_companies, search_query_str)
-            logger.info(f"Added {added_count} new companies to history")
+            with metrics.stage('history'):
+                search_query_str = f"{industry} {location}"
+                if additional_keywords:
+                    search_query_str += " " + " ".join(additional_keywords)
+                added_count = self.history_manager.add_scored_leads(scored_leads, search_query_str)
+                logger.info(f"Added {added_count} new companies to history")
 
             # 統計情報生成
             stats = ScoreAnalyzer.analyze_score_distribution(scored_leads)
@@ -152,52 +258,157 @@ class SalesLeadGenerator:
                 "additional_keywords": additional_keywords or []
             }
 
-            export_results = {}
-            if not export_formats:
+            # 空のリストはエクスポートしない（Webジョブは保存済みの結果から必要な形式をその都度生成する）
+            if export_formats is None:
                 export_formats = ['csv', 'excel']
 
-            if 'csv' in export_formats or 'all' in export_formats:
-                csv_path = await self.exporter.export_to_csv(scored_leads, search_info=search_info)
-                if csv_path:
-                    export_results['csv'] = csv_path
-
-            if 'excel' in export_formats or 'all' in export_formats:
-                excel_path = await self.exporter.export_to_excel(scored_leads, search_info=search_info)
-                if excel_path:
-                    export_results['excel'] = excel_path
-
-            if 'sqlite' in export_formats or 'all' in export_formats:
-                sqlite_path = await self.exporter.export_to_sqlite(scored_leads, search_info=search_info)
-                if sqlite_path:
-                    export_results['sqlite'] = sqlite_path
+            # 全形式をスレッドプールで並列に出力（イベントループを塞がない）
+            with metrics.stage('export'):
+                progress.update('export', 0, len(export_formats))
+                export_results = await self.exporter.export_formats(scored_leads, export_formats, search_info)
+                progress.update('export', len(export_formats), len(export_formats))
 
             logger.info(f"Exported to: {list(export_results.keys())}")
 
             # ステップ10: CRM連携（オプション）
             crm_results = {}
             if sync_to_crm:
-                logger.info("Syncing to CRM systems...")
-                crm_results = await self.crm_manager.sync_to_all_crms(scored_leads)
-                logger.info(f"CRM sync results: {crm_results}")
+                with metrics.stage('crm'):
+                    logger.info("Syncing to CRM systems...")
+                    progress.update('crm', 0, len(scored_leads))
+                    crm_results = await self.crm_manager.sync_to_all_crms(scored_leads)
+                    logger.info(f"CRM sync results: {crm_results}")
+                    progress.update('crm', len(scored_leads), len(scored_leads))
 
             # 結果の集約
             result = {
                 "success": True,
+                "job_id": job_id,
                 "timestamp": datetime.now().isoformat(),
                 "search_info": search_info,
                 "statistics": stats,
                 "leads_count": len(scored_leads),
                 "top_leads": [lead.to_dict() for lead in ScoreAnalyzer.get_top_leads(scored_leads, 10)],
+                "leads": [lead.to_dict() for lead in scored_leads],
                 "export_results": export_results,
                 "crm_results": crm_results
             }
 
+            # 完了したジョブのチェックポイントは不要
+            checkpoints.clear()
+
             logger.info("Lead generation completed successfully")
             return result
 
         except Exception as e:
             logger.error(f"Error in lead generation: {e}", exc_info=True)
-            return {"error": str(e), "success": False}
+            return {"error": str(e), "success": False, "job_id": job_id}
+
+    async def _search_new_results(self, search_queries: List[SearchQuery], max_results: Optional[int],
+                                  exclude_history: bool, progress: ProgressReporter,
+                                  claimed_domains: Optional[Set[str]] = None) -> Tuple[List[SearchResult], Optional[str]]:
+        """
+        検索を実行し、重複・履歴にある企業・他の条件が取得済みの企業を除いた検索結果を取得
+
+        Returns:
+            (検索結果, エラーメッセージ)。結果が得られなかった場合はエラーメッセージを返す
+        """
+        # 履歴にある企業はスクレイピング・抽出の前に除外し、max_results は新規リード数として扱う。
+        # 除外で不足する分は次のページを追加取得して補う
+        unique_results = []
+        seen_urls = set()
+        owned_domains = set()
+        total_hits = 0
+        max_pages = self.search_engine.config.max_search_pages if max_results else 1
+
+        for page in range(max_pages):
+            page_results = []
+            for i, query in enumerate(search_queries, 1):
+                search_results = await self.search_engine.search(query, page=page)
+                page_results.extend(search_results)
+                progress.update('search', page * len(search_queries) + i, max_pages * len(search_queries))
+                logger.info(f"Query '{query.to_search_string()}' (page {page + 1}) returned {len(search_results)} results")
+
+            total_hits += len(page_results)
+
+            # 重複を除去
+            new_results = [
+                result for result in self._deduplicate_search_results(page_results)
+                if result.url not in seen_urls
+            ]
+            if not new_results:
+                # 検索結果を出し尽くした
+                break
+            seen_urls.update(result.url for result in new_results)
+
+            # 履歴との重複チェック（ブルームフィルタで大半はDB照会不要）
+            if exclude_history:
+                original_count = len(new_results)
+                new_results = self.history_manager.filter_new_search_results(new_results)
+                logger.info(f"Pruned {original_count - len(new_results)} search results already in history")
+
+            # 同時に実行中の他の条件が取得済みの企業を除外し、残りをこの実行の取得分として登録する
+            # （判定と登録の間に await を挟まないため、条件間で同じ企業を重複して取得しない）
+            if claimed_domains is not None:
+                original_count = len(new_results)
+                new_results = self._claim_results(new_results, claimed_domains, owned_domains)
+                logger.info(f"Pruned {original_count - len(new_results)} search results claimed by other territories")
+
+            unique_results.extend(new_results)
+            if max_results and len(unique_results) >= max_results:
+                break
+
+        if not total_hits:
+            logger.warning("No search results found")
+            return [], "No search results found"
+
+        logger.info(f"After deduplication: {len(unique_results)} new unique results from {total_hits} hits")
+
+        if not unique_results:
+            logger.warning("All search results were duplicates from history")
+            return [], "すべての企業が履歴に存在します。新しい企業が見つかりませんでした。"
+
+        # 結果数を制限
+        if max_results and len(unique_results) > max_results:
+            unique_results = unique_results[:max_results]
+            logger.info(f"Limited to {max_results} results")
+
+            # 取得しない企業は他の条件が取得できるように登録を解除する
+            if claimed_domains is not None:
+                kept_domains = {self._result_domain(result) for result in unique_results}
+                claimed_domains.difference_update(owned_domains - kept_domains)
+
+        return unique_results, None
+
+    def _claim_results(self, results: List[SearchResult], claimed_domains: Set[str],
+                       owned_domains: Set[str]) -> List[SearchResult]:
+        """
+        他の条件が取得済みのドメインの検索結果を除き、残りのドメインを取得済みとして登録
+        """
+        claimed = []
+        for result in results:
+            domain = self._result_domain(result)
+            if domain in claimed_domains and domain not in owned_domains:
+                continue
+            claimed_domains.add(domain)
+            owned_domains.add(domain)
+            claimed.append(result)
+        return claimed
+
+    def _result_domain(self, result: SearchResult) -> str:
+        """検索結果の企業を識別するドメイン（取り出せない場合はURL）"""
+        return self.history_manager._extract_domain(result.url) or result.url
+
+    @asynccontextmanager
+    async def _scraper_session(self):
+        """
+        共有の WebScraper があればそれを、無ければ一時的な WebScraper を使う
+        """
+        if self.scraper is not None:
+            yield self.scraper
+        else:
+            async with WebScraper() as scraper:
+                yield scraper
 
     def _build_search_queries(self, industry: str, location: str, additional_keywords: List[str] = None) -> List[SearchQuery]:
         """
@@ -233,19 +444,85 @@ class SalesLeadGenerator:
 
         return unique_results
 
+def print_crm_results(crm_results: Dict[str, Dict]):
+    """
+    CRM同期結果を表示
+    """
+    print(f"\n🔄 CRM同期結果:")
+    if not crm_results:
+        print("   同期対象のCRMが設定されていません")
+    for crm_name, crm_result in crm_results.items():
+        if crm_result.get('success'):
+            print(f"   {crm_name}: {crm_result.get('created', 0)} 件作成")
+        else:
+            print(f"   {crm_name}: エラー")
+
+        outbox = crm_result.get('outbox', {})
+        if outbox.get('failed') or outbox.get('pending'):
+            print(f"      未送信: {outbox.get('pending', 0)} 件 / 失敗: {outbox.get('failed', 0)} 件（--retry-crm で再送）")
+
+def print_campaign_results(result: Dict):
+    """
+    キャンペーンの実行結果を表示
+    """
+    print(f"\n📋 キャンペーン「{result['campaign']}」の結果:")
+    for territory in result['territories']:
+        keywords = f" ({' '.join(territory['keywords'])})" if territory['keywords'] else ''
+        status = f"{territory['leads_count']} 件" if territory['success'] else f"エラー: {territory['error']}"
+        print(f"   {territory['industry']} / {territory['location']}{keywords}: {status}")
+
+    if not result['success']:
+        print(f"\n❌ リードを取得できませんでした")
+        return
+
+    print(f"\n✅ 重複を除いたリード数: {result['leads_count']}（重複 {result['duplicates_removed']} 件を除去）")
+
+    if result.get('export_results'):
+        print(f"\n📁 エクスポートファイル:")
+        for format_type, filepath in result['export_results'].items():
+            print(f"   {format_type.upper()}: {filepath}")
+
+    if result.get('crm_results'):
+        print_crm_results(result['crm_results'])
+
+    print(f"\n🎯 上位5件のリード:")
+    for i, lead in enumerate(result['top_leads'][:5], 1):
+        print(f"   {i}. {lead['company_name']} (スコア: {lead['total_score']:.1f})")
+
+def print_metrics_summary(metrics_data: Dict):
+    """
+    計測値の要約（ステージごとの所要時間・リクエスト数・トークン数）を表示
+    """
+    summary = metrics_data['summary']
+    print(f"\n⏱  所要時間: {metrics_data['duration_seconds']:.1f}秒")
+    for stage, seconds in metrics_data['stages'].items():
+        print(f"   {stage}: {seconds:.1f}秒")
+    print(f"   HTTPリクエスト: {summary['http_requests']} 件 ({summary['http_response_bytes'] / 1024:.0f} KB)")
+    print(f"   Claude API: {summary['llm_requests']} 件 "
+          f"(入力 {summary['llm_input_tokens']} / 出力 {summary['llm_output_tokens']} トークン)")
+    for cache, rate in summary['cache_hit_rates'].items():
+        print(f"   {cache} ヒット率: {rate:.0%}")
+
 async def main():
     """
     コマンドライン実行のメイン関数
     """
     parser = argparse.ArgumentParser(description="営業リスト自動生成エージェント")
 
-    parser.add_argument("--industry", "-i", required=True, help="対象業種")
-    parser.add_argument("--location", "-l", required=True, help="対象エリア")
+    parser.add_argument("--industry", "-i", help="対象業種")
+    parser.add_argument("--location", "-l", help="対象エリア")
     parser.add_argument("--keywords", "-k", nargs="*", help="追加キーワード")
-    parser.add_argument("--max-results", "-m", type=int, default=50, help="最大結果数")
-    parser.add_argument("--export", "-e", nargs="*", choices=["csv", "excel", "sqlite", "all"],
-                      default=["csv", "excel"], help="エクスポート形式")
+    parser.add_argument("--max-results", "-m", type=int, default=50, help="最大結果数（履歴にない新規企業の件数）")
+    parser.add_argument("--export", "-e", nargs="*", choices=["csv", "excel", "sqlite", "parquet", "jsonl", "all"],
+                      help="エクスポート形式（デフォルト: csv excel）")
     parser.add_argument("--sync-crm", action="store_true", help="CRMに同期")
+    parser.add_argument("--retry-crm", action="store_true", help="未送信・失敗したCRM同期のみ再送")
+    parser.add_argument("--checkpoint", action="store_true",
+                        help="ステージごとの途中結果を保存し、失敗時に --resume で再開できるようにする")
+    parser.add_argument("--resume", metavar="JOB_ID", help="失敗した実行を完了済みのステージから再開")
+    parser.add_argument("--campaign", help="業種×地域×キーワードのキャンペーンファイル（YAML/CSV）をまとめて実行")
+    parser.add_argument("--concurrency", type=int, help="キャンペーンで同時に実行する条件の数")
+    parser.add_argument("--trace", metavar="PATH", help="ステージ・リクエストごとの所要時間と計測値をJSONで書き出す")
     parser.add_argument("--verbose", "-v", action="store_true", help="詳細ログ")
 
     args = parser.parse_args()
@@ -253,6 +530,27 @@ async def main():
     if args.verbose:
         logging.getLogger().setLevel(logging.DEBUG)
 
+    if args.retry_crm:
+        crm_results = await CRMIntegrationManager().drain_outbox()
+        print_crm_results(crm_results)
+        return
+
+    campaign = None
+    resume_params = None
+    if args.resume:
+        resume_params = CheckpointStore().load(args.resume, 'params')
+        if resume_params is None:
+            parser.error(f"ジョブ {args.resume} のチェックポイントが見つかりません")
+    elif args.campaign:
+        try:
+            campaign = load_campaign(args.campaign)
+        except (OSError, ValueError) as e:
+            parser.error(f"キャンペーンファイルを読み込めません: {e}")
+        if args.trace:
+            parser.error("--trace は1つの条件の実行でのみ使用できます（--campaign とは併用不可）")
+    elif not args.industry or not args.location:
+        parser.error("--industry と --location は必須です（--resume・--campaign・--retry-crm 以外）")
+
     # 設定チェック
     required_configs = []
     if not config.claude.api_key:
@@ -266,16 +564,34 @@ async def main():
         print("詳細は.env.exampleファイルを参照してください。")
         sys.exit(1)
 
-    # 実行
+    if campaign:
+        runner = CampaignRunner(concurrency=args.concurrency)
+        result = await runner.run(campaign, export_formats=args.export, sync_to_crm=args.sync_crm)
+        print_campaign_results(result)
+        if not result['success']:
+            sys.exit(1)
+        return
+
+    # 実行（--checkpoint 指定時は、失敗しても --resume で完了済みのステージから再開できる）
+    job_id = args.resume or JobQueue.new_job_id()
+    checkpoint = bool(args.checkpoint or args.resume)
+    params = resume_params or {
+        'industry': args.industry,
+        'location': args.location,
+        'additional_keywords': args.keywords,
+        'max_results': args.max_results
+    }
+
     generator = SalesLeadGenerator()
     result = await generator.generate_leads(
-        industry=args.industry,
-        location=args.location,
-        additional_keywords=args.keywords,
-        max_results=args.max_results,
-        export_formats=args.export,
-        sync_to_crm=args.sync_crm
+        **params,
+        export_formats=args.export if args.export is not None else ['csv', 'excel'],
+        sync_to_crm=args.sync_crm,
+        job_id=job_id,
+        trace_path=args.trace,
+        checkpoint=checkpoint
     )
+    generator.history_manager.close()
 
     # 結果出力
     if result["success"]:
@@ -291,18 +607,19 @@ async def main():
                 print(f"   {format_type.upper()}: {filepath}")
 
         if result.get('crm_results'):
-            print(f"\n🔄 CRM同期結果:")
-            for crm_name, crm_result in result['crm_results'].items():
-                if crm_result.get('success'):
-                    print(f"   {crm_name}: {crm_result.get('created', 0)} 件作成")
-                else:
-                    print(f"   {crm_name}: エラー")
+            print_crm_results(result['crm_results'])
 
         print(f"\n🎯 上位5件のリード:")
         for i, lead in enumerate(result['top_leads'][:5], 1):
             print(f"   {i}. {lead['company_name']} (スコア: {lead['total_score']:.1f})")
+
+        print_metrics_summary(result['metrics'])
+        if args.trace:
+            print(f"   トレース: {args.trace}")
     else:
         print(f"\n❌ エラーが発生しました: {result['error']}")
+        if checkpoint and generator.checkpoint_store.stages(job_id):
+            print(f"   完了済みのステージから再開するには: python src/main.py --resume {job_id}")
         sys.exit(1)
 
 if __name__ == "__main__":
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+計測 - ジョブごとのステージ時間・HTTPリクエスト・トークン数・キャッシュヒット率を収集
+"""
+
+import json
+import math
+import time
+from bisect import bisect_right
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Prometheus形式で出力する際の指標名の接頭辞
+METRIC_PREFIX = 'sales_leads_'
+
+# ヒストグラムのバケットの上限値
+STAGE_BUCKETS = (1, 5, 10, 30, 60, 120, 300, 600)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000)
+
+# カウンタ（指標名 -> 説明）
+COUNTERS = {
+    'http_requests_total': 'HTTP requests by component and status',
+    'http_response_bytes_total': 'Response bytes received by component',
+    'llm_requests_total': 'Claude API requests by operation and status',
+    'cache_requests_total': 'Cache / prefilter lookups by cache and result (hit or miss)',
+    'bloom_false_positives_total': 'Bloom filter positives not confirmed by the database',
+}
+
+# ヒストグラム（指標名 -> (バケット, 説明)）
+HISTOGRAMS = {
+    'stage_duration_seconds': (STAGE_BUCKETS, 'Wall time of each pipeline stage'),
+    'scrape_latency_seconds': (LATENCY_BUCKETS, 'Page fetch latency by host'),
+    'search_latency_seconds': (LATENCY_BUCKETS, 'Search API latency by engine'),
+    'llm_latency_seconds': (LATENCY_BUCKETS, 'Claude API latency by operation'),
+    'llm_tokens_per_request': (TOKEN_BUCKETS, 'Claude API tokens per request by operation and type'),
+}
+
+# Prometheusの集計では落とすラベル（ホスト別はジョブ単位の結果・トレースでのみ見る）
+AGGREGATE_EXCLUDED_LABELS = ('host',)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+def _label_key(labels: Dict) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+def _percentile(values: List[float], ratio: float) -> float:
+    """ソート済みの値のパーセンタイル（最近傍）"""
+    index = max(math.ceil(len(values) * ratio) - 1, 0)
+    return values[index]
+
+class MetricsCollector:
+    """
+    1回の生成処理（ジョブ）の計測値
+
+    カウンタは (指標名, ラベル) ごとの合計、ヒストグラムは観測値をそのまま保持し、
+    to_dict でパーセンタイルと累積バケット数に要約する。ステージ・リクエストごとの
+    区間はトレースファイル用に開始からの経過時間で記録する。
+    """
+
+    def __init__(self, job_id: Optional[str] = None):
+        self.job_id = job_id
+        self.started_at = datetime.now()
+        self._start = time.perf_counter()
+        self._counters: Dict[Tuple[str, LabelKey], float] = {}
+        self._observations: Dict[Tuple[str, LabelKey], List[float]] = {}
+        self._stages: Dict[str, float] = {}
+        self._spans: List[Dict] = []
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """カウンタを加算"""
+        key = (name, _label_key(labels))
+        self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        """ヒストグラムに値を追加"""
+        self._observations.setdefault((name, _label_key(labels)), []).append(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels) -> Iterator[None]:
+        """ブロックの所要時間（秒）をヒストグラムに追加し、トレースに区間を記録"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.observe(name, end - start, **labels)
+            self._spans.append({
+                'name': name,
+                'labels': dict(_label_key(labels)),
+                'start': round(start - self._start, 6),
+                'seconds': round(end - start, 6)
+            })
+
+    @contextmanager
+    def stage(self, stage: str) -> Iterator[None]:
+        """パイプラインのステージの所要時間を記録"""
+        start = time.perf_counter()
+        try:
+            with self.timer('stage_duration_seconds', stage=stage):
+                yield
+        finally:
+            self._stages[stage] = self._stages.get(stage, 0) + time.perf_counter() - start
+
+    def to_dict(self) -> Dict:
+        """
+        計測値の要約（生成結果の 'metrics'）
+
+        counters / histograms は指標名ごとのラベル付きの値のリストで、
+        ヒストグラムには集計用の累積バケット数（Prometheusの le）を含む。
+        """
+        counters = {}
+        for (name, labels), value in sorted(self._counters.items()):
+            counters.setdefault(name, []).append({'labels': dict(labels), 'value': value})
+
+        histograms = {}
+        for (name, labels), values in sorted(self._observations.items()):
+            values = sorted(values)
+            buckets = HISTOGRAMS.get(name, (LATENCY_BUCKETS, ''))[0]
+            histograms.setdefault(name, []).append({
+                'labels': dict(labels),
+                'count': len(values),
+                'sum': round(sum(values), 6),
+                'p50': round(_percentile(values, 0.5), 6),
+                'p95': round(_percentile(values, 0.95), 6),
+                'max': round(values[-1], 6),
+                'buckets': {str(bound): bisect_right(values, bound) for bound in buckets}
+            })
+
+        return {
+            'duration_seconds': round(time.perf_counter() - self._start, 3),
+            'stages': {stage: round(seconds, 3) for stage, seconds in self._stages.items()},
+            'summary': self._summary(),
+            'counters': counters,
+            'histograms': histograms
+        }
+
+    def _summary(self) -> Dict:
+        """よく見る値の合計（HTTPリクエスト数・バイト数・トークン数・キャッシュヒット率）"""
+        def counter_sum(name, **match):
+            return sum(
+                value for (key_name, labels), value in self._counters.items()
+                if key_name == name and all(dict(labels).get(k) == v for k, v in match.items())
+            )
+
+        def observed_sum(name, **match):
+            return sum(
+                sum(values) for (key_name, labels), values in self._observations.items()
+                if key_name == name and all(dict(labels).get(k) == v for k, v in match.items())
+            )
+
+        caches = sorted({dict(labels)['cache'] for name, labels in self._counters if name == 'cache_requests_total'})
+        cache_hit_rates = {}
+        for cache in caches:
+            hits = counter_sum('cache_requests_total', cache=cache, result='hit')
+            total = counter_sum('cache_requests_total', cache=cache)
+            cache_hit_rates[cache] = round(hits / total, 4) if total else 0.0
+
+        return {
+            'http_requests': int(counter_sum('http_requests_total')),
+            'http_response_bytes': int(counter_sum('http_response_bytes_total')),
+            'llm_requests': int(counter_sum('llm_requests_total')),
+            'llm_input_tokens': int(observed_sum('llm_tokens_per_request', type='input')),
+            'llm_output_tokens': int(observed_sum('llm_tokens_per_request', type='output')),
+            'cache_hit_rates': cache_hit_rates
+        }
+
+    def trace(self, result: Optional[Dict] = None) -> Dict:
+        """トレースファイルの内容（ステージ・リクエストごとの区間と計測値の要約）"""
+        trace = {
+            'job_id': self.job_id,
+            'started_at': self.started_at.isoformat(),
+            'spans': sorted(self._spans, key=lambda span: span['start']),
+            'metrics': self.to_dict()
+        }
+        if result is not None:
+            trace['success'] = result.get('success')
+            trace['error'] = result.get('error')
+        return trace
+
+    def write_trace(self, path, result: Optional[Dict] = None):
+        """トレースをJSONファイルに書き出す"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.trace(result), f, ensure_ascii=False, indent=2)
+        logger.info(f"Wrote metrics trace to {path}")
+
+# 実行中のジョブの計測値（asyncioのタスクごとに引き継がれるため、
+# 同じプロセスで並行するジョブ（キャンペーンなど）の値は混ざらない）
+_current: ContextVar[Optional[MetricsCollector]] = ContextVar('metrics_collector', default=None)
+
+def current() -> Optional[MetricsCollector]:
+    """実行中のジョブの計測値（計測中でなければNone）"""
+    return _current.get()
+
+@contextmanager
+def collect(job_id: Optional[str] = None) -> Iterator[MetricsCollector]:
+    """ブロック内（とそこから作られたタスク）の計測値を新しい MetricsCollector に集める"""
+    collector = MetricsCollector(job_id)
+    token = _current.set(collector)
+    try:
+        yield collector
+    finally:
+        _current.reset(token)
+
+def inc(name: str, value: float = 1, **labels):
+    """実行中のジョブのカウンタを加算（計測中でなければ何もしない）"""
+    collector = _current.get()
+    if collector is not None:
+        collector.inc(name, value, **labels)
+
+def observe(name: str, value: float, **labels):
+    """実行中のジョブのヒストグラムに値を追加（計測中でなければ何もしない）"""
+    collector = _current.get()
+    if collector is not None:
+        collector.observe(name, value, **labels)
+
+def timer(name: str, **labels):
+    """実行中のジョブの所要時間を計測するコンテキストマネージャ"""
+    collector = _current.get()
+    return collector.timer(name, **labels) if collector is not None else nullcontext()
+
+def stage(name: str):
+    """実行中のジョブのステージの所要時間を計測するコンテキストマネージャ"""
+    collector = _current.get()
+    return collector.stage(name) if collector is not None else nullcontext()
+
+def aggregate_samples(metrics: Dict) -> List[Tuple[str, Dict[str, str], float]]:
+    """
+    生成結果の 'metrics' をプロセス・ジョブをまたいで合算できるサンプルに変換
+
+    カウンタはそのまま、ヒストグラムは _bucket / _sum / _count に分解する。
+    値の種類が多いラベル（ホスト）は落とし、同じラベルになったサンプルは合算する。
+    """
+    totals: Dict[Tuple[str, LabelKey], float] = {}
+
+    def add(name, labels, value):
+        labels = {k: v for k, v in labels.items() if k not in AGGREGATE_EXCLUDED_LABELS}
+        key = (name, _label_key(labels))
+        totals[key] = totals.get(key, 0) + value
+
+    for name, entries in (metrics.get('counters') or {}).items():
+        for entry in entries:
+            add(name, entry['labels'], entry['value'])
+
+    for name, entries in (metrics.get('histograms') or {}).items():
+        for entry in entries:
+            for bound, count in entry['buckets'].items():
+                add(f"{name}_bucket", {**entry['labels'], 'le': bound}, count)
+            add(f"{name}_bucket", {**entry['labels'], 'le': '+Inf'}, entry['count'])
+            add(f"{name}_sum", entry['labels'], entry['sum'])
+            add(f"{name}_count", entry['labels'], entry['count'])
+
+    return [(name, dict(labels), value) for (name, labels), value in totals.items()]
+
+def render_prometheus(samples: Iterable[Tuple[str, Dict[str, str], float]],
+                      gauges: Optional[Dict[str, List[Tuple[Dict[str, str], float]]]] = None) -> str:
+    """
+    サンプルをPrometheusのテキスト形式（0.0.4）に変換
+
+    Args:
+        samples: aggregate_samples の形式の (指標名, ラベル, 値)
+        gauges: 現在値の指標（指標名 -> [(ラベル, 値)]）
+    """
+    families: Dict[str, List[Tuple[str, Dict[str, str], float]]] = {}
+    for name, labels, value in samples:
+        family = name
+        for suffix in ('_bucket', '_sum', '_count'):
+            if name.endswith(suffix) and name[:-len(suffix)] in HISTOGRAMS:
+                family = name[:-len(suffix)]
+        families.setdefault(family, []).append((name, labels, value))
+
+    lines = []
+    for family in sorted(families):
+        if family in HISTOGRAMS:
+            lines.append(f"# HELP {METRIC_PREFIX}{family} {HISTOGRAMS[family][1]}")
+            lines.append(f"# TYPE {METRIC_PREFIX}{family} histogram")
+        else:
+            lines.append(f"# HELP {METRIC_PREFIX}{family} {COUNTERS.get(family, family)}")
+            lines.append(f"# TYPE {METRIC_PREFIX}{family} counter")
+
+        for name, labels, value in sorted(families[family], key=_sample_order):
+            lines.append(_sample_line(name, labels, value))
+
+    for family, values in sorted((gauges or {}).items()):
+        lines.append(f"# TYPE {METRIC_PREFIX}{family} gauge")
+        for labels, value in values:
+            lines.append(_sample_line(family, labels, value))
+
+    return '\n'.join(lines) + '\n'
+
+def _sample_order(sample: Tuple[str, Dict[str, str], float]):
+    """同じ指標のサンプルの並び順（バケットは le の昇順）"""
+    name, labels, _ = sample
+    other = sorted((k, v) for k, v in labels.items() if k != 'le')
+    le = labels.get('le')
+    return (other, name, float(le) if le is not None else 0.0)
+
+def _escape_label(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _sample_line(name: str, labels: Dict[str, str], value: float) -> str:
+    if labels:
+        # le は最後に置く
+        pairs = sorted(labels.items(), key=lambda item: (item[0] == 'le', item[0]))
+        name = name + '{' + ','.join(f'{key}="{_escape_label(val)}"' for key, val in pairs) + '}'
+    if float(value).is_integer():
+        value = int(value)
+    return f"{METRIC_PREFIX}{name} {value}"
@@ -35,6 +35,7 @@ class CompanyInfo:
     business_size: Optional[BusinessSize] = None
     additional_emails: Optional[List[str]] = None
     social_media: Optional[Dict[str, str]] = None
+    is_wordpress: bool = False
 
     def to_dict(self) -> Dict:
         data = {
@@ -47,10 +48,41 @@ class CompanyInfo:
             'industry': self.industry,
             'business_size': self.business_size.value if self.business_size else None,
             'additional_emails': self.additional_emails or [],
-            'social_media': self.social_media or {}
+            'social_media': self.social_media or {},
+            'is_wordpress': self.is_wordpress
         }
         return data
 
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'CompanyInfo':
+        business_size = data.get('business_size')
+        return cls(
+            company_name=data.get('company_name', ''),
+            url=data.get('url', ''),
+            location=data.get('location'),
+            contact_email=data.get('contact_email'),
+            phone=data.get('phone'),
+            description=data.get('description'),
+            industry=data.get('industry'),
+            business_size=BusinessSize(business_size) if business_size else None,
+            additional_emails=data.get('additional_emails') or [],
+            social_media=data.get('social_media') or {},
+            is_wordpress=bool(data.get('is_wordpress', False))
+        )
+
+# サブスコア名 -> (ScoringConfig の重み属性名, サブスコアの最大値)
+# サブスコアの一覧はここだけで定義し、出力列・履歴DBのカラム・重み付けはこれから導出する
+SCORE_COMPONENTS = {
+    'industry_match': ('industry_match_weight', 5.0),
+    'business_size': ('business_size_weight', 3.0),
+    'contact_info': ('contact_info_weight', 2.0),
+    'location_match': ('location_match_weight', 3.0),
+    'domain_reputation': ('domain_reputation_weight', 1.0),
+}
+
+# ScoredLead.to_dict で "<名前>_score" として出力されるサブスコア
+SCORE_NAMES = tuple(SCORE_COMPONENTS)
+
 @dataclass
 class ScoredLead:
     company: CompanyInfo
@@ -62,13 +94,19 @@ class ScoredLead:
         return {
             **self.company.to_dict(),
             'total_score': self.total_score,
-            'industry_match_score': self.scores.get('industry_match', 0),
-            'business_size_score': self.scores.get('business_size', 0),
-            'contact_info_score': self.scores.get('contact_info', 0),
-            'location_match_score': self.scores.get('location_match', 0),
+            **{f'{name}_score': self.scores.get(name, 0) for name in SCORE_NAMES},
             'confidence': self.confidence
         }
 
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ScoredLead':
+        return cls(
+            company=CompanyInfo.from_dict(data),
+            total_score=data.get('total_score', 0),
+            scores={name: data.get(f'{name}_score', 0) for name in SCORE_NAMES},
+            confidence=data.get('confidence', 0)
+        )
+
 @dataclass
 class SearchResult:
     title: str
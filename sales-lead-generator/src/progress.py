@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+進捗通知 - パイプラインの各ステージの進捗を構造化イベントとして通知
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# ステージ名、表示名、全体の進捗に占める割合（%）
+STAGES = (
+    ('search', '検索中', 20),
+    ('scrape', 'ページを取得中', 30),
+    ('extract', '企業情報を抽出中', 25),
+    ('enhance', 'データを補完中', 15),
+    ('score', 'スコアリング中', 3),
+    ('export', 'エクスポート中', 5),
+    ('crm', 'CRMに同期中', 2),
+)
+
+ProgressCallback = Callable[[Dict], None]
+
+class ProgressReporter:
+    """
+    ステージごとの進捗（完了数/総数）を全体の進捗率に換算してコールバックに通知
+
+    イベントは {'stage', 'done', 'total', 'progress', 'message'} の辞書。
+    間引きは受け取り側（ワーカー・Web層）で行う。
+    """
+
+    def __init__(self, callback: Optional[ProgressCallback] = None):
+        self._callback = callback
+        self._offsets = {}
+        self._labels = {}
+        self._weights = {}
+
+        offset = 0
+        for stage, label, weight in STAGES:
+            self._offsets[stage] = offset
+            self._labels[stage] = label
+            self._weights[stage] = weight
+            offset += weight
+
+    def update(self, stage: str, done: int, total: int):
+        """ステージの進捗を通知"""
+        if self._callback is None:
+            return
+
+        ratio = min(done / total, 1.0) if total else 1.0
+        event = {
+            'stage': stage,
+            'done': done,
+            'total': total,
+            'progress': int(self._offsets[stage] + self._weights[stage] * ratio),
+            'message': f"{self._labels[stage]} ({done}/{total})"
+        }
+
+        try:
+            self._callback(event)
+        except Exception as e:
+            # 通知の失敗で生成処理を止めない
+            logger.warning(f"Progress callback failed: {e}")
+
+    def stage_callback(self, stage: str) -> Optional[Callable[[int, int], None]]:
+        """(完了数, 総数) を受け取るステージ用のコールバック（通知先が無ければNone）"""
+        if self._callback is None:
+            return None
+        return lambda done, total: self.update(stage, done, total)
+
+async def gather_with_progress(aws: List[Awaitable], progress_callback: Optional[Callable[[int, int], None]] = None,
+                               return_exceptions: bool = False) -> List:
+    """
+    asyncio.gather と同じ結果を返しつつ、1件完了するごとに (完了数, 総数) を通知
+    """
+    if progress_callback is None:
+        return await asyncio.gather(*aws, return_exceptions=return_exceptions)
+
+    total = len(aws)
+    done = 0
+
+    async def track(aw):
+        nonlocal done
+        try:
+            return await aw
+        finally:
+            done += 1
+            progress_callback(done, total)
+
+    return await asyncio.gather(*[track(aw) for aw in aws], return_exceptions=return_exceptions)
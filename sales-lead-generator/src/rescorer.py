@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+再スコアリングモジュール - 保存済みのサブスコアから総合スコアを再計算
+"""
+
+import argparse
+import sqlite3
+import sys
+from dataclasses import replace
+from typing import Dict, Optional
+from pathlib import Path
+import logging
+
+from config.config import config, ScoringConfig
+from scorer import get_score_factors
+
+logger = logging.getLogger(__name__)
+
+# 再スコアリング可能なテーブル
+RESCORABLE_TABLES = {'sales_leads', 'company_history'}
+
+class LeadRescorer:
+    """
+    SQLiteに保存されたサブスコアから、検索・スクレイピング・LLMを再実行せずに
+    総合スコアと優先度を一括で再計算するクラス
+    """
+
+    def __init__(self, scoring_config: Optional[ScoringConfig] = None):
+        self.config = scoring_config or config.scoring
+
+    def rescore_database(self, db_path: str, table: str = 'sales_leads', dry_run: bool = False,
+                         missing_score: Optional[float] = None) -> Dict:
+        """
+        SQLiteデータベース内の総合スコアを再計算
+
+        Args:
+            db_path: SQLiteエクスポートまたは履歴DBのパス
+            table: 対象テーブル（sales_leads / company_history）
+            dry_run: Trueの場合は統計のみ計算し、DBは更新しない
+            missing_score: DBに無いサブスコア列（古いエクスポートの domain_reputation_score など）に
+                           使う値。Noneの場合、列が欠けていればエラーにする
+
+        Returns:
+            再計算後の統計情報
+        """
+        if table not in RESCORABLE_TABLES:
+            raise ValueError(f"Unsupported table: {table}")
+
+        if not Path(db_path).exists():
+            raise FileNotFoundError(f"Database not found: {db_path}")
+
+        conn = sqlite3.connect(db_path)
+        try:
+            columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+            expression, params = self._build_total_score_expression(columns, missing_score)
+
+            # 履歴テーブルにはスコア未保存の行があるため除外する
+            where = "WHERE industry_match_score IS NOT NULL"
+
+            with conn:
+                if not dry_run:
+                    conn.execute(f"UPDATE {table} SET total_score = {expression} {where}", params)
+
+                row = conn.execute(f"""
+                    WITH rescored AS (
+                        SELECT {expression} AS score FROM {table} {where}
+                    )
+                    SELECT
+                        COUNT(*),
+                        SUM(CASE WHEN score >= ? THEN 1 ELSE 0 END),
+                        SUM(CASE WHEN score >= ? AND score < ? THEN 1 ELSE 0 END),
+                        SUM(CASE WHEN score < ? THEN 1 ELSE 0 END),
+                        AVG(score),
+                        MAX(score),
+                        MIN(score)
+                    FROM rescored
+                """, params + [
+                    self.config.high_priority_threshold,
+                    self.config.medium_priority_threshold,
+                    self.config.high_priority_threshold,
+                    self.config.medium_priority_threshold
+                ]).fetchone()
+
+                stats = {
+                    'total_leads': row[0],
+                    'high_priority_leads': row[1] or 0,
+                    'medium_priority_leads': row[2] or 0,
+                    'low_priority_leads': row[3] or 0,
+                    'average_score': row[4] or 0,
+                    'max_score': row[5] or 0,
+                    'min_score': row[6] or 0,
+                }
+
+                # エクスポートファイルの統計も同じトランザクションで更新する
+                if not dry_run and table == 'sales_leads' and self._has_table(conn, 'export_stats'):
+                    conn.execute("""
+                        UPDATE export_stats SET
+                            high_priority_leads = ?,
+                            medium_priority_leads = ?,
+                            low_priority_leads = ?,
+                            average_score = ?
+                    """, (
+                        stats['high_priority_leads'],
+                        stats['medium_priority_leads'],
+                        stats['low_priority_leads'],
+                        stats['average_score']
+                    ))
+        finally:
+            conn.close()
+
+        logger.info(f"Rescored {stats['total_leads']} leads in {db_path} ({table}){' [dry run]' if dry_run else ''}")
+        return stats
+
+    def rescore_history(self, history_manager=None, dry_run: bool = False) -> Dict:
+        """
+        履歴DBの総合スコアを再計算
+        """
+        if history_manager is None:
+            from history_manager import HistoryManager
+            history_manager = HistoryManager()
+
+        return self.rescore_database(str(history_manager.db_path), table='company_history', dry_run=dry_run)
+
+    @staticmethod
+    def _has_table(conn: sqlite3.Connection, name: str) -> bool:
+        return conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+        ).fetchone() is not None
+
+    def _build_total_score_expression(self, columns, missing_score: Optional[float] = None) -> tuple:
+        """
+        総合スコアを計算するSQL式とパラメータを構築
+
+        Raises:
+            ValueError: サブスコア列が欠けていて、missing_score が指定されていない場合
+        """
+        factors = get_score_factors(self.config)
+        # 古いエクスポートには domain_reputation_score が無い
+        missing = [f"{name}_score" for name in factors if f"{name}_score" not in columns]
+        if missing and missing_score is None:
+            raise ValueError(f"Missing score columns: {', '.join(missing)} (specify a value for missing scores)")
+
+        terms = []
+        params = []
+
+        for name, factor in factors.items():
+            column = f"{name}_score"
+            if column in columns:
+                terms.append(f"COALESCE({column}, 0) * ?")
+                params.append(factor)
+            else:
+                terms.append("? * ?")
+                params.extend([missing_score, factor])
+
+        params.append(self.config.max_score)
+        return f"MIN({' + '.join(terms)}, ?)", params
+
+def main():
+    """
+    コマンドライン実行のメイン関数
+    """
+    parser = argparse.ArgumentParser(description="保存済みサブスコアからの再スコアリング")
+
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--db", help="SQLiteエクスポートファイルのパス")
+    target.add_argument("--history", action="store_true", help="履歴DBを再スコアリング")
+
+    parser.add_argument("--industry-weight", type=float, help="業種一致度の重み")
+    parser.add_argument("--size-weight", type=float, help="事業規模の重み")
+    parser.add_argument("--contact-weight", type=float, help="連絡先充実度の重み")
+    parser.add_argument("--location-weight", type=float, help="所在地一致度の重み")
+    parser.add_argument("--domain-weight", type=float, help="ドメイン信頼性の重み")
+    parser.add_argument("--max-score", type=float, help="総合スコアの上限")
+    parser.add_argument("--high-threshold", type=float, help="高優先度とする総合スコアの下限")
+    parser.add_argument("--medium-threshold", type=float, help="中優先度とする総合スコアの下限")
+    parser.add_argument("--missing-score", type=float,
+                        help="DBに無いサブスコア列に使う値（古いエクスポート用。未指定の場合はエラー）")
+    parser.add_argument("--dry-run", action="store_true", help="DBを更新せず統計のみ表示")
+
+    args = parser.parse_args()
+
+    overrides = {
+        'industry_match_weight': args.industry_weight,
+        'business_size_weight': args.size_weight,
+        'contact_info_weight': args.contact_weight,
+        'location_match_weight': args.location_weight,
+        'domain_reputation_weight': args.domain_weight,
+        'max_score': args.max_score,
+        'high_priority_threshold': args.high_threshold,
+        'medium_priority_threshold': args.medium_threshold,
+    }
+    scoring_config = replace(config.scoring, **{k: v for k, v in overrides.items() if v is not None})
+
+    if scoring_config.medium_priority_threshold > scoring_config.high_priority_threshold:
+        parser.error("--medium-threshold must not exceed --high-threshold")
+
+    rescorer = LeadRescorer(scoring_config)
+
+    try:
+        if args.history:
+            stats = rescorer.rescore_history(dry_run=args.dry_run)
+        else:
+            stats = rescorer.rescore_database(args.db, dry_run=args.dry_run, missing_score=args.missing_score)
+    except (FileNotFoundError, ValueError, sqlite3.Error) as e:
+        print(f"\n❌ エラーが発生しました: {e}")
+        sys.exit(1)
+
+    print(f"\n✅ 再スコアリングが完了しました{'（ドライラン）' if args.dry_run else ''}")
+    print(f"   対象リード数: {stats['total_leads']}")
+    print(f"   高優先度リード: {stats['high_priority_leads']}")
+    print(f"   中優先度リード: {stats['medium_priority_leads']}")
+    print(f"   低優先度リード: {stats['low_priority_leads']}")
+    print(f"   平均スコア: {stats['average_score']:.2f}")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
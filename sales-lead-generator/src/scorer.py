@@ -4,11 +4,42 @@ import logging
 from difflib import SequenceMatcher
 
 from config.config import config
-from models import CompanyInfo, ScoredLead, BusinessSize, SearchQuery
+from models import CompanyInfo, ScoredLead, BusinessSize, SearchQuery, SCORE_COMPONENTS
 from data_enhancer import DomainAnalyzer
 
 logger = logging.getLogger(__name__)
 
+def get_score_factors(scoring_config) -> Dict[str, float]:
+    """
+    各サブスコアに掛ける係数（重み / 最大値）を取得
+    """
+    return {
+        name: getattr(scoring_config, weight_attr) / max_value
+        for name, (weight_attr, max_value) in SCORE_COMPONENTS.items()
+    }
+
+def calculate_total_score(scores: Dict[str, float], scoring_config) -> float:
+    """
+    サブスコアと重み設定から総合スコアを計算
+    """
+    factors = get_score_factors(scoring_config)
+    total = sum(scores.get(name, 0) * factor for name, factor in factors.items())
+    return min(total, scoring_config.max_score)
+
+# 優先度 -> SalesforceのRating（CRM連携とインポート用テンプレートで共有）
+SALESFORCE_RATINGS = {'high': 'Hot', 'medium': 'Warm', 'low': 'Cold'}
+
+def lead_priority(total_score: float, scoring_config=None) -> str:
+    """
+    総合スコアから優先度（high/medium/low）を判定
+    """
+    scoring_config = scoring_config or config.scoring
+    if total_score >= scoring_config.high_priority_threshold:
+        return 'high'
+    if total_score >= scoring_config.medium_priority_threshold:
+        return 'medium'
+    return 'low'
+
 class LeadScorer:
     def __init__(self):
         self.config = config.scoring
@@ -204,14 +235,7 @@ class LeadScorer:
         """
         総合スコアを計算
         """
-        total = 0.0
-        total += scores.get('industry_match', 0) * (self.config.industry_match_weight / 5.0)
-        total += scores.get('business_size', 0) * (self.config.business_size_weight / 3.0)
-        total += scores.get('contact_info', 0) * (self.config.contact_info_weight / 2.0)
-        total += scores.get('location_match', 0) * (self.config.location_match_weight / 3.0)
-        total += scores.get('domain_reputation', 0) * 1.0
-
-        return min(total, self.config.max_score)
+        return calculate_total_score(scores, self.config)
 
     def _calculate_confidence(self, company: CompanyInfo, scores: Dict[str, float]) -> float:
         """
@@ -301,6 +325,7 @@ class ScoreAnalyzer:
 
         scores = [lead.total_score for lead in scored_leads]
         confidences = [lead.confidence for lead in scored_leads]
+        priorities = [lead_priority(score) for score in scores]
 
         analysis = {
             'total_leads': len(scored_leads),
@@ -315,9 +340,9 @@ class ScoreAnalyzer:
                 'max': max(confidences),
                 'average': sum(confidences) / len(confidences)
             },
-            'high_priority_leads': len([s for s in scores if s >= 8.0]),
-            'medium_priority_leads': len([s for s in scores if 5.0 <= s < 8.0]),
-            'low_priority_leads': len([s for s in scores if s < 5.0])
+            'high_priority_leads': priorities.count('high'),
+            'medium_priority_leads': priorities.count('medium'),
+            'low_priority_leads': priorities.count('low')
         }
 
         return analysis
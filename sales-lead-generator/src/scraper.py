@@ -1,15 +1,17 @@
 import asyncio
 import aiohttp
 import time
-from typing import List, Optional, Dict
+from typing import Callable, List, Optional, Dict
 from urllib.parse import urljoin, urlparse
 from urllib.robotparser import RobotFileParser
 import logging
 # from playwright.async_api import async_playwright
 from bs4 import BeautifulSoup
 
+import metrics
 from config.config import config
 from models import SearchResult
+from progress import gather_with_progress
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +21,8 @@ class WebScraper:
         self.session = None
         self.playwright = None
         self.browser = None
+        # 同時リクエスト数の上限（同じスクレイパーを使う全ての呼び出しで共有）
+        self._semaphore = None
 
     async def __aenter__(self):
         # HTTP セッションの初期化
@@ -44,19 +48,24 @@ class WebScraper:
         if self.playwright:
             await self.playwright.stop()
 
-    async def scrape_urls(self, search_results: List[SearchResult]) -> List[Dict[str, str]]:
+    async def scrape_urls(self, search_results: List[SearchResult],
+                          progress_callback: Optional[Callable[[int, int], None]] = None) -> List[Dict[str, str]]:
         """
         検索結果のURLリストから情報を抽出
+
+        Args:
+            progress_callback: 1ページ完了するごとに (完了数, 総数) で呼ばれる
         """
         scraped_data = []
-        semaphore = asyncio.Semaphore(self.config.max_concurrent_requests)
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.config.max_concurrent_requests)
 
         tasks = []
         for result in search_results:
-            task = self._scrape_single_url(semaphore, result.url)
+            task = self._scrape_single_url(self._semaphore, result.url)
             tasks.append(task)
 
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        results = await gather_with_progress(tasks, progress_callback, return_exceptions=True)
 
         for i, result in enumerate(results):
             if isinstance(result, Exception):
@@ -96,21 +105,28 @@ class WebScraper:
         """
         HTTPリクエストでコンテンツを取得
         """
+        host = urlparse(url).netloc
         for attempt in range(self.config.max_retries):
             try:
-                async with self.session.get(url) as response:
-                    if response.status == 200:
-                        content = await response.text()
-                        return content
-                    elif response.status == 429:  # Rate limited
-                        wait_time = self.config.retry_delay * (2 ** attempt)
-                        await asyncio.sleep(wait_time)
-                        continue
-                    else:
-                        logger.warning(f"HTTP {response.status} for {url}")
-                        return None
+                with metrics.timer('scrape_latency_seconds', host=host):
+                    async with self.session.get(url) as response:
+                        metrics.inc('http_requests_total', component='scrape', status=response.status)
+                        if response.status == 200:
+                            body = await response.read()
+                            metrics.inc('http_response_bytes_total', len(body), component='scrape')
+                            content = await response.text()
+                            return content
+                        elif response.status == 429:  # Rate limited
+                            wait_time = self.config.retry_delay * (2 ** attempt)
+                        else:
+                            logger.warning(f"HTTP {response.status} for {url}")
+                            return None
+
+                # レート制限の待機はレイテンシに含めない
+                await asyncio.sleep(wait_time)
 
             except Exception as e:
+                metrics.inc('http_requests_total', component='scrape', status='error')
                 if attempt < self.config.max_retries - 1:
                     wait_time = self.config.retry_delay * (2 ** attempt)
                     await asyncio.sleep(wait_time)
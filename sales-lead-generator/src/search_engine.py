@@ -10,55 +10,105 @@ try:
 except ImportError:
     GOOGLE_API_AVAILABLE = False
 
-try:
-    from serpapi import GoogleSearch
-    SERPAPI_AVAILABLE = True
-except ImportError:
-    SERPAPI_AVAILABLE = False
-
+import metrics
 from config.config import config
 from models import SearchQuery, SearchResult
 
 logger = logging.getLogger(__name__)
 
 class SearchEngine:
-    def __init__(self):
+    def __init__(self, session: Optional[aiohttp.ClientSession] = None):
+        """
+        Args:
+            session: 共有する aiohttp セッション（WebScraper のセッションなど）。
+                     指定しない場合は async with の間だけ自前のセッションを開く
+        """
         self.config = config.search
+        self.session = session
+        self._owns_session = False
+        # 自前のセッションを使用中の async with の数（並行する実行が途中で閉じないように）
+        self._session_users = 0
+        # 検索間隔の制御（同じ検索エンジンを使う全ての呼び出しで共有）
+        self._rate_lock = None
+        self._next_search_at = 0.0
         self.google_service = None
         if GOOGLE_API_AVAILABLE and self.config.google_api_key and self.config.google_cse_id:
             self.google_service = build("customsearch", "v1", developerKey=self.config.google_api_key)
 
-    async def search(self, query: SearchQuery) -> List[SearchResult]:
+    async def __aenter__(self):
+        # 全クエリ・全ページのSerpAPI呼び出しで1つのセッション（コネクションプール）を使う
+        if self.session is None:
+            self.session = aiohttp.ClientSession()
+            self._owns_session = True
+        if self._owns_session:
+            self._session_users += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        # 共有されたセッションは持ち主が閉じる。自前のセッションは最後の利用者が閉じる
+        if not self._owns_session:
+            return
+        self._session_users -= 1
+        if not self._session_users:
+            session = self.session
+            self.session = None
+            self._owns_session = False
+            await session.close()
+
+    async def search(self, query: SearchQuery, page: int = 0) -> List[SearchResult]:
         """
         メインの検索関数。Google Custom Search APIとSerpAPIの両方を試行
+
+        Args:
+            query: 検索クエリ
+            page: 取得するページ（0始まり、1ページ10件）
         """
         results = []
         search_string = query.to_search_string()
 
+        await self._wait_for_rate_limit()
+
         # Google Custom Search APIを優先
         if self.google_service:
             try:
-                google_results = await self._search_google_custom(search_string)
+                with metrics.timer('search_latency_seconds', engine='google_custom'):
+                    google_results = await self._search_google_custom(search_string, page)
+                metrics.inc('http_requests_total', component='search', status='ok')
                 results.extend(google_results)
                 logger.info(f"Google Custom Search returned {len(google_results)} results")
             except Exception as e:
+                metrics.inc('http_requests_total', component='search', status='error')
                 logger.warning(f"Google Custom Search failed: {e}")
 
         # Google Custom Searchが失敗した場合、またはSerpAPIキーが設定されている場合
-        if SERPAPI_AVAILABLE and ((not results and self.config.serpapi_key) or self.config.serpapi_key):
+        if self.config.serpapi_key:
             try:
-                serp_results = await self._search_serpapi(search_string)
+                with metrics.timer('search_latency_seconds', engine='serpapi'):
+                    serp_results = await self._search_serpapi(search_string, page)
+                metrics.inc('http_requests_total', component='search', status='ok')
                 results.extend(serp_results)
                 logger.info(f"SerpAPI returned {len(serp_results)} results")
             except Exception as e:
+                metrics.inc('http_requests_total', component='search', status='error')
                 logger.warning(f"SerpAPI failed: {e}")
 
-        # 検索間隔の制御
-        await asyncio.sleep(self.config.search_delay)
-
         return results[:self.config.max_results_per_query]
 
-    async def _search_google_custom(self, search_string: str) -> List[SearchResult]:
+    async def _wait_for_rate_limit(self):
+        """
+        前回の検索から search_delay 秒経つまで待つ
+
+        キャンペーンの同時実行中の条件など、並行する検索も1つの間隔に従う。
+        """
+        if self._rate_lock is None:
+            self._rate_lock = asyncio.Lock()
+        async with self._rate_lock:
+            delay = self._next_search_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_search_at = time.monotonic() + self.config.search_delay
+
+    async def _search_google_custom(self, search_string: str, page: int = 0) -> List[SearchResult]:
         """
         Google Custom Search APIを使用した検索
         """
@@ -72,7 +122,8 @@ class SearchEngine:
             lambda: self.google_service.cse().list(
                 q=search_string,
                 cx=self.config.google_cse_id,
-                num=min(10, self.config.max_results_per_query)
+                num=min(10, self.config.max_results_per_query),
+                start=page * 10 + 1
             ).execute()
         )
 
@@ -84,30 +135,39 @@ class SearchEngine:
                     url=item.get('link', ''),
                     snippet=item.get('snippet', ''),
                     search_engine='google_custom',
-                    position=i + 1
+                    position=page * 10 + i + 1
                 ))
 
         return search_results
 
-    async def _search_serpapi(self, search_string: str) -> List[SearchResult]:
+    async def _search_serpapi(self, search_string: str, page: int = 0) -> List[SearchResult]:
         """
         SerpAPIを使用した検索
-        """
-        if not SERPAPI_AVAILABLE:
-            raise ValueError("SerpAPI not available")
 
+        REST APIをaiohttpで直接呼び出す（SDKの同期呼び出しでスレッドを占有しない）。
+        接続先は serpapi_base_url で変更できる（ベンチマークのフィクスチャサーバーなど）。
+        セッションが開かれていない場合（async with の外での単発の呼び出し）は一時的なセッションを使う。
+        """
         if not self.config.serpapi_key:
             raise ValueError("SerpAPI key not configured")
 
-        search = GoogleSearch({
+        params = {
+            "engine": "google",
             "q": search_string,
             "api_key": self.config.serpapi_key,
-            "num": min(10, self.config.max_results_per_query)
-        })
+            "num": min(10, self.config.max_results_per_query),
+            "start": page * 10
+        }
 
-        # 同期的なAPIを非同期で実行
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(None, search.get_dict)
+        if self.session is None:
+            async with self:
+                return await self._search_serpapi(search_string, page)
+
+        timeout = aiohttp.ClientTimeout(total=self.config.request_timeout)
+        url = f"{self.config.serpapi_base_url.rstrip('/')}/search.json"
+        async with self.session.get(url, params=params, timeout=timeout) as response:
+            response.raise_for_status()
+            result = await response.json()
 
         search_results = []
         if 'organic_results' in result:
@@ -117,7 +177,7 @@ class SearchEngine:
                     url=item.get('link', ''),
                     snippet=item.get('snippet', ''),
                     search_engine='serpapi',
-                    position=i + 1
+                    position=page * 10 + i + 1
                 ))
 
         return search_results
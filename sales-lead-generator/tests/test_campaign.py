@@ -0,0 +1,116 @@
+"""
+キャンペーン実行のテストファイル
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from campaign import Campaign, CampaignRunner, Territory, load_campaign
+
+class TestLoadCampaign:
+
+    def test_load_yaml_matrix(self, tmp_path):
+        """YAMLの業種×地域×キーワードの展開テスト"""
+        pytest.importorskip("yaml")
+        path = tmp_path / "kanto.yaml"
+        path.write_text("""
+name: 関東IT
+industries: [IT, 製造業]
+locations: [東京都, 神奈川県, 埼玉県]
+keywords:
+  - []
+  - [システム開発]
+max_results: 20
+concurrency: 3
+territories:
+  - {industry: 小売業, location: 群馬県, keywords: 雑貨;食品, max_results: 5}
+""", encoding='utf-8')
+
+        campaign = load_campaign(path)
+
+        assert campaign.name == '関東IT'
+        assert len(campaign.territories) == 2 * 3 * 2 + 1
+        assert campaign.territories[1] == Territory('IT', '東京都', ['システム開発'])
+        assert campaign.territories[-1] == Territory('小売業', '群馬県', ['雑貨', '食品'], 5)
+        assert campaign.max_results == 20
+        assert campaign.concurrency == 3
+
+    def test_load_csv(self, tmp_path):
+        """CSVの読み込みと不正な行のテスト"""
+        path = tmp_path / "territories.csv"
+        path.write_text("industry,location,keywords,max_results\nIT,東京都,システム開発;WEB制作,10\n飲食業,大阪府,,\n",
+                        encoding='utf-8')
+
+        campaign = load_campaign(path)
+
+        assert campaign.name == 'territories'
+        assert campaign.territories == [
+            Territory('IT', '東京都', ['システム開発', 'WEB制作'], 10),
+            Territory('飲食業', '大阪府', [], None)
+        ]
+
+        path.write_text("industry,location\nIT,\n", encoding='utf-8')
+        with pytest.raises(ValueError):
+            load_campaign(path)
+
+class TestCampaignRunner:
+
+    @staticmethod
+    def _lead(name, url, score):
+        return {'company_name': name, 'url': url, 'total_score': score, 'confidence': 0.5}
+
+    @pytest.mark.asyncio
+    async def test_run_shares_generator_and_deduplicates(self):
+        """生成器の共有・同時実行数の制限・条件間の重複除去のテスト"""
+        running = 0
+        max_running = 0
+
+        async def generate_leads(industry, location, **kwargs):
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+            assert kwargs['export_formats'] == []
+            if location == '失敗県':
+                return {'success': False, 'error': 'No search results found'}
+            leads = [
+                self._lead(f'{location}の会社', f'https://{location}.example.com', 5.0),
+                # 全条件で見つかる会社（スコアの最も高いものを残す）
+                self._lead('共通株式会社', 'https://www.common.example.com/', 9.0 if location == '千葉県' else 6.0)
+            ]
+            return {'success': True, 'leads_count': len(leads), 'leads': leads}
+
+        generator = Mock()
+        generator.generate_leads = generate_leads
+        generator.exporter.export_formats = AsyncMock(return_value={'csv': 'campaign.csv'})
+        factory = Mock(return_value=generator)
+
+        campaign = Campaign(
+            name='test',
+            territories=[Territory('IT', location) for location in ('東京都', '神奈川県', '千葉県', '埼玉県', '失敗県')],
+            concurrency=4
+        )
+        result = await CampaignRunner(generator_factory=factory, concurrency=2).run(campaign, export_formats=['csv'])
+
+        factory.assert_called_once()
+        assert max_running == 2  # コマンドラインの指定がファイルの指定より優先
+        assert result['success'] is True
+        assert result['leads_count'] == 5
+        assert result['duplicates_removed'] == 3
+        assert result['top_leads'][0]['company_name'] == '共通株式会社'
+        assert result['top_leads'][0]['total_score'] == 9.0
+        assert [t['success'] for t in result['territories']] == [True, True, True, True, False]
+
+        # 全条件の結果を1回でエクスポート
+        generator.exporter.export_formats.assert_awaited_once()
+        exported_leads, formats, search_info = generator.exporter.export_formats.call_args.args[:3]
+        assert len(exported_leads) == 5
+        assert formats == ['csv']
+        assert search_info['location'] == '東京都, 神奈川県, 千葉県, 埼玉県, 失敗県'
@@ -0,0 +1,285 @@
+"""
+CRM連携のテストファイル（ローカルのモックサーバーを使用）
+"""
+
+import pytest
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from config.config import config
+from crm_integrations import CRMIntegrationManager, HubSpotClient, SalesforceClient, parse_retry_after
+from crm_outbox import CRMOutbox
+from models import CompanyInfo, ScoredLead
+
+def make_leads(count, prefix="company"):
+    return [
+        ScoredLead(
+            company=CompanyInfo(company_name=f"{prefix}-{i}", url=f"https://www.{prefix}-{i}.co.jp/about"),
+            total_score=6.0,
+            scores={},
+            confidence=0.5
+        )
+        for i in range(count)
+    ]
+
+class MockHubSpot:
+    """HubSpot CRM v3 APIの最小限のモック"""
+
+    def __init__(self, existing_domains=(), rate_limit_once=False, retry_after='0'):
+        self.companies = {str(i): {"domain": d} for i, d in enumerate(existing_domains, start=1)}
+        self.next_id = len(self.companies) + 1
+        self.requests = []
+        self.rate_limit_once = rate_limit_once
+        self.retry_after = retry_after
+
+        self.app = web.Application()
+        self.app.router.add_post('/crm/v3/objects/companies/search', self.search)
+        self.app.router.add_post('/crm/v3/objects/companies/batch/create', self.batch_create)
+        self.app.router.add_post('/crm/v3/objects/companies/batch/update', self.batch_update)
+
+    async def search(self, request):
+        self.requests.append('search')
+        if self.rate_limit_once:
+            self.rate_limit_once = False
+            return web.json_response({}, status=429, headers={'Retry-After': self.retry_after})
+
+        body = await request.json()
+        values = set(body["filterGroups"][0]["filters"][0]["values"])
+        results = [
+            {"id": company_id, "properties": {"domain": props["domain"]}}
+            for company_id, props in self.companies.items() if props["domain"] in values
+        ]
+        return web.json_response({"total": len(results), "results": results})
+
+    async def batch_create(self, request):
+        self.requests.append('create')
+        body = await request.json()
+        assert len(body["inputs"]) <= 100
+        results = []
+        for item in body["inputs"]:
+            company_id = str(self.next_id)
+            self.next_id += 1
+            self.companies[company_id] = item["properties"]
+            results.append({"id": company_id, "properties": item["properties"]})
+        return web.json_response({"status": "COMPLETE", "results": results}, status=201)
+
+    async def batch_update(self, request):
+        self.requests.append('update')
+        body = await request.json()
+        results = []
+        for item in body["inputs"]:
+            self.companies[item["id"]].update(item["properties"])
+            results.append({"id": item["id"], "properties": item["properties"]})
+        return web.json_response({"status": "COMPLETE", "results": results})
+
+class MockSalesforce:
+    """Salesforce OAuth・SOQL・sObject Collections APIの最小限のモック"""
+
+    def __init__(self, existing_companies=(), auth_fails=False):
+        self.existing = set(existing_companies)
+        self.auth_fails = auth_fails
+        self.requests = []
+        self.instance_url = None
+
+        self.app = web.Application()
+        self.app.router.add_post('/services/oauth2/token', self.token)
+        self.app.router.add_get('/services/data/v54.0/query/', self.query)
+        self.app.router.add_post('/services/data/v54.0/composite/sobjects', self.collections)
+
+    async def token(self, request):
+        if self.auth_fails:
+            return web.json_response({"error": "invalid_grant"}, status=400)
+        return web.json_response({"access_token": "token", "instance_url": self.instance_url})
+
+    async def query(self, request):
+        self.requests.append('query')
+        soql = request.query["q"]
+        records = [{"Company": name} for name in self.existing if f"'{name}'" in soql]
+        return web.json_response({"totalSize": len(records), "done": True, "records": records})
+
+    async def collections(self, request):
+        self.requests.append('create')
+        body = await request.json()
+        assert len(body["records"]) <= 200
+        results = []
+        for i, record in enumerate(body["records"]):
+            if record["Company"].endswith("-13"):
+                results.append({"success": False, "errors": [{"message": "invalid field"}]})
+            else:
+                results.append({"id": f"00Q{i}", "success": True, "errors": []})
+        return web.json_response(results)
+
+class TestHubSpotClient:
+
+    @pytest.mark.asyncio
+    async def test_batch_upsert(self):
+        """バッチ検索・作成・更新のテスト"""
+        leads = make_leads(250)
+        mock = MockHubSpot(existing_domains=[f"company-{i}.co.jp" for i in range(0, 250, 5)])
+
+        async with TestServer(mock.app) as server:
+            client = HubSpotClient("test-key", base_url=str(server.make_url('')))
+            result = await client.create_companies(leads)
+
+        assert result["created"] == 200
+        assert result["updated"] == 50
+        assert result["errors"] == []
+        assert len(result["records"]) == 250
+        assert mock.requests.count('search') == 3
+        assert mock.requests.count('create') == 3
+        assert len(mock.requests) <= 9
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_retry_and_duplicates(self):
+        """429リトライと同一ドメインの重複排除のテスト"""
+        leads = make_leads(3) + make_leads(1)
+        mock = MockHubSpot(rate_limit_once=True)
+
+        async with TestServer(mock.app) as server:
+            client = HubSpotClient("test-key", base_url=str(server.make_url('')))
+            result = await client.create_companies(leads)
+
+        assert result["created"] == 3
+        assert [r["status"] for r in result["records"]].count("skipped") == 1
+        assert mock.requests.count('search') == 2
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_retry_after_http_date(self):
+        """HTTP日付形式の Retry-After でもリトライされることのテスト"""
+        mock = MockHubSpot(rate_limit_once=True, retry_after='Wed, 21 Oct 2015 07:28:00 GMT')
+
+        async with TestServer(mock.app) as server:
+            client = HubSpotClient("test-key", base_url=str(server.make_url('')))
+            result = await client.create_companies(make_leads(2))
+
+        assert result["created"] == 2
+        assert mock.requests.count('search') == 2
+
+    def test_parse_retry_after(self):
+        """Retry-After の秒数・HTTP日付・不正値の解釈のテスト"""
+        assert parse_retry_after('3') == 3.0
+        assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
+        assert 0 < parse_retry_after(format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)) <= 30
+        assert parse_retry_after('soon') is None
+        assert parse_retry_after(None) is None
+
+class TestSalesforceClient:
+
+    @pytest.mark.asyncio
+    async def test_bulk_create_leads(self):
+        """一括照会とsObject Collectionsによる作成のテスト"""
+        leads = make_leads(450)
+        mock = MockSalesforce(existing_companies=[f"company-{i}" for i in range(0, 450, 9)])
+
+        async with TestServer(mock.app) as server:
+            mock.instance_url = str(server.make_url('')).rstrip('/')
+            client = SalesforceClient("id", "secret", "user", "pass", login_url=mock.instance_url)
+            await client.authenticate()
+            result = await client.create_leads(leads)
+
+        statuses = [record["status"] for record in result["records"]]
+        assert statuses.count("skipped") == 50
+        assert statuses.count("error") == 1
+        assert result["created"] == 399
+        assert mock.requests.count('query') == 5
+        assert mock.requests.count('create') == 2
+
+    @pytest.mark.asyncio
+    async def test_create_leads_without_authentication(self):
+        """認証前の create_leads が送信せずにエラーを返すことのテスト"""
+        client = SalesforceClient("id", "secret", "user", "pass", login_url="http://localhost")
+        result = await client.create_leads(make_leads(3))
+
+        assert result["success"] is False
+        assert result["created"] == 0
+
+class TestCRMIntegrationManager:
+
+    @pytest.mark.asyncio
+    async def test_concurrent_sync_with_outbox(self, tmp_path, monkeypatch):
+        """アウトボックス経由の並列同期・再実行時の重複送信防止・失敗分の再送のテスト"""
+        monkeypatch.setattr(config.crm, 'retry_delay', 0)
+        leads = make_leads(20)
+        hubspot = MockHubSpot()
+        salesforce = MockSalesforce()
+
+        async with TestServer(hubspot.app) as hubspot_server, TestServer(salesforce.app) as salesforce_server:
+            salesforce.instance_url = str(salesforce_server.make_url('')).rstrip('/')
+            manager = CRMIntegrationManager(outbox=CRMOutbox(tmp_path / "outbox.db"))
+            manager.config = replace(
+                config.crm,
+                hubspot_api_key="test-key",
+                hubspot_base_url=str(hubspot_server.make_url('')),
+                salesforce_client_id="id",
+                salesforce_client_secret="secret",
+                salesforce_login_url=salesforce.instance_url,
+                zoho_client_id=None,
+                zoho_client_secret=None
+            )
+
+            results = await manager.sync_to_all_crms(leads)
+
+            assert results["hubspot"]["created"] == 20
+            assert results["hubspot"]["outbox"] == {"sent": 20}
+            assert results["salesforce"]["created"] == 19
+            assert results["salesforce"]["outbox"] == {"sent": 19, "failed": 1}
+
+            # 送信済みのリードは再送されず、失敗した1件のみ再試行される
+            hubspot_requests = len(hubspot.requests)
+            results = await manager.sync_to_all_crms(leads)
+
+            assert len(hubspot.requests) == hubspot_requests
+            assert results["hubspot"]["created"] == 0
+            assert salesforce.requests.count('create') == 2
+            assert results["salesforce"]["outbox"] == {"sent": 19, "failed": 1}
+
+    @pytest.mark.asyncio
+    async def test_salesforce_auth_failure(self, tmp_path):
+        """認証失敗時にリードを送信せず、失敗として記録することのテスト"""
+        salesforce = MockSalesforce(auth_fails=True)
+
+        async with TestServer(salesforce.app) as server:
+            salesforce.instance_url = str(server.make_url('')).rstrip('/')
+            manager = CRMIntegrationManager(outbox=CRMOutbox(tmp_path / "outbox.db"))
+            manager.config = replace(
+                config.crm,
+                hubspot_api_key=None,
+                salesforce_client_id="id",
+                salesforce_client_secret="secret",
+                salesforce_login_url=salesforce.instance_url,
+                zoho_client_id=None,
+                zoho_client_secret=None
+            )
+
+            results = await manager.sync_to_all_crms(make_leads(3))
+
+        assert results["salesforce"]["success"] is False
+        assert results["salesforce"]["error"] == "Salesforce authentication failed"
+        assert salesforce.requests == []
+        assert results["salesforce"]["outbox"] == {"failed": 3}
+
+    def test_outbox_reclaims_expired_lease(self, tmp_path):
+        """送信中のままクラッシュしたレコードがリース切れ後に再取得されるテスト"""
+        leads = make_leads(3)
+        outbox = CRMOutbox(tmp_path / "outbox.db", max_attempts=2)
+
+        assert outbox.enqueue('hubspot', leads) == 3
+        assert outbox.enqueue('hubspot', leads) == 0
+        assert len(outbox.claim_pending('hubspot')) == 3
+        assert outbox.claim_pending('hubspot') == []
+
+        # プロセス再起動を想定（リース期間0秒）
+        restarted = CRMOutbox(tmp_path / "outbox.db", max_attempts=2, lease_seconds=0)
+        reclaimed = restarted.claim_pending('hubspot')
+        assert [lead.company.url for _, lead in reclaimed] == [lead.company.url for lead in leads]
+
+        # 最大試行回数に達したレコードは取得されない
+        assert restarted.claim_pending('hubspot') == []
+        assert restarted.get_counts('hubspot') == {"in_flight": 3}
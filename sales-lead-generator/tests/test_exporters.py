@@ -0,0 +1,189 @@
+"""
+エクスポート機能のテストファイル
+"""
+
+import pytest
+import csv
+import gzip
+import json
+import sqlite3
+from dataclasses import replace
+from unittest.mock import patch
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from config.config import config
+from exporters import DataExporter, EXPORT_COLUMNS
+from models import CompanyInfo, BusinessSize, ScoredLead
+
+class TestDataExporter:
+
+    @pytest.fixture
+    def exporter(self, tmp_path):
+        exporter = DataExporter()
+        exporter.config = replace(config.output, output_dir=str(tmp_path))
+        return exporter
+
+    @pytest.fixture
+    def scored_leads(self):
+        leads = []
+        for i in range(25):
+            leads.append(ScoredLead(
+                company=CompanyInfo(
+                    company_name=f"株式会社サンプル{i}",
+                    url=f"https://sample-{i}.co.jp",
+                    location="東京都渋谷区",
+                    industry="IT" if i % 2 else "製造業",
+                    business_size=BusinessSize.SMALL,
+                    additional_emails=[f"info@sample-{i}.co.jp"],
+                    social_media={"twitter": f"@sample{i}"},
+                    is_wordpress=i % 5 == 0
+                ),
+                total_score=float(i % 13),
+                scores={"industry_match": 2.0, "domain_reputation": 0.5},
+                confidence=0.7
+            ))
+        return leads
+
+    @pytest.fixture
+    def search_info(self):
+        return {"industry": "IT", "location": "東京都", "additional_keywords": []}
+
+    @pytest.mark.asyncio
+    async def test_export_to_sqlite(self, exporter, scored_leads, search_info):
+        """SQLiteエクスポートの行数・インデックスのテスト"""
+        filepath = await exporter.export_to_sqlite(scored_leads, "test", search_info)
+
+        assert filepath is not None
+        with sqlite3.connect(filepath) as conn:
+            count = conn.execute("SELECT COUNT(*) FROM sales_leads").fetchone()[0]
+            indexes = {row[1] for row in conn.execute("PRAGMA index_list(sales_leads)")}
+            row = conn.execute(
+                "SELECT domain_reputation_score, search_industry, additional_emails FROM sales_leads WHERE url = ?",
+                ("https://sample-3.co.jp",)
+            ).fetchone()
+            stats = conn.execute("SELECT total_leads FROM export_stats").fetchone()
+            journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+
+        assert journal_mode == "delete"
+        assert not os.path.exists(f"{filepath}-wal")
+        assert count == 25
+        assert {"idx_sales_leads_total_score", "idx_sales_leads_url", "idx_sales_leads_industry"} <= indexes
+        assert row == (0.5, "IT", '["info@sample-3.co.jp"]')
+        assert stats[0] == 25
+
+    @pytest.mark.asyncio
+    async def test_export_to_csv_from_iterator(self, exporter, scored_leads, search_info):
+        """イテレータからのCSVエクスポートのテスト"""
+        filepath = await exporter.export_to_csv(iter(scored_leads), "test", search_info)
+
+        with open(filepath, newline='', encoding='utf-8-sig') as f:
+            rows = list(csv.reader(f))
+
+        assert rows[0] == EXPORT_COLUMNS
+        assert len(rows) == 26
+        assert rows[1][EXPORT_COLUMNS.index('search_location')] == "東京都"
+        assert rows[1][EXPORT_COLUMNS.index('additional_emails')] == '["info@sample-0.co.jp"]'
+        assert [row[EXPORT_COLUMNS.index('is_wordpress')] for row in rows[1:3]] == ["True", "False"]
+
+    @pytest.mark.asyncio
+    async def test_export_to_csv_append_gzip(self, exporter, scored_leads, search_info):
+        """gzip圧縮CSVへの追記のテスト"""
+        filepath = await exporter.export_to_csv(scored_leads[:10], "test", search_info, compress=True)
+        await exporter.export_to_csv(scored_leads[10:], search_info=search_info, filepath=filepath,
+                                     append=True, compress=True)
+
+        assert filepath.endswith(".csv.gz")
+        with gzip.open(filepath, 'rt', newline='', encoding='utf-8-sig') as f:
+            rows = list(csv.reader(f))
+
+        assert rows[0] == EXPORT_COLUMNS
+        assert len(rows) == 26
+        assert rows[-1][0] == "株式会社サンプル24"
+
+    @pytest.mark.asyncio
+    async def test_export_to_excel_sheets(self, exporter, scored_leads, search_info):
+        """Excelエクスポートのシート構成のテスト"""
+        openpyxl = pytest.importorskip("openpyxl")
+
+        filepath = await exporter.export_to_excel(iter(scored_leads), "test", search_info)
+
+        workbook = openpyxl.load_workbook(filepath, read_only=True)
+        assert workbook.sheetnames == ['Sales Leads', 'High Priority', 'Statistics']
+
+        main_rows = list(workbook['Sales Leads'].values)
+        high_rows = list(workbook['High Priority'].values)
+        stats = dict(list(workbook['Statistics'].values)[1:])
+
+        assert main_rows[0] == tuple(EXPORT_COLUMNS)
+        assert len(main_rows) == 26
+        score_index = EXPORT_COLUMNS.index('total_score')
+        assert all(row[score_index] >= 8.0 for row in high_rows[1:])
+        assert len(high_rows) - 1 == stats['high_priority_leads']
+        assert stats['total_leads'] == 25
+        workbook.close()
+
+    @pytest.mark.asyncio
+    async def test_export_to_parquet_partitioned(self, exporter, scored_leads, search_info):
+        """Parquetエクスポートのスキーマ・パーティションのテスト"""
+        pa = pytest.importorskip("pyarrow")
+        ds = pytest.importorskip("pyarrow.dataset")
+
+        dirpath = await exporter.export_to_parquet(scored_leads, "test", search_info)
+
+        assert os.path.isdir(os.path.join(dirpath, "search_industry=IT"))
+        table = ds.dataset(dirpath, partitioning="hive").to_table()
+
+        assert table.num_rows == 25
+        assert pa.types.is_dictionary(table.schema.field("business_size").type)
+        assert pa.types.is_list(table.schema.field("additional_emails").type)
+        assert pa.types.is_map(table.schema.field("social_media").type)
+        assert table.schema.field("total_score").type == pa.float64()
+        assert table.column("search_location").to_pylist()[0] == "東京都"
+
+    @pytest.mark.asyncio
+    async def test_export_formats_parallel(self, exporter, scored_leads, search_info):
+        """複数形式の並列エクスポートのテスト"""
+        pytest.importorskip("openpyxl")
+
+        with patch.object(ScoredLead, 'to_dict', autospec=True, side_effect=ScoredLead.to_dict) as mock_to_dict:
+            results = await exporter.export_formats(scored_leads, ["csv", "excel", "sqlite"], search_info, "test")
+
+        assert set(results) == {"csv", "excel", "sqlite"}
+        assert all(os.path.exists(path) for path in results.values())
+        assert mock_to_dict.call_count == len(scored_leads)
+
+    def test_stream_rows_from_stored_leads(self, exporter, scored_leads, search_info):
+        """保存済みのリードからCSV・JSONLを逐次生成するテスト"""
+        leads = [lead.to_dict() for lead in scored_leads] * 30
+        export_date = "2024-01-01T00:00:00"
+
+        csv_bytes = b"".join(exporter.stream_rows(
+            "csv", exporter.iter_lead_rows(iter(leads), search_info, export_date=export_date)
+        ))
+        csv_rows = list(csv.DictReader(csv_bytes.decode("utf-8-sig").splitlines()))
+        assert len(csv_rows) == 750
+        assert list(csv_rows[0]) == EXPORT_COLUMNS
+        assert csv_rows[-1]["export_date"] == export_date
+
+        chunks = list(exporter.stream_rows("jsonl", exporter.iter_lead_rows(iter(leads), search_info)))
+        assert len(chunks) > 1  # チャンク単位で生成される
+        records = [json.loads(line) for line in b"".join(chunks).decode("utf-8").splitlines()]
+        assert len(records) == 750
+        assert records[0]["social_media"] == {"twitter": "@sample0"}
+
+        with pytest.raises(ValueError):
+            next(exporter.stream_rows("excel", iter(leads)))
+
+    def test_write_single_parquet_file(self, exporter, scored_leads, search_info, tmp_path):
+        """ダウンロード用の単一Parquetファイル出力のテスト"""
+        pq = pytest.importorskip("pyarrow.parquet")
+
+        filepath = str(tmp_path / "leads.parquet")
+        rows = exporter.iter_lead_rows((lead.to_dict() for lead in scored_leads), search_info)
+        assert exporter.write_rows("parquet", rows, filepath, search_info, partitioned=False) == filepath
+
+        assert os.path.isfile(filepath)
+        assert pq.read_table(filepath).num_rows == 25
@@ -0,0 +1,322 @@
+"""
+履歴管理のテストファイル
+"""
+
+import gc
+import pytest
+import sqlite3
+import threading
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from bloom_filter import BloomFilter
+from history_manager import HistoryManager
+from models import CompanyInfo, ScoredLead, SearchResult
+
+def make_leads(count, prefix="company"):
+    return [
+        ScoredLead(
+            company=CompanyInfo(company_name=f"{prefix}-{i}", url=f"https://www.{prefix}-{i}.co.jp/", industry="IT"),
+            total_score=6.0,
+            scores={'industry_match': 2.0},
+            confidence=0.5
+        )
+        for i in range(count)
+    ]
+
+class TestHistoryManager:
+
+    def test_connection_reuse_and_pragmas(self, tmp_path):
+        """スレッドごとの接続の再利用とWAL設定のテスト"""
+        with HistoryManager(tmp_path / "history.db") as manager:
+            conn = manager._connection()
+            assert manager._connection() is conn
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+
+            other = []
+            thread = threading.Thread(target=lambda: other.append(manager._connection()))
+            thread.start()
+            thread.join()
+            assert other[0] is not conn
+
+            assert manager.add_scored_leads(make_leads(3), "IT 東京都") == 3
+            assert manager.add_scored_leads(make_leads(3), "IT 東京都") == 0
+            assert manager.get_history_count() == 3
+
+    def test_thread_connections_closed_on_exit(self, tmp_path):
+        """終了したスレッドの接続が閉じられ、保持されなくなることのテスト"""
+        with HistoryManager(tmp_path / "history.db") as manager:
+            manager._connection()
+            connections = []
+
+            def request():
+                connections.append(manager._connection())
+                manager.get_history_count()
+
+            for _ in range(20):
+                thread = threading.Thread(target=request)
+                thread.start()
+                thread.join()
+            gc.collect()
+
+            assert len(manager._connections) == 1
+            with pytest.raises(sqlite3.ProgrammingError):
+                connections[0].execute("SELECT 1")
+
+    def test_reads_not_blocked_by_writer(self, tmp_path):
+        """書き込み中のトランザクションがあっても読み込みがブロックされないことのテスト"""
+        db_path = tmp_path / "history.db"
+        with HistoryManager(db_path) as manager:
+            manager.add_scored_leads(make_leads(5), "IT 東京都")
+
+            # 別プロセスのジョブを想定した未コミットの書き込み
+            writer = sqlite3.connect(db_path, timeout=0)
+            writer.execute("BEGIN IMMEDIATE")
+            writer.execute("DELETE FROM company_history")
+
+            assert manager.get_history_count() == 5
+            assert len(manager.get_history(limit=10)) == 5
+            assert manager.get_statistics()['total_count'] == 5
+
+            writer.rollback()
+            writer.close()
+
+    def test_filter_new_companies_in_sql(self, tmp_path):
+        """候補のURL・ドメインのみをSQLで照合するフィルタリングのテスト"""
+        with HistoryManager(tmp_path / "history.db") as manager:
+            manager.add_scored_leads(make_leads(100), "IT 東京都")
+
+            candidates = [
+                CompanyInfo(company_name="known url", url="https://www.company-1.co.jp/"),
+                CompanyInfo(company_name="known domain", url="https://company-2.co.jp/contact"),
+                CompanyInfo(company_name="new", url="https://www.new-company.co.jp/")
+            ]
+
+            known_urls, known_domains = manager.find_known(
+                [c.url for c in candidates], [manager._extract_domain(c.url) for c in candidates]
+            )
+            assert known_urls == {"https://www.company-1.co.jp/"}
+            assert known_domains == {"company-1.co.jp", "company-2.co.jp"}
+
+            new_companies = manager.filter_new_companies(candidates)
+            assert [c.company_name for c in new_companies] == ["new"]
+            assert manager.find_known([], []) == (set(), set())
+
+    def test_bloom_filter_prunes_search_results(self, tmp_path):
+        """ブルームフィルタによる検索結果の除外と、保存・削除時の再構築のテスト"""
+        db_path = tmp_path / "history.db"
+        results = [
+            SearchResult(title=f"r{i}", url=url, snippet="", search_engine="serpapi", position=i)
+            for i, url in enumerate([
+                "https://www.company-1.co.jp/",
+                "https://company-2.co.jp/recruit",
+                "https://www.unknown.co.jp/"
+            ])
+        ]
+
+        with HistoryManager(db_path) as manager:
+            manager.add_scored_leads(make_leads(50), "IT 東京都")
+            assert "company-2.co.jp" in manager._bloom
+            assert [r.url for r in manager.filter_new_search_results(results)] == ["https://www.unknown.co.jp/"]
+
+        assert manager.bloom_path.exists()
+
+        # 保存済みのフィルタから起動し、他の接続で追加された行も反映される
+        with sqlite3.connect(db_path) as conn:
+            conn.execute(
+                "INSERT INTO company_history (company_name, url, domain) VALUES (?, ?, ?)",
+                ("unknown", "https://www.unknown.co.jp/", "unknown.co.jp")
+            )
+
+        with HistoryManager(db_path) as manager:
+            assert manager.filter_new_search_results(results) == []
+
+            # 削除後は作り直され、再び新規として扱われる
+            assert manager.delete_by_domain("company-1.co.jp") == 1
+            assert [r.url for r in manager.filter_new_search_results(results)] == ["https://www.company-1.co.jp/"]
+
+            manager.clear_all()
+            assert "unknown.co.jp" not in manager._bloom
+
+    def test_bloom_filter_saved_on_interval_and_close(self, tmp_path):
+        """ブルームフィルタの保存がバッチごとではなく、間隔経過時と終了時に行われることのテスト"""
+        manager = HistoryManager(tmp_path / "history.db")
+        assert BloomFilter.load(manager.bloom_path)[1] == 0
+
+        manager.add_scored_leads(make_leads(3), "IT 東京都")
+        manager.add_scored_leads(make_leads(6), "IT 東京都")
+        assert BloomFilter.load(manager.bloom_path)[1] == 0
+
+        max_id = manager._bloom_max_id
+        assert max_id > 0
+        manager.close()
+        assert BloomFilter.load(manager.bloom_path)[1] == max_id
+
+    def test_bloom_filter_rebuilt_with_headroom(self, tmp_path, monkeypatch):
+        """作り直したフィルタに余裕があり、同じドメインが要素数に数えられないことのテスト"""
+        monkeypatch.setattr('history_manager.BLOOM_MIN_CAPACITY', 10)
+        companies = [
+            CompanyInfo(company_name=f"page-{i}", url=f"https://same.co.jp/page-{i}", industry="IT")
+            for i in range(20)
+        ]
+
+        with HistoryManager(tmp_path / "history.db") as manager:
+            manager.add_companies(companies)
+            manager._rebuild_known_filter()
+            assert manager._bloom.count <= 21
+            assert manager._bloom.capacity == 80
+
+            rebuilds = []
+            monkeypatch.setattr(manager, '_rebuild_known_filter', lambda: rebuilds.append(1))
+            for i in range(5):
+                manager.add_companies([CompanyInfo(company_name=f"new-{i}", url=f"https://new-{i}.co.jp/", industry="IT")])
+            assert rebuilds == []
+
+    def test_bloom_filter_save_failure_is_not_fatal(self, tmp_path, monkeypatch):
+        """フィルタの保存に失敗しても履歴の追加・照会が続けられることのテスト"""
+        with HistoryManager(tmp_path / "history.db") as manager:
+            def fail(*args, **kwargs):
+                raise FileNotFoundError("replaced by another process")
+
+            monkeypatch.setattr(BloomFilter, 'save', fail)
+            manager._bloom_saved_at = 0.0
+            assert manager.add_scored_leads(make_leads(3), "IT 東京都") == 3
+            assert manager.find_known(["https://www.company-1.co.jp/"], []) == ({"https://www.company-1.co.jp/"}, set())
+            assert manager._bloom_dirty
+            monkeypatch.undo()
+
+        # 保存ごとに一意の一時ファイルを使い、置き換え後に残さない
+        assert [path.name for path in tmp_path.iterdir() if path.suffix == '.tmp'] == []
+
+    def test_bulk_insert_counts_exactly(self, tmp_path):
+        """一括挿入の追加件数が既存行・重複を除いて正確であることのテスト"""
+        companies = [
+            CompanyInfo(company_name=f"company-{i}", url=f"https://company-{i}.co.jp/", industry="IT")
+            for i in range(20000)
+        ]
+
+        with HistoryManager(tmp_path / "history.db") as manager:
+            assert manager.add_companies(companies[:10]) == 10
+            assert manager.add_companies(companies[:10]) == 0
+            assert manager.add_companies(companies[5:15] + companies[5:15]) == 5
+            assert manager.add_companies(companies) == 19985
+            assert manager.get_history_count() == 20000
+            assert manager.add_scored_leads(make_leads(3, prefix="scored")) == 3
+
+            row = manager.search_history("scored-1")[0]
+            assert row['total_score'] == 6.0
+            assert row['industry_match_score'] == 2.0
+            assert row['contact_info_score'] == 0
+
+    def test_full_text_search(self, tmp_path):
+        """FTS5（trigram）による関連度順・ページング検索と、短い語のLIKE検索のテスト"""
+        companies = [
+            CompanyInfo(company_name="株式会社東京システム開発", url="https://tokyo-sys.co.jp/", industry="IT", location="東京都"),
+            CompanyInfo(company_name="大阪物流", url="https://osaka-logi.co.jp/", industry="物流", location="大阪府"),
+            CompanyInfo(company_name="横浜フーズ", url="https://yokohama-foods.co.jp/", industry="飲食", location="東京都"),
+        ] + [
+            CompanyInfo(company_name=f"システム商事{i}", url=f"https://shoji-{i}.co.jp/", industry="商社", location="京都府")
+            for i in range(30)
+        ]
+
+        with HistoryManager(tmp_path / "history.db") as manager:
+            assert manager.fts_enabled
+            manager.add_companies(companies)
+
+            assert [r['company_name'] for r in manager.search_history("東京システム")] == ["株式会社東京システム開発"]
+            assert manager.get_search_count("システム") == 31
+            assert len(manager.search_history("システム", limit=10, offset=25)) == 6
+            assert manager.get_search_count("システム 東京都") == 1
+            assert manager.get_search_count("osaka-logi") == 1
+
+            # 3文字未満の語はLIKE検索
+            assert manager.get_search_count("東京") == 2
+            assert manager.get_search_count("50%") == 0
+
+            # トリガーで削除が索引に反映される
+            manager.delete_by_url("https://tokyo-sys.co.jp/")
+            assert manager.search_history("東京システム") == []
+
+    def test_fts_index_built_for_existing_db(self, tmp_path):
+        """FTS・集計導入前の既存DBを開いたときに既存行が索引・集計に反映されるテスト"""
+        db_path = tmp_path / "history.db"
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("""
+                CREATE TABLE company_history (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    company_name TEXT NOT NULL,
+                    url TEXT NOT NULL UNIQUE,
+                    domain TEXT NOT NULL,
+                    location TEXT,
+                    industry TEXT,
+                    contact_email TEXT,
+                    phone TEXT,
+                    search_query TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    metadata TEXT
+                )
+            """)
+            conn.execute(
+                "INSERT INTO company_history (company_name, url, domain) VALUES (?, ?, ?)",
+                ("株式会社レガシー工業", "https://legacy.co.jp/", "legacy.co.jp")
+            )
+        conn.close()
+
+        with HistoryManager(db_path) as manager:
+            assert manager.get_search_count("レガシー") == 1
+            assert manager.get_statistics()['total_count'] == 1
+
+    def test_keyset_pagination(self, tmp_path):
+        """(created_at, id) のカーソルで全件を重複・欠落なく辿れることのテスト"""
+        with HistoryManager(tmp_path / "history.db") as manager:
+            manager.add_scored_leads(make_leads(45), "IT 東京都")
+
+            urls = []
+            cursor = None
+            pages = 0
+            while True:
+                page = manager.get_history_page(limit=20, cursor=cursor)
+                urls.extend(item['url'] for item in page['data'])
+                pages += 1
+                cursor = page['next_cursor']
+                if cursor is None:
+                    break
+
+            assert pages == 3
+            assert len(urls) == len(set(urls)) == 45
+            assert urls == [item['url'] for item in manager.get_history(limit=45)]
+
+            with pytest.raises(ValueError):
+                manager.get_history_page(cursor="invalid")
+
+    def test_statistics_from_aggregates(self, tmp_path):
+        """集計テーブルが挿入・更新・削除に追従することのテスト"""
+        companies = [
+            CompanyInfo(company_name=f"c{i}", url=f"https://c{i}.co.jp/",
+                        industry="IT" if i % 3 else "製造業", location="東京都" if i % 2 else "")
+            for i in range(12)
+        ]
+
+        with HistoryManager(tmp_path / "history.db") as manager:
+            manager.add_companies(companies)
+            stats = manager.get_statistics()
+            assert stats['total_count'] == 12
+            assert stats['top_industries'] == [{'industry': 'IT', 'count': 8}, {'industry': '製造業', 'count': 4}]
+            assert stats['top_locations'] == [{'location': '東京都', 'count': 6}]
+
+            with manager._connection() as conn:
+                conn.execute("UPDATE company_history SET industry = '小売' WHERE url = 'https://c0.co.jp/'")
+            manager.delete_by_domain("c1.co.jp")
+
+            stats = manager.get_statistics()
+            assert stats['total_count'] == manager.get_history_count() == 11
+            assert {'industry': '小売', 'count': 1} in stats['top_industries']
+            assert stats['top_locations'] == [{'location': '東京都', 'count': 5}]
+
+            manager.clear_all()
+            stats = manager.get_statistics()
+            assert stats['total_count'] == 0
+            assert stats['top_industries'] == []
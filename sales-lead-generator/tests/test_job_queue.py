@@ -0,0 +1,289 @@
+"""
+ジョブキュー・ワーカーのテストファイル
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from config.config import config
+from job_queue import JobQueue
+from job_worker import JobWorker
+
+PARAMS = {'industry': 'IT', 'location': '東京都', 'keywords': [], 'max_results': 10}
+
+class TestJobQueue:
+
+    def test_priority_and_per_user_limit(self, tmp_path):
+        """優先度順の取得とユーザーごとの同時実行数制限のテスト"""
+        queue = JobQueue(tmp_path / "jobs.db")
+        low = queue.enqueue(PARAMS, user_id='alice', priority=0)
+        high = queue.enqueue(PARAMS, user_id='alice', priority=5)
+        other = queue.enqueue(PARAMS, user_id='bob', priority=0)
+
+        assert queue.claim_next('w1', per_user_limit=1)['job_id'] == high
+        # alice は実行中のジョブがあるため bob のジョブが先に実行される
+        assert queue.claim_next('w2', per_user_limit=1)['job_id'] == other
+        assert queue.claim_next('w3', per_user_limit=1) is None
+
+        queue.complete(high, {'success': True, 'leads_count': 1})
+        assert queue.claim_next('w1', per_user_limit=1)['job_id'] == low
+        assert queue.get_result(high) == {'success': True, 'leads_count': 1}
+        assert queue.get(high)['status'] == 'completed'
+
+    def test_cancel_and_stale_recovery(self, tmp_path):
+        """キャンセルと、停止したワーカーのジョブの再投入のテスト"""
+        queue = JobQueue(tmp_path / "jobs.db")
+        queued = queue.enqueue(PARAMS)
+        running = queue.enqueue(PARAMS, user_id='other')
+
+        assert queue.cancel(queued)
+        assert queue.get(queued)['status'] == 'cancelled'
+        assert not queue.cancel(queued)
+
+        assert queue.claim_next('w1')['job_id'] == running
+        assert queue.cancel(running)
+        assert queue.get(running)['cancel_requested']
+        assert queue.heartbeat(running)
+
+        # 別のDB接続（再起動後のプロセス）から見ても状態は保持されている
+        restarted = JobQueue(tmp_path / "jobs.db")
+        job = restarted.enqueue(PARAMS, user_id='third')
+        restarted.claim_next('w2')
+        assert restarted.requeue_stale(stale_timeout=-1, max_attempts=2) == 2
+        # キャンセル要求済みのジョブはエラーではなくキャンセル済みにする
+        assert restarted.get(running)['status'] == 'cancelled'
+        assert restarted.get(job)['status'] == 'queued'
+
+        # 試行回数が上限に達したジョブはエラーにする
+        restarted.claim_next('w2')
+        assert restarted.requeue_stale(stale_timeout=-1, max_attempts=2) == 1
+        assert restarted.get(job)['status'] == 'error'
+
+    def test_requeued_job_owned_by_new_worker(self, tmp_path):
+        """再投入されたジョブに元のワーカーが書き込めないことのテスト"""
+        queue = JobQueue(tmp_path / "jobs.db")
+        job_id = queue.enqueue(PARAMS)
+        queue.claim_next('w1')
+
+        # w1 のハートビートが途絶えたとみなされ、w2 が実行を引き継ぐ
+        assert queue.requeue_stale(stale_timeout=-1) == 1
+        assert queue.claim_next('w2')['job_id'] == job_id
+
+        assert queue.heartbeat(job_id, worker_id='w1')
+        assert not queue.heartbeat(job_id, worker_id='w2')
+        assert not queue.complete(job_id, {'success': True, 'leads_count': 1}, worker_id='w1')
+        assert not queue.mark_cancelled(job_id, worker_id='w1')
+        assert queue.get(job_id)['status'] == 'running'
+
+        assert queue.complete(job_id, {'success': True, 'leads_count': 2}, worker_id='w2')
+        assert queue.get_result(job_id)['leads_count'] == 2
+
+    def test_retry_failed_job(self, tmp_path):
+        """エラーになったジョブだけを再投入できるテスト"""
+        queue = JobQueue(tmp_path / "jobs.db")
+        job_id = queue.enqueue(PARAMS)
+        queue.claim_next('w1')
+        assert queue.retry(job_id) is False  # 実行中は再投入しない
+
+        queue.fail(job_id, 'enhancement failed')
+        assert queue.retry(job_id) is True
+
+        job = queue.get(job_id)
+        assert job['status'] == 'queued'
+        assert job['error'] is None
+        assert queue.claim_next('w2')['job_id'] == job_id
+
+    def test_updates_follow_seq(self, tmp_path):
+        """seq による更新の差分取得のテスト"""
+        queue = JobQueue(tmp_path / "jobs.db")
+        first = queue.enqueue(PARAMS)
+        seq = queue.latest_seq()
+
+        second = queue.enqueue(PARAMS, user_id='other')
+        queue.claim_next('w1')
+        queue.update_progress(first, 50, '処理中')
+
+        jobs, last_seq = queue.get_updates(seq)
+        assert [job['job_id'] for job in jobs] == [second, first]
+        assert jobs[-1]['progress'] == 50
+        assert queue.get_updates(last_seq) == ([], last_seq)
+
+    def test_leads_are_stored_and_paginated(self, tmp_path):
+        """結果のリードが1行ずつ保存され、並び替え・絞り込み・ページングできるテスト"""
+        queue = JobQueue(tmp_path / "jobs.db")
+        job_id = queue.enqueue(PARAMS)
+        queue.claim_next('w1')
+
+        leads = [
+            {
+                'company_name': f'会社{i:03d}',
+                'url': f'https://company{i}.example.com',
+                'industry': 'IT' if i % 2 else '製造業',
+                'total_score': i / 10,
+                'is_wordpress': i % 3 == 0
+            }
+            for i in range(120)
+        ]
+        queue.complete(job_id, {'success': True, 'leads_count': len(leads), 'leads': leads})
+
+        # 結果本体にはリードを含めない
+        assert 'leads' not in queue.get_result(job_id)
+
+        page = queue.get_leads(job_id, limit=50, offset=0)
+        assert page['total'] == 120
+        assert len(page['data']) == 50
+        assert page['data'][0]['company_name'] == '会社119'
+
+        last_page = queue.get_leads(job_id, limit=50, offset=100)
+        assert len(last_page['data']) == 20
+
+        high = queue.get_leads(job_id, priority='high', sort='score_asc')
+        assert high['total'] == 40
+        assert high['data'][0]['total_score'] == 8.0
+
+        filtered = queue.get_leads(job_id, industry='IT', is_wordpress=True)
+        assert filtered['total'] == 20
+        assert all(lead['industry'] == 'IT' and lead['is_wordpress'] for lead in filtered['data'])
+
+        assert queue.get_lead_industries(job_id) == ['IT', '製造業']
+
+        # ダウンロード用の逐次取得は全件を順位順に返す
+        assert [lead['company_name'] for lead in queue.iter_leads(job_id, batch_size=50)] == \
+            [lead['company_name'] for lead in leads]
+
+        with pytest.raises(ValueError):
+            queue.get_leads(job_id, sort='total_score; DROP TABLE jobs')
+
+class TestJobWorker:
+
+    @pytest.mark.asyncio
+    async def test_run_jobs(self, tmp_path):
+        """ワーカーによる実行・失敗の記録と生成器の共有のテスト"""
+        queue = JobQueue(tmp_path / "jobs.db")
+        ok = queue.enqueue(PARAMS)
+        ng = queue.enqueue(PARAMS)
+
+        generator = Mock()
+        generator.generate_leads = AsyncMock(side_effect=[
+            {'success': True, 'leads_count': 3},
+            {'success': False, 'error': 'No search results found'}
+        ])
+
+        factory = Mock(return_value=generator)
+        worker = JobWorker(queue, worker_id='w1', generator_factory=factory)
+        await worker.run(max_jobs=2)
+
+        # 生成器（とクライアント・HTTPセッション）はワーカー内で1回だけ作られ共有される
+        factory.assert_called_once()
+        assert factory.call_args.kwargs['scraper'].session is not None
+        assert queue.get(ok)['status'] == 'completed'
+        assert queue.get_result(ok)['leads_count'] == 3
+        assert queue.get(ng)['status'] == 'error'
+        assert queue.get(ng)['error'] == 'No search results found'
+
+    @pytest.mark.asyncio
+    async def test_cancel_running_job(self, tmp_path, monkeypatch):
+        """実行中のジョブがキャンセル要求で中断されるテスト"""
+        monkeypatch.setattr(config.jobs, 'heartbeat_interval', 0.01)
+        queue = JobQueue(tmp_path / "jobs.db")
+        job_id = queue.enqueue(PARAMS)
+
+        async def slow_generate(**kwargs):
+            await asyncio.sleep(10)
+
+        generator = Mock()
+        generator.generate_leads = slow_generate
+
+        worker = JobWorker(queue, worker_id='w1', generator_factory=lambda **kwargs: generator)
+        job = queue.claim_next('w1')
+        queue.cancel(job_id)
+        await asyncio.wait_for(worker.run_job(job), timeout=5)
+
+        assert queue.get(job_id)['status'] == 'cancelled'
+
+    @pytest.mark.asyncio
+    async def test_worker_stops_when_job_requeued(self, tmp_path, monkeypatch):
+        """再投入されて他のワーカーに引き継がれたジョブの実行を元のワーカーが中断するテスト"""
+        monkeypatch.setattr(config.jobs, 'heartbeat_interval', 0.01)
+        queue = JobQueue(tmp_path / "jobs.db")
+        job_id = queue.enqueue(PARAMS)
+
+        async def slow_generate(**kwargs):
+            queue.requeue_stale(stale_timeout=-1)
+            queue.claim_next('w2')
+            await asyncio.sleep(10)
+
+        generator = Mock()
+        generator.generate_leads = slow_generate
+
+        worker = JobWorker(queue, worker_id='w1', generator_factory=lambda **kwargs: generator)
+        job = queue.claim_next('w1')
+        await asyncio.wait_for(worker.run_job(job), timeout=5)
+
+        job = queue.get(job_id)
+        assert job['status'] == 'running'
+        assert job['worker_id'] == 'w2'
+
+    @pytest.mark.asyncio
+    async def test_progress_events_are_throttled(self, tmp_path, monkeypatch):
+        """進捗イベントが間引かれ、ステージの完了は必ず書き込まれるテスト"""
+        monkeypatch.setattr(config.jobs, 'progress_interval', 60.0)
+        queue = JobQueue(tmp_path / "jobs.db")
+        job_id = queue.enqueue(PARAMS)
+
+        async def generate(progress_callback=None, **kwargs):
+            for done in range(1, 101):
+                progress_callback({'stage': 'scrape', 'done': done, 'total': 100,
+                                   'progress': 20 + done * 30 // 100, 'message': f'ページを取得中 ({done}/100)'})
+            return {'success': True, 'leads_count': 0}
+
+        generator = Mock()
+        generator.generate_leads = generate
+        seq_before = queue.latest_seq()
+
+        worker = JobWorker(queue, worker_id='w1', generator_factory=lambda **kwargs: generator)
+        worker.generator = generator
+        job = queue.claim_next('w1')
+        writes = []
+        monkeypatch.setattr(queue, 'update_progress', lambda *args, **kwargs: writes.append((args, kwargs)))
+        await worker.run_job(job)
+
+        # 100件のイベントのうち、ステージの開始と完了の2回だけ書き込まれる
+        assert len(writes) == 2
+        assert writes[-1][0][1:] == (50, 'ページを取得中 (100/100)')
+        assert writes[-1][1]['stage'] == 'scrape'
+        assert queue.get(job_id)['status'] == 'completed'
+        assert queue.latest_seq() > seq_before
+
+    def test_stage_is_stored(self, tmp_path):
+        """進捗のステージが保存・取得されるテスト"""
+        queue = JobQueue(tmp_path / "jobs.db")
+        job_id = queue.enqueue(PARAMS)
+        queue.claim_next('w1')
+
+        queue.update_progress(job_id, 35, '企業情報を抽出中 (3/10)', stage='extract')
+
+        job = queue.get(job_id)
+        assert job['stage'] == 'extract'
+        assert job['progress'] == 35
+
+    def test_metric_totals_accumulate(self, tmp_path):
+        """ジョブの計測値が累計に加算されるテスト"""
+        queue = JobQueue(tmp_path / "jobs.db")
+        job_metrics = {
+            'counters': {'http_requests_total': [{'labels': {'component': 'scrape', 'status': '200'}, 'value': 3}]},
+            'histograms': {}
+        }
+
+        queue.record_metrics(job_metrics)
+        queue.record_metrics(job_metrics)
+        queue.record_metrics(None)
+
+        assert queue.metric_totals() == [('http_requests_total', {'component': 'scrape', 'status': '200'}, 6)]
+        queue.enqueue(PARAMS)
+        assert queue.status_counts() == {'queued': 1}
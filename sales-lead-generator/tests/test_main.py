@@ -4,6 +4,7 @@
 
 import pytest
 import asyncio
+import sqlite3
 from unittest.mock import Mock, patch, AsyncMock
 
 import sys
@@ -11,13 +12,20 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from main import SalesLeadGenerator
+from history_manager import HistoryManager
+from checkpoint_store import CheckpointStore
 from models import SearchQuery, SearchResult, CompanyInfo, BusinessSize, ScoredLead
 
 class TestSalesLeadGenerator:
 
     @pytest.fixture
-    def generator(self):
-        return SalesLeadGenerator()
+    def generator(self, tmp_path):
+        generator = SalesLeadGenerator()
+        # 実行ごとに空の履歴DBを使う（前回の実行結果で新規企業が除外されないように）
+        generator.history_manager = HistoryManager(tmp_path / "history.db")
+        generator.checkpoint_store = CheckpointStore(tmp_path / "checkpoints.db")
+        yield generator
+        generator.history_manager.close()
 
     @pytest.fixture
     def sample_search_query(self):
@@ -93,8 +101,7 @@ class TestSalesLeadGenerator:
         with patch.object(generator.search_engine, 'search', new_callable=AsyncMock) as mock_search, \
              patch.object(generator.claude_extractor, 'extract_company_info_batch', new_callable=AsyncMock) as mock_extract, \
              patch.object(generator.data_enhancer, 'enhance_companies', new_callable=AsyncMock) as mock_enhance, \
-             patch.object(generator.exporter, 'export_to_csv', new_callable=AsyncMock) as mock_export_csv, \
-             patch.object(generator.exporter, 'export_to_excel', new_callable=AsyncMock) as mock_export_excel:
+             patch.object(generator.exporter, 'export_formats', new_callable=AsyncMock) as mock_export:
 
             # モックの戻り値設定
             mock_search.return_value = [
@@ -110,8 +117,7 @@ class TestSalesLeadGenerator:
 
             mock_extract.return_value = [sample_company]
             mock_enhance.return_value = [sample_company]
-            mock_export_csv.return_value = "test.csv"
-            mock_export_excel.return_value = "test.xlsx"
+            mock_export.return_value = {"csv": "test.csv", "excel": "test.xlsx"}
 
             # WebScraper のモック
             with patch('main.WebScraper') as mock_scraper_class:
@@ -132,6 +138,209 @@ class TestSalesLeadGenerator:
                 assert result["leads_count"] == 1
                 assert "statistics" in result
                 assert "export_results" in result
+                assert list(result["metrics"]["stages"]) == ["search", "scrape", "extract", "enhance", "score",
+                                                             "history", "export"]
+
+    @pytest.mark.asyncio
+    async def test_generate_leads_reports_stage_progress(self, generator):
+        """各ステージの進捗イベントが順に通知されるテスト"""
+        sample_company = CompanyInfo(company_name="Test Company", url="https://test.com", industry="IT")
+
+        async def extract(scraped_data, progress_callback=None):
+            progress_callback(1, 1)
+            return [sample_company]
+
+        async def enhance(companies, progress_callback=None):
+            progress_callback(1, 1)
+            return companies
+
+        with patch.object(generator.search_engine, 'search', new_callable=AsyncMock) as mock_search, \
+             patch.object(generator.claude_extractor, 'extract_company_info_batch', side_effect=extract), \
+             patch.object(generator.data_enhancer, 'enhance_companies', side_effect=enhance), \
+             patch.object(generator.exporter, 'export_formats', new_callable=AsyncMock) as mock_export, \
+             patch('main.WebScraper') as mock_scraper_class:
+
+            mock_search.return_value = [
+                SearchResult("Test Company", "https://test.com", "Test snippet", "google_custom", 1)
+            ]
+            mock_export.return_value = {"csv": "test.csv"}
+
+            async def scrape(results, progress_callback=None):
+                progress_callback(1, 1)
+                return [{"url": "https://test.com", "content": "test content"}]
+
+            mock_scraper = AsyncMock()
+            mock_scraper.scrape_urls.side_effect = scrape
+            mock_scraper_class.return_value.__aenter__.return_value = mock_scraper
+
+            events = []
+            result = await generator.generate_leads(
+                industry="IT",
+                location="東京都",
+                max_results=1,
+                export_formats=["csv"],
+                progress_callback=events.append
+            )
+
+        assert result["success"] is True
+        stages = list(dict.fromkeys(event['stage'] for event in events))
+        assert stages == ['search', 'scrape', 'extract', 'enhance', 'score', 'export']
+        # 全体の進捗率は単調増加
+        progresses = [event['progress'] for event in events]
+        assert progresses == sorted(progresses)
+        assert events[-1]['message'] == 'エクスポート中 (1/1)'
+
+    @pytest.mark.asyncio
+    async def test_resume_skips_completed_stages(self, generator):
+        """後段で失敗したジョブを再開すると、完了済みのステージ（Claude抽出など）を省略するテスト"""
+        sample_company = CompanyInfo(company_name="Test Company", url="https://test.com", industry="IT")
+
+        with patch.object(generator.search_engine, 'search', new_callable=AsyncMock) as mock_search, \
+             patch.object(generator.claude_extractor, 'extract_company_info_batch', new_callable=AsyncMock) as mock_extract, \
+             patch.object(generator.data_enhancer, 'enhance_companies', new_callable=AsyncMock) as mock_enhance, \
+             patch.object(generator.exporter, 'export_formats', new_callable=AsyncMock) as mock_export, \
+             patch('main.WebScraper') as mock_scraper_class:
+
+            mock_search.return_value = [
+                SearchResult("Test Company", "https://test.com", "Test snippet", "google_custom", 1)
+            ]
+            mock_scraper = AsyncMock()
+            mock_scraper.scrape_urls.return_value = [{"url": "https://test.com", "content": "x" * 10000}]
+            mock_scraper_class.return_value.__aenter__.return_value = mock_scraper
+            mock_extract.return_value = [sample_company]
+            mock_enhance.side_effect = RuntimeError("enhancement failed")
+            mock_export.return_value = {"csv": "test.csv"}
+
+            result = await generator.generate_leads(industry="IT", location="東京都", max_results=1,
+                                                    export_formats=["csv"], job_id="job_resume", checkpoint=True)
+            assert result["success"] is False
+            assert generator.checkpoint_store.stages("job_resume") == ['params', 'search', 'scrape', 'extract']
+            # スクレイピング結果は抽出に使う長さだけ保存する
+            assert len(generator.checkpoint_store.load("job_resume", "scrape")[0]["content"]) == 3000
+
+            search_calls = mock_search.await_count
+            mock_enhance.side_effect = None
+            mock_enhance.return_value = [sample_company]
+            result = await generator.generate_leads(industry="IT", location="東京都", max_results=1,
+                                                    export_formats=["csv"], job_id="job_resume", checkpoint=True)
+
+            assert result["success"] is True
+            assert result["leads_count"] == 1
+            assert mock_search.await_count == search_calls
+            mock_scraper.scrape_urls.assert_awaited_once()
+            mock_extract.assert_awaited_once()
+            assert mock_enhance.await_count == 2
+            # 完了したジョブのチェックポイントは削除される
+            assert generator.checkpoint_store.stages("job_resume") == []
+
+    @pytest.mark.asyncio
+    async def test_checkpoints_only_when_requested_and_not_empty(self, generator):
+        """チェックポイントは指定時のみ保存され、空のステージ結果は完了扱いにしないテスト"""
+        with patch.object(generator.search_engine, 'search', new_callable=AsyncMock) as mock_search, \
+             patch('main.WebScraper') as mock_scraper_class:
+
+            mock_search.return_value = [
+                SearchResult("Test Company", "https://test.com", "Test snippet", "google_custom", 1)
+            ]
+            mock_scraper = AsyncMock()
+            mock_scraper.scrape_urls.return_value = []
+            mock_scraper_class.return_value.__aenter__.return_value = mock_scraper
+
+            result = await generator.generate_leads(industry="IT", location="東京都", max_results=1, job_id="job_plain")
+            assert result["success"] is False
+            assert generator.checkpoint_store.stages("job_plain") == []
+
+            for _ in range(2):
+                result = await generator.generate_leads(industry="IT", location="東京都", max_results=1,
+                                                        job_id="job_empty", checkpoint=True)
+                assert result["error"] == "No data could be scraped"
+
+            # 空のスクレイピング結果は保存されず、再開時はスクレイピングをやり直す
+            assert generator.checkpoint_store.stages("job_empty") == ['params', 'search']
+            assert mock_scraper.scrape_urls.await_count == 3
+
+    def test_prune_old_checkpoints(self, generator):
+        """期限切れのジョブのチェックポイントだけが削除されるテスト"""
+        store = generator.checkpoint_store
+        store.save("job_old", "params", {"industry": "IT"})
+        store.save("job_new", "params", {"industry": "IT"})
+
+        conn = sqlite3.connect(store.db_path)
+        with conn:
+            conn.execute("UPDATE checkpoints SET created_at = '2000-01-01T00:00:00' WHERE job_id = 'job_old'")
+        conn.close()
+
+        assert store.prune() == 1
+        assert store.stages("job_old") == []
+        assert store.stages("job_new") == ['params']
+
+    @pytest.mark.asyncio
+    async def test_history_prefilter_before_scraping(self, generator):
+        """履歴にある企業をスクレイピング前に除外し、不足分を次ページから補うテスト"""
+        generator.history_manager.add_companies(
+            [CompanyInfo(company_name=f"Known {i}", url=f"https://known-{i}.com") for i in range(5)]
+        )
+        generator._build_search_queries = Mock(return_value=[SearchQuery("IT", "東京都", [])])
+
+        pages = {
+            0: [SearchResult(f"Known {i}", f"https://known-{i}.com", "", "serpapi", i) for i in range(5)]
+               + [SearchResult("New 0", "https://new-0.com", "", "serpapi", 6)],
+            1: [SearchResult(f"New {i}", f"https://new-{i}.com", "", "serpapi", i) for i in range(1, 4)],
+        }
+
+        async def search(query, page=0):
+            return pages.get(page, [])
+
+        with patch.object(generator.search_engine, 'search', side_effect=search) as mock_search, \
+             patch.object(generator.claude_extractor, 'extract_company_info_batch', new_callable=AsyncMock) as mock_extract, \
+             patch('main.WebScraper') as mock_scraper_class:
+            mock_extract.return_value = []
+            mock_scraper = AsyncMock()
+            mock_scraper.scrape_urls.return_value = [{"url": "https://new-0.com", "content": "test"}]
+            mock_scraper_class.return_value.__aenter__.return_value = mock_scraper
+
+            await generator.generate_leads(industry="IT", location="東京都", max_results=3)
+
+            scraped_urls = [result.url for result in mock_scraper.scrape_urls.call_args[0][0]]
+            assert scraped_urls == ["https://new-0.com", "https://new-1.com", "https://new-2.com"]
+            assert mock_search.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_claimed_domains_shared_between_concurrent_runs(self, generator):
+        """同時に実行する条件どうしで同じ企業を重複して取得せず、取得しない企業は登録を解除するテスト"""
+        from progress import ProgressReporter
+
+        async def search(query, page=0):
+            await asyncio.sleep(0)
+            if page:
+                return []
+            return [
+                SearchResult("Common", "https://www.common.com/", "", "serpapi", 1),
+                SearchResult(f"{query.location} 1", f"https://{query.location}-1.com", "", "serpapi", 2),
+                SearchResult(f"{query.location} 2", f"https://{query.location}-2.com", "", "serpapi", 3),
+                SearchResult(f"{query.location} 3", f"https://{query.location}-3.com", "", "serpapi", 4),
+            ]
+
+        claimed = set()
+        with patch.object(generator.search_engine, 'search', side_effect=search):
+            (tokyo, _), (osaka, _) = await asyncio.gather(*[
+                generator._search_new_results([SearchQuery("IT", location, [])], 3, False,
+                                              ProgressReporter(None), claimed)
+                for location in ("tokyo", "osaka")
+            ])
+
+        assert [r.url for r in tokyo] == ["https://www.common.com/", "https://tokyo-1.com", "https://tokyo-2.com"]
+        assert [r.url for r in osaka] == ["https://osaka-1.com", "https://osaka-2.com", "https://osaka-3.com"]
+        # 件数の上限で取得しなかった企業は他の条件が取得できる
+        assert claimed == {"common.com", "tokyo-1.com", "tokyo-2.com", "osaka-1.com", "osaka-2.com", "osaka-3.com"}
+
+    def test_shared_clients(self):
+        """共有の WebScraper と Claude クライアントが各処理に引き継がれるテスト"""
+        scraper = Mock()
+        generator = SalesLeadGenerator(scraper=scraper)
+
+        assert generator.data_enhancer.scraper is scraper
+        assert generator.data_enhancer.claude_extractor is generator.claude_extractor
 
     @pytest.mark.asyncio
     async def test_generate_leads_no_search_results(self, generator):
@@ -0,0 +1,113 @@
+"""
+計測値のテストファイル
+"""
+
+import asyncio
+import json
+import pytest
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import metrics
+from metrics import MetricsCollector, aggregate_samples, render_prometheus
+
+class TestMetricsCollector:
+
+    def test_summary_and_histograms(self):
+        """カウンタ・ヒストグラム・キャッシュヒット率の要約テスト"""
+        collector = MetricsCollector('job_1')
+        for latency in (0.02, 0.2, 0.3, 3.0):
+            collector.observe('scrape_latency_seconds', latency, host='a.example.com')
+        collector.inc('http_requests_total', 4, component='scrape', status=200)
+        collector.inc('http_response_bytes_total', 2048, component='scrape')
+        collector.observe('llm_tokens_per_request', 1200, operation='extract', type='input')
+        collector.observe('llm_tokens_per_request', 300, operation='extract', type='output')
+        collector.inc('cache_requests_total', 3, cache='history_bloom', result='hit')
+        collector.inc('cache_requests_total', 1, cache='history_bloom', result='miss')
+        with collector.stage('search'):
+            pass
+
+        data = collector.to_dict()
+
+        assert set(data['stages']) == {'search'}
+        assert data['summary'] == {
+            'http_requests': 4,
+            'http_response_bytes': 2048,
+            'llm_requests': 0,
+            'llm_input_tokens': 1200,
+            'llm_output_tokens': 300,
+            'cache_hit_rates': {'history_bloom': 0.75}
+        }
+        latency = data['histograms']['scrape_latency_seconds'][0]
+        assert latency['labels'] == {'host': 'a.example.com'}
+        assert latency['count'] == 4
+        assert latency['p50'] == 0.2
+        assert latency['max'] == 3.0
+        assert latency['buckets']['0.25'] == 2
+        assert latency['buckets']['30'] == 4
+
+        # JSONにそのまま保存できる
+        json.dumps(data)
+
+    def test_trace_file(self, tmp_path):
+        """トレースファイルにステージ・リクエストの区間が記録されるテスト"""
+        collector = MetricsCollector('job_1')
+        with collector.stage('scrape'):
+            with collector.timer('scrape_latency_seconds', host='a.example.com'):
+                pass
+
+        path = tmp_path / "trace" / "job_1.json"
+        collector.write_trace(path, {'success': True})
+
+        trace = json.loads(path.read_text(encoding='utf-8'))
+        assert trace['job_id'] == 'job_1'
+        assert trace['success'] is True
+        assert [span['name'] for span in trace['spans']] == ['stage_duration_seconds', 'scrape_latency_seconds']
+        assert trace['spans'][0]['labels'] == {'stage': 'scrape'}
+
+    @pytest.mark.asyncio
+    async def test_collectors_are_isolated_per_task(self):
+        """並行する生成処理の計測値が混ざらず、計測外の記録は無視されるテスト"""
+        async def job(job_id, requests):
+            with metrics.collect(job_id) as collector:
+                await asyncio.gather(*[record() for _ in range(requests)])
+            return collector
+
+        async def record():
+            await asyncio.sleep(0)
+            metrics.inc('http_requests_total', component='scrape', status=200)
+
+        first, second = await asyncio.gather(job('a', 2), job('b', 5))
+        metrics.inc('http_requests_total', component='scrape', status=200)
+
+        assert first.to_dict()['summary']['http_requests'] == 2
+        assert second.to_dict()['summary']['http_requests'] == 5
+        assert metrics.current() is None
+
+class TestPrometheus:
+
+    def test_aggregate_and_render(self):
+        """ジョブの計測値の合算とテキスト形式の出力テスト"""
+        collector = MetricsCollector()
+        collector.observe('scrape_latency_seconds', 0.2, host='a.example.com')
+        collector.observe('scrape_latency_seconds', 0.7, host='b.example.com')
+        collector.inc('http_requests_total', 2, component='scrape', status=200)
+
+        samples = aggregate_samples(collector.to_dict()) + aggregate_samples(collector.to_dict())
+        totals = {}
+        for name, labels, value in samples:
+            key = (name, tuple(sorted(labels.items())))
+            totals[key] = totals.get(key, 0) + value
+        text = render_prometheus([(name, dict(labels), value) for (name, labels), value in totals.items()],
+                                 gauges={'jobs': [({'status': 'completed'}, 3)]})
+
+        assert '# TYPE sales_leads_scrape_latency_seconds histogram' in text
+        # ホスト別のラベルは集計では落とす
+        assert 'sales_leads_scrape_latency_seconds_bucket{le="0.25"} 2' in text
+        assert 'sales_leads_scrape_latency_seconds_bucket{le="+Inf"} 4' in text
+        assert 'sales_leads_scrape_latency_seconds_count 4' in text
+        assert 'sales_leads_http_requests_total{component="scrape",status="200"} 4' in text
+        assert 'sales_leads_jobs{status="completed"} 3' in text
+        assert 'host=' not in text
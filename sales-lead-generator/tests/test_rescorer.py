@@ -0,0 +1,129 @@
+"""
+再スコアリングのテストファイル
+"""
+
+import pytest
+import sqlite3
+from dataclasses import replace
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from config.config import config
+from exporters import DataExporter
+from history_manager import HistoryManager
+from models import CompanyInfo, BusinessSize, ScoredLead
+from rescorer import LeadRescorer
+from scorer import calculate_total_score
+
+class TestLeadRescorer:
+
+    @pytest.fixture
+    def history_manager(self, tmp_path):
+        return HistoryManager(tmp_path / "history.db")
+
+    @pytest.fixture
+    def scored_leads(self):
+        leads = []
+        for i, industry_score in enumerate([5.0, 2.5, 0.0]):
+            scores = {
+                'industry_match': industry_score,
+                'business_size': 3.0,
+                'contact_info': 1.0,
+                'location_match': 3.0,
+                'domain_reputation': 0.6
+            }
+            leads.append(ScoredLead(
+                company=CompanyInfo(
+                    company_name=f"テスト株式会社{i}",
+                    url=f"https://example-{i}.co.jp",
+                    business_size=BusinessSize.MEDIUM
+                ),
+                total_score=calculate_total_score(scores, config.scoring),
+                scores=scores,
+                confidence=0.8
+            ))
+        return leads
+
+    def test_rescore_history_matches_scorer(self, history_manager, scored_leads):
+        """新しい重みでの再計算がスコアラーの計算と一致することのテスト"""
+        history_manager.add_scored_leads(scored_leads, "IT 東京都")
+
+        new_config = replace(config.scoring, industry_match_weight=1.0, location_match_weight=6.0)
+        stats = LeadRescorer(new_config).rescore_history(history_manager)
+
+        expected = sorted(calculate_total_score(lead.scores, new_config) for lead in scored_leads)
+        history = history_manager.get_history()
+        actual = sorted(item['total_score'] for item in history)
+
+        assert stats['total_leads'] == 3
+        assert actual == pytest.approx(expected)
+        assert stats['max_score'] == pytest.approx(max(expected))
+
+    def test_dry_run_does_not_update(self, history_manager, scored_leads):
+        """ドライランではDBが更新されないことのテスト"""
+        history_manager.add_scored_leads(scored_leads)
+        before = sorted(item['total_score'] for item in history_manager.get_history())
+
+        new_config = replace(config.scoring, industry_match_weight=0.0)
+        stats = LeadRescorer(new_config).rescore_history(history_manager, dry_run=True)
+
+        after = sorted(item['total_score'] for item in history_manager.get_history())
+        assert after == before
+        assert stats['high_priority_leads'] + stats['medium_priority_leads'] + stats['low_priority_leads'] == 3
+
+    def test_rejects_unknown_table(self, tmp_path):
+        """未対応テーブルの指定でエラーになることのテスト"""
+        with pytest.raises(ValueError):
+            LeadRescorer().rescore_database(str(tmp_path / "x.db"), table='users')
+
+    def test_priority_thresholds_shared_with_analyzer(self, history_manager, scored_leads, monkeypatch):
+        """新しいしきい値での優先度の集計がスコア分析と一致することのテスト"""
+        from scorer import ScoreAnalyzer
+
+        history_manager.add_scored_leads(scored_leads)
+        new_config = replace(config.scoring, high_priority_threshold=12.0, medium_priority_threshold=9.0)
+        monkeypatch.setattr(config, 'scoring', new_config)
+
+        stats = LeadRescorer(new_config).rescore_history(history_manager, dry_run=True)
+        analysis = ScoreAnalyzer.analyze_score_distribution(scored_leads)
+
+        for key in ('high_priority_leads', 'medium_priority_leads', 'low_priority_leads'):
+            assert stats[key] == analysis[key]
+        assert analysis['high_priority_leads'] == 1
+
+    @pytest.fixture
+    def export_db(self, tmp_path, scored_leads):
+        exporter = DataExporter()
+        exporter.config = replace(config.output, output_dir=str(tmp_path))
+        return exporter._write_sqlite((lead.to_dict() for lead in scored_leads), str(tmp_path / "export.db"))
+
+    def test_rescore_export_updates_stats(self, export_db):
+        """エクスポートの再スコアリングで export_stats の優先度別件数も更新されることのテスト"""
+        new_config = replace(config.scoring, high_priority_threshold=20.0, medium_priority_threshold=15.0)
+        stats = LeadRescorer(new_config).rescore_database(export_db)
+
+        with sqlite3.connect(export_db) as conn:
+            row = conn.execute(
+                "SELECT high_priority_leads, medium_priority_leads, low_priority_leads, average_score FROM export_stats"
+            ).fetchone()
+        assert stats['low_priority_leads'] == 3
+        assert row == (0, 0, 3, pytest.approx(stats['average_score']))
+
+    def test_missing_score_columns(self, export_db, scored_leads):
+        """サブスコア列の無い古いエクスポートは、値を指定しない限り再スコアリングしないテスト"""
+        with sqlite3.connect(export_db) as conn:
+            conn.execute("ALTER TABLE sales_leads DROP COLUMN domain_reputation_score")
+            before = conn.execute("SELECT total_score FROM sales_leads ORDER BY id").fetchall()
+
+        with pytest.raises(ValueError, match="domain_reputation_score"):
+            LeadRescorer().rescore_database(export_db)
+
+        with sqlite3.connect(export_db) as conn:
+            assert conn.execute("SELECT total_score FROM sales_leads ORDER BY id").fetchall() == before
+
+        LeadRescorer().rescore_database(export_db, missing_score=0.6)
+        with sqlite3.connect(export_db) as conn:
+            after = [row[0] for row in conn.execute("SELECT total_score FROM sales_leads ORDER BY id")]
+        assert after == pytest.approx([lead.total_score for lead in scored_leads])
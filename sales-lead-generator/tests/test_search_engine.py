@@ -0,0 +1,128 @@
+"""
+検索エンジンのテストファイル
+"""
+
+import asyncio
+import time
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from config.config import config
+from models import SearchQuery
+from search_engine import SearchEngine
+
+class TestSerpAPI:
+
+    @pytest.mark.asyncio
+    async def test_search_uses_configured_base_url(self, monkeypatch):
+        """SerpAPIのREST APIを設定した接続先に問い合わせるテスト"""
+        requests = []
+
+        async def search(request):
+            requests.append(dict(request.query))
+            start = int(request.query['start'])
+            return web.json_response({'organic_results': [
+                {'title': f'会社{start + i}', 'link': f'https://example{start + i}.co.jp', 'snippet': ''}
+                for i in range(3)
+            ]})
+
+        app = web.Application()
+        app.router.add_get('/search.json', search)
+
+        async with TestServer(app) as server:
+            monkeypatch.setattr(config.search, 'google_api_key', None)
+            monkeypatch.setattr(config.search, 'serpapi_key', 'test-key')
+            monkeypatch.setattr(config.search, 'serpapi_base_url', str(server.make_url('')))
+            monkeypatch.setattr(config.search, 'search_delay', 0)
+
+            results = await SearchEngine().search(SearchQuery(industry='IT', location='東京都', additional_keywords=[]), page=1)
+
+        assert requests[0]['api_key'] == 'test-key'
+        assert requests[0]['start'] == '10'
+        assert [result.url for result in results] == [f'https://example{i}.co.jp' for i in (10, 11, 12)]
+        assert results[0].position == 11
+        assert results[0].search_engine == 'serpapi'
+
+    @pytest.mark.asyncio
+    async def test_session_shared_across_queries_and_pages(self, monkeypatch):
+        """async with の間は全クエリ・全ページで1つのセッション（接続）を使い回すテスト"""
+        peers = []
+
+        async def search(request):
+            peers.append(request.transport.get_extra_info('peername'))
+            return web.json_response({'organic_results': [{'title': '会社', 'link': 'https://example.co.jp'}]})
+
+        app = web.Application()
+        app.router.add_get('/search.json', search)
+
+        async with TestServer(app) as server:
+            monkeypatch.setattr(config.search, 'google_api_key', None)
+            monkeypatch.setattr(config.search, 'serpapi_key', 'test-key')
+            monkeypatch.setattr(config.search, 'serpapi_base_url', str(server.make_url('')))
+            monkeypatch.setattr(config.search, 'search_delay', 0)
+
+            engine = SearchEngine()
+            async with engine:
+                session = engine.session
+                for industry in ('IT', '製造業'):
+                    for page in range(2):
+                        await engine.search(SearchQuery(industry=industry, location='東京都', additional_keywords=[]), page=page)
+
+        assert len(peers) == 4
+        assert len(set(peers)) == 1
+        assert session.closed
+        assert engine.session is None
+
+    @pytest.mark.asyncio
+    async def test_search_delay_shared_by_concurrent_searches(self, monkeypatch):
+        """並行する検索も search_delay の間隔を空けて送られるテスト"""
+        times = []
+
+        async def search(request):
+            times.append(time.monotonic())
+            return web.json_response({'organic_results': []})
+
+        app = web.Application()
+        app.router.add_get('/search.json', search)
+
+        async with TestServer(app) as server:
+            monkeypatch.setattr(config.search, 'google_api_key', None)
+            monkeypatch.setattr(config.search, 'serpapi_key', 'test-key')
+            monkeypatch.setattr(config.search, 'serpapi_base_url', str(server.make_url('')))
+            monkeypatch.setattr(config.search, 'search_delay', 0.1)
+
+            engine = SearchEngine()
+            async with engine:
+                await asyncio.gather(*[
+                    engine.search(SearchQuery(industry='IT', location=location, additional_keywords=[]))
+                    for location in ('東京都', '大阪府', '愛知県')
+                ])
+
+        assert len(times) == 3
+        assert all(later - earlier >= 0.09 for earlier, later in zip(times, times[1:]))
+
+    @pytest.mark.asyncio
+    async def test_nested_session_scopes(self):
+        """並行する async with が終わるまで自前のセッションを閉じず、共有セッションは閉じないテスト"""
+        engine = SearchEngine()
+        async with engine:
+            session = engine.session
+            async with engine:
+                assert engine.session is session
+            assert not session.closed
+        assert session.closed
+        assert engine.session is None
+
+        async with aiohttp.ClientSession() as shared:
+            engine = SearchEngine(session=shared)
+            async with engine:
+                assert engine.session is shared
+            assert not shared.closed
+            assert engine.session is shared
@@ -6,14 +6,18 @@
 import os
 import sys
 import json
+import uuid
 import asyncio
+import gzip
+import hashlib
 from datetime import datetime
+from pathlib import Path
 from threading import Thread
 import logging
 
-from flask import Flask, render_template, request, jsonify, send_file, redirect, url_for, flash, session
-from flask_socketio import SocketIO, emit
-import eventlet
+from flask import Flask, Response, render_template, request, jsonify, send_file, redirect, url_for, flash, session
+from flask_socketio import SocketIO, emit, join_room
+from eventlet import tpool
 
 # 親ディレクトリのsrcをパスに追加
 current_dir = os.path.dirname(__file__)
@@ -28,6 +32,10 @@ from main import SalesLeadGenerator
 from models import SearchQuery, BusinessSize
 from config.config import config
 from history_manager import HistoryManager
+from job_queue import JobQueue
+from job_worker import WorkerPool
+from exporters import DataExporter, DOWNLOAD_MIMETYPES, EXPORT_EXTENSIONS, STREAMABLE_FORMATS
+from metrics import render_prometheus
 
 # ロギング設定
 logging.basicConfig(level=logging.INFO)
@@ -44,139 +52,152 @@ def tojson_filter(obj):
     """オブジェクトをJSON文字列に変換"""
     return json.dumps(obj, ensure_ascii=False, default=str)
 
-# グローバル変数
-current_job = None
-job_results = {}
-
 class WebJobManager:
-    """ウェブジョブの管理クラス"""
-
-    def __init__(self):
-        self.current_job_id = None
-        self.job_status = {}
-        self.job_results = {}
-
-    def start_job(self, job_id, search_params):
-        """ジョブを開始"""
-        self.current_job_id = job_id
-        self.job_status[job_id] = {
-            'status': 'running',
-            'progress': 0,
-            'message': '検索を開始しています...',
-            'start_time': datetime.now(),
-            'search_params': search_params
-        }
-
-        # バックグラウンドでジョブを実行
-        eventlet.spawn(self._run_job_async, job_id, search_params)
-
-    def _run_job_async(self, job_id, search_params):
-        """非同期でジョブを実行"""
-        try:
-            # ジョブの進行状況を更新しながら実行
-            self._emit_progress(job_id, 10, "検索エンジンを初期化しています...")
-
-            generator = SalesLeadGenerator()
-
-            self._emit_progress(job_id, 20, "検索を実行中...")
-
-            # 検索パラメータを取得
-            industry = search_params.get('industry', '')
-            location = search_params.get('location', '')
-            keywords = search_params.get('keywords', [])
-            max_results = search_params.get('max_results', 20)
-            wordpress_only = search_params.get('wordpress_only', False)
-
-            # 非同期で実行
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-
-            result = loop.run_until_complete(
-                generator.generate_leads(
-                    industry=industry,
-                    location=location,
-                    additional_keywords=keywords,
-                    max_results=max_results,
-                    export_formats=['csv'],
-                    sync_to_crm=False,
-                    wordpress_only=wordpress_only
-                )
-            )
-
-            loop.close()
-
-            if result.get('success'):
-                self.job_status[job_id].update({
-                    'status': 'completed',
-                    'progress': 100,
-                    'message': f'完了！{result.get("leads_count", 0)}件のリードを取得しました。',
-                    'end_time': datetime.now()
-                })
-                self.job_results[job_id] = result
-
-                self._emit_progress(job_id, 100, "完了！結果を表示しています...")
-                socketio.emit('job_completed', {
-                    'job_id': job_id,
-                    'result': result
-                }, namespace='/', broadcast=True)
-                logger.info(f"Emitted job_completed for {job_id}")
-            else:
-                self.job_status[job_id].update({
-                    'status': 'error',
-                    'progress': 0,
-                    'message': f'エラー: {result.get("error", "不明なエラー")}',
-                    'end_time': datetime.now()
-                })
-
-                socketio.emit('job_error', {
-                    'job_id': job_id,
-                    'error': result.get('error', '不明なエラー')
-                }, namespace='/', broadcast=True)
-                logger.info(f"Emitted job_error for {job_id}")
-
-        except Exception as e:
-            logger.error(f"Job {job_id} failed: {e}", exc_info=True)
-            self.job_status[job_id].update({
-                'status': 'error',
-                'progress': 0,
-                'message': f'システムエラー: {str(e)}',
-                'end_time': datetime.now()
-            })
-
+    """
+    ウェブジョブの管理クラス
+
+    ジョブは永続ジョブキューに投入され、別プロセスのワーカーが実行する。
+    Webプロセスはキューの更新を追跡してWebSocketで進捗を配信するだけなので、
+    ジョブの実行がリクエスト処理を止めることはなく、再起動しても状態は失われない。
+    """
+
+    def __init__(self, queue: JobQueue = None):
+        self.queue = queue or JobQueue()
+        self._last_seq = self.queue.latest_seq()
+        self._relay_started = False
+
+    def start_job(self, job_id, search_params, user_id='default', priority=0):
+        """ジョブをキューに投入"""
+        return self.queue.enqueue(search_params, user_id=user_id, priority=priority, job_id=job_id)
+
+    def cancel_job(self, job_id):
+        """ジョブをキャンセル"""
+        return self.queue.cancel(job_id)
+
+    def start_event_relay(self):
+        """キューの更新をWebSocketに中継するバックグラウンドタスクを開始"""
+        if not self._relay_started:
+            self._relay_started = True
+            socketio.start_background_task(self._relay_updates)
+
+    def _relay_updates(self):
+        """
+        ワーカーが書き込んだ進捗・完了をポーリングして配信
+
+        ジョブの行は更新のたびに上書きされるため、1回のポーリングで得られるのは
+        各ジョブの最新状態1件だけとなり、間の進捗イベントは自然にまとめられる。
+        """
+        while True:
+            try:
+                jobs, self._last_seq = self.queue.get_updates(self._last_seq)
+                for job in jobs:
+                    self._emit_job_update(job)
+            except Exception as e:
+                logger.error(f"Job relay error: {e}", exc_info=True)
+
+            socketio.sleep(config.jobs.poll_interval / 2)
+
+    def _emit_job_update(self, job, to=None):
+        """
+        ジョブの状態に応じたイベントを送信
+
+        Args:
+            to: 送信先（デフォルトはジョブを購読しているクライアントのルーム）
+        """
+        job_id = job['job_id']
+        to = to or job_id
+
+        if job['status'] == 'completed':
+            socketio.emit('job_completed', {
+                'job_id': job_id,
+                'result': self.queue.get_result(job_id)
+            }, namespace='/', to=to)
+            logger.info(f"Emitted job_completed for {job_id}")
+        elif job['status'] == 'error':
             socketio.emit('job_error', {
                 'job_id': job_id,
-                'error': str(e)
-            }, namespace='/', broadcast=True)
-            logger.info(f"Emitted job_error (exception) for {job_id}")
-
-    def _emit_progress(self, job_id, progress, message):
-        """進行状況をWebSocketで送信"""
-        self.job_status[job_id].update({
-            'progress': progress,
-            'message': message
-        })
-
-        socketio.emit('job_progress', {
-            'job_id': job_id,
-            'progress': progress,
-            'message': message
-        }, namespace='/', broadcast=True)
-        logger.info(f"Emitted progress: {job_id} - {progress}% - {message}")
+                'error': job['error'] or '不明なエラー'
+            }, namespace='/', to=to)
+            logger.info(f"Emitted job_error for {job_id}")
+        elif job['status'] == 'cancelled':
+            socketio.emit('job_cancelled', {'job_id': job_id}, namespace='/', to=to)
+            logger.info(f"Emitted job_cancelled for {job_id}")
+        else:
+            socketio.emit('job_progress', {
+                'job_id': job_id,
+                'status': job['status'],
+                'stage': job['stage'],
+                'progress': job['progress'],
+                'message': job['message']
+            }, namespace='/', to=to)
+
+    def subscribe(self, job_id, sid):
+        """
+        クライアントをジョブのルームに参加させ、現在の状態を送信
+
+        購読前に送られたイベント（すでに完了した場合など）を取りこぼさないようにする。
+        """
+        job = self.queue.get(job_id)
+        if job is None:
+            return False
+
+        join_room(job_id, sid=sid, namespace='/')
+        self._emit_job_update(job, to=sid)
+        return True
 
     def get_job_status(self, job_id):
         """ジョブの状態を取得"""
-        return self.job_status.get(job_id)
+        return self.queue.get(job_id)
 
     def get_job_result(self, job_id):
         """ジョブの結果を取得"""
-        return self.job_results.get(job_id)
+        return self.queue.get_result(job_id)
 
 # ジョブマネージャーのインスタンス
 job_manager = WebJobManager()
 
+# これより小さいJSONレスポンスは圧縮しない（圧縮の効果よりオーバーヘッドが大きい）
+GZIP_MIN_SIZE = 1024
+
+# リード一覧APIの1ページあたりの最大件数
+MAX_LEADS_PER_PAGE = 200
+
+def _json_response(payload):
+    """JSONレスポンスを作成（クライアントが対応していればgzip圧縮）"""
+    response = jsonify(payload)
+    response.vary.add('Accept-Encoding')
+
+    body = response.get_data()
+    if len(body) >= GZIP_MIN_SIZE and 'gzip' in request.headers.get('Accept-Encoding', ''):
+        response.set_data(gzip.compress(body, compresslevel=6))
+        response.headers['Content-Encoding'] = 'gzip'
+
+    return response
+
 # 履歴マネージャーのインスタンス
 history_manager = HistoryManager()
 
+# ダウンロード用のエクスポーター
+exporter = DataExporter()
+
+def _current_user_id():
+    """
+    同時実行数の制限に使うユーザーID
+
+    X-User-Id ヘッダがあればそれを使い、無ければブラウザのセッションごとに発行する。
+    """
+    user_id = request.headers.get('X-User-Id')
+    if user_id:
+        return user_id
+    if 'user_id' not in session:
+        session['user_id'] = uuid.uuid4().hex
+    return session['user_id']
+
+def _owns_job(job_id) -> bool:
+    """ジョブがリクエストしたユーザーのものか（存在しない場合はFalse）"""
+    job = job_manager.queue.get(job_id)
+    return job is not None and job['user_id'] == _current_user_id()
+
 @app.route('/')
 def index():
     """メインページ"""
@@ -197,8 +218,13 @@ def api_search():
         if not data.get('industry') or not data.get('location'):
             return jsonify({'error': '業種と地域は必須です'}), 400
 
-        # ジョブIDを生成
-        job_id = f"job_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        try:
+            priority = max(-10, min(int(data.get('priority', 0)), 10))
+        except (TypeError, ValueError):
+            return jsonify({'error': '優先度は整数で指定してください'}), 400
+
+        # ジョブIDを生成（複数の担当者が同時に投入しても衝突しない）
+        job_id = JobQueue.new_job_id()
 
         # 検索パラメータを準備
         search_params = {
@@ -209,13 +235,13 @@ def api_search():
             'wordpress_only': data.get('wordpress_only', False)
         }
 
-        # ジョブを開始
-        job_manager.start_job(job_id, search_params)
+        # ジョブをキューに投入
+        job_manager.start_job(job_id, search_params, user_id=_current_user_id(), priority=priority)
 
         return jsonify({
             'success': True,
             'job_id': job_id,
-            'message': '検索を開始しました'
+            'message': '検索を受け付けました'
         })
 
     except Exception as e:
@@ -231,6 +257,42 @@ def api_job_status(job_id):
 
     return jsonify(status)
 
+@app.route('/api/job/<job_id>/cancel', methods=['POST'])
+def api_job_cancel(job_id):
+    """ジョブキャンセルAPI（自分のジョブのみ）"""
+    if not _owns_job(job_id) or not job_manager.cancel_job(job_id):
+        return jsonify({'error': 'キャンセルできるジョブが見つかりません'}), 404
+
+    return jsonify({'success': True, 'message': 'キャンセルを受け付けました'})
+
+@app.route('/api/job/<job_id>/retry', methods=['POST'])
+def api_job_retry(job_id):
+    """失敗したジョブの再実行API（自分のジョブのみ。完了済みのステージはチェックポイントから再開）"""
+    if not _owns_job(job_id) or not job_manager.queue.retry(job_id):
+        return jsonify({'error': '再実行できるジョブが見つかりません'}), 404
+
+    return jsonify({'success': True, 'message': '再実行を受け付けました'})
+
+@app.route('/api/jobs')
+def api_jobs():
+    """自分のジョブ一覧API"""
+    limit = request.args.get('limit', 50, type=int)
+    return jsonify({'success': True, 'jobs': job_manager.queue.list_jobs(user_id=_current_user_id(), limit=limit)})
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """
+    Prometheus形式の計測値
+
+    ワーカーが記録した全ジョブの累計（ステージ時間・HTTPリクエスト・トークン数・
+    キャッシュヒット率）と、状態ごとのジョブ数を出力する。
+    """
+    body = render_prometheus(
+        job_manager.queue.metric_totals(),
+        gauges={'jobs': [({'status': status}, count) for status, count in sorted(job_manager.queue.status_counts().items())]}
+    )
+    return Response(body, mimetype='text/plain; version=0.0.4')
+
 @app.route('/api/job/<job_id>/result')
 def api_job_result(job_id):
     """ジョブ結果取得API"""
@@ -238,7 +300,48 @@ def api_job_result(job_id):
     if not result:
         return jsonify({'error': '結果が見つかりません'}), 404
 
-    return jsonify(result)
+    return _json_response(result)
+
+@app.route('/api/job/<job_id>/leads')
+def api_job_leads(job_id):
+    """
+    ジョブ結果のリード一覧API（ページング・並び替え・絞り込み）
+
+    クエリパラメータ: page, per_page, sort (score/score_asc/name/rank),
+    priority (high/medium/low), industry, wordpress (1/0), min_score, facets (1で業種一覧を含める)
+    """
+    if not job_manager.get_job_result(job_id):
+        return jsonify({'error': '結果が見つかりません'}), 404
+
+    try:
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = max(1, min(request.args.get('per_page', 50, type=int), MAX_LEADS_PER_PAGE))
+        wordpress = request.args.get('wordpress')
+
+        leads = job_manager.queue.get_leads(
+            job_id,
+            limit=per_page,
+            offset=(page - 1) * per_page,
+            sort=request.args.get('sort', 'score'),
+            priority=request.args.get('priority') or None,
+            industry=request.args.get('industry') or None,
+            is_wordpress=wordpress == '1' if wordpress in ('0', '1') else None,
+            min_score=request.args.get('min_score', type=float)
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    payload = {
+        'success': True,
+        'data': leads['data'],
+        'total': leads['total'],
+        'page': page,
+        'per_page': per_page
+    }
+    if request.args.get('facets') == '1':
+        payload['industries'] = job_manager.queue.get_lead_industries(job_id)
+
+    return _json_response(payload)
 
 @app.route('/results/<job_id>')
 def results(job_id):
@@ -252,30 +355,81 @@ def results(job_id):
 
 @app.route('/api/download/<job_id>/<format>')
 def api_download(job_id, format):
-    """ダウンロードAPI"""
+    """
+    ダウンロードAPI
+
+    保存済みのジョブ結果から指定形式をその都度生成する（ジョブの再実行は不要）。
+    CSV・JSONLはチャンク単位でストリーミングし、Excel・Parquetは初回に生成した
+    ファイルをキャッシュする。内容はジョブの完了時点で確定するため、ETagが
+    一致するリクエストには304を返す。
+    """
     try:
+        if format not in DOWNLOAD_MIMETYPES:
+            return jsonify({'error': f'未対応の形式です: {format}'}), 400
+
+        job = job_manager.get_job_status(job_id)
         result = job_manager.get_job_result(job_id)
-        if not result or not result.get('success'):
+        if not job or not result or not result.get('success'):
             return jsonify({'error': '結果が見つかりません'}), 404
 
-        export_files = result.get('export_results', {})
-
-        if format == 'csv' and 'csv' in export_files:
-            file_path = export_files['csv']
-            if os.path.exists(file_path):
-                return send_file(
-                    file_path,
-                    as_attachment=True,
-                    download_name=f'sales_leads_{job_id}.csv',
-                    mimetype='text/csv'
-                )
-
-        return jsonify({'error': '指定された形式のファイルが見つかりません'}), 404
+        etag = hashlib.sha256(f"{job_id}:{job['end_time']}:{format}".encode('utf-8')).hexdigest()[:32]
+        if etag in request.if_none_match:
+            response = app.response_class(status=304)
+            response.set_etag(etag)
+            return response
+
+        download_name = f'sales_leads_{job_id}{EXPORT_EXTENSIONS[format]}'
+        search_info = result.get('search_info')
+        rows = exporter.iter_lead_rows(job_manager.queue.iter_leads(job_id), search_info, export_date=job['end_time'])
+
+        if format in STREAMABLE_FORMATS:
+            response = app.response_class(exporter.stream_rows(format, rows), mimetype=DOWNLOAD_MIMETYPES[format])
+            response.headers['Content-Disposition'] = f'attachment; filename="{download_name}"'
+            response.set_etag(etag)
+            return response
+
+        file_path = _cached_download(job_id, format, etag, rows, search_info)
+        if file_path is None:
+            return jsonify({'error': f'{format} 形式のファイルを生成できませんでした'}), 500
+
+        return send_file(
+            file_path,
+            as_attachment=True,
+            download_name=download_name,
+            mimetype=DOWNLOAD_MIMETYPES[format],
+            etag=etag
+        )
 
     except Exception as e:
         logger.error(f"Download error: {e}", exc_info=True)
         return jsonify({'error': str(e)}), 500
 
+def _cached_download(job_id, format, etag, rows, search_info):
+    """
+    Excel・Parquetのダウンロードファイルを取得（未生成なら生成してキャッシュ）
+
+    Returns:
+        ファイルのパス（生成に失敗した場合はNone）
+    """
+    cache_dir = Path(config.output.output_dir) / 'downloads'
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    file_path = cache_dir / f"{job_id}_{etag}{EXPORT_EXTENSIONS[format]}"
+    if file_path.exists():
+        return file_path
+
+    # 同時に同じファイルを要求された場合に備え、一時ファイルに書いてから置き換える
+    tmp_path = cache_dir / f"{job_id}_{etag}.{uuid.uuid4().hex}.tmp{EXPORT_EXTENSIONS[format]}"
+    options = {'partitioned': False} if format == 'parquet' else {}
+
+    # 生成はCPUを長く使うため、eventletのハブを止めないようネイティブスレッドで実行する
+    # （ハブが止まるとSocket.IOの全クライアントへの配信も止まる）
+    if tpool.execute(exporter.write_rows, format, rows, str(tmp_path), search_info, **options) is None:
+        tmp_path.unlink(missing_ok=True)
+        return None
+
+    os.replace(tmp_path, file_path)
+    return file_path
+
 @app.route('/settings')
 def settings():
     """設定ページ"""
@@ -387,17 +541,35 @@ def api_get_history():
     try:
         limit = request.args.get('limit', 100, type=int)
         offset = request.args.get('offset', 0, type=int)
-
-        history_data = history_manager.get_history(limit=limit, offset=offset)
-        total_count = history_manager.get_history_count()
+        cursor = request.args.get('cursor')
+        query = request.args.get('q', '').strip()
+        next_cursor = None
+
+        if query:
+            # 検索結果は関連度順のためオフセットでページング
+            history_data = history_manager.search_history(query, limit=limit, offset=offset)
+            total_count = history_manager.get_search_count(query)
+        elif cursor is not None or not offset:
+            # 一覧は (created_at, id) のキーセットでページング
+            page = history_manager.get_history_page(limit=limit, cursor=cursor or None)
+            history_data = page['data']
+            next_cursor = page['next_cursor']
+            total_count = history_manager.get_history_count()
+        else:
+            history_data = history_manager.get_history(limit=limit, offset=offset)
+            total_count = history_manager.get_history_count()
 
         return jsonify({
             'success': True,
             'data': history_data,
             'total': total_count,
             'limit': limit,
-            'offset': offset
+            'offset': offset,
+            'next_cursor': next_cursor,
+            'query': query
         })
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"History API error: {e}", exc_info=True)
         return jsonify({'error': str(e)}), 500
@@ -446,11 +618,28 @@ def handle_disconnect():
     """WebSocket切断時"""
     logger.info(f'Client disconnected')
 
+@socketio.on('subscribe_job')
+def handle_subscribe_job(data):
+    """ジョブの進捗を購読（進捗イベントは購読したクライアントにのみ配信）"""
+    job_id = (data or {}).get('job_id')
+    if job_id and job_manager.subscribe(job_id, request.sid):
+        logger.info(f'Client subscribed to {job_id}')
+
 if __name__ == '__main__':
     # 出力ディレクトリを確保
     os.makedirs('../output', exist_ok=True)
 
+    # ジョブワーカーを起動（JOB_WORKERS=0 の場合は `python src/job_worker.py --workers N` を別途起動）
+    worker_pool = WorkerPool(config.jobs.workers)
+    if config.jobs.workers > 0:
+        worker_pool.start()
+    job_manager.start_event_relay()
+
     print("営業リスト自動生成エージェント - Webアプリケーション")
     print("http://localhost:5000 でアクセスしてください")
 
-    socketio.run(app, host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    try:
+        # リローダーはワーカーを二重に起動するため無効にする
+        socketio.run(app, host='0.0.0.0', port=5000, debug=True, use_reloader=False)
+    finally:
+        worker_pool.stop()
\ No newline at end of file